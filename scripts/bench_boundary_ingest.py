@@ -0,0 +1,103 @@
+"""
+bench_boundary_ingest.py — Admin boundary ingest time, row-by-row vs columnar.
+
+Reads each HDX layer once from a local GDB, then writes it into two fresh
+throw-away databases:
+
+    legacy   : gdf.iterrows() + one c.execute() per feature (the old loop)
+    columnar : AuxiliaryDataImporter._boundary_rows() + chunked executemany
+
+Both paths store the same columns, including the SIMPLIFY_TIERS copies
+(simplified per feature in the legacy loop, per GeoSeries in the columnar
+one). Only the write phase is timed (GDB read and reprojection are identical).
+
+Usage:
+    python scripts/bench_boundary_ingest.py --gdb path/to/ukr_admbnd.gdb [--layers hdx_ukr_adm1 hdx_ukr_adm3]
+"""
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+import uuid
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "src"))
+
+import geopandas as gpd
+
+from utils.auxiliaryDataImport import AuxiliaryDataImporter, AVAILABLE_DATASETS
+
+
+def fresh_importer(work_dir, name):
+    db_path = os.path.join(work_dir, f"{name}.sqlite")
+    importer = AuxiliaryDataImporter(lambda: sqlite3.connect(db_path))
+    importer.ensure_tables_exist()
+    return importer, sqlite3.connect(db_path)
+
+
+def insert_metadata(c, importer, config, n):
+    c.execute(f"INSERT INTO {importer.METADATA_TABLE} (DATASET_ID, DATASET_NAME, RECORD_COUNT) VALUES (?, ?, ?)",
+              (config["id"], config["name"], n))
+
+
+def legacy_insert(importer, conn, config, gdf):
+    """
+    The pre-columnar loop: iterrows, per-row JSON dict, one execute per
+    feature, plus the same simplified tiers the columnar path stores.
+    """
+    c = conn.cursor()
+    insert_metadata(c, importer, config, len(gdf))
+    level_str = f"ADM{config['admin_level']}"
+    core_cols = {"geometry", f"{level_str}_EN", f"{level_str}_PCODE", "Shape_Length", "Shape_Area"}
+    tiers = list(importer.SIMPLIFY_TIERS.values())
+    tier_cols = ", ".join(column for column, _ in tiers)
+    for _, row in gdf.iterrows():
+        min_x, min_y, max_x, max_y = row.geometry.bounds
+        json_data = {col: str(row[col]) for col in gdf.columns if col not in core_cols and row[col] is not None}
+        tier_wkbs = [row.geometry.simplify(tolerance, preserve_topology=True).wkb for _, tolerance in tiers]
+        c.execute(f'''
+            INSERT INTO {importer.BOUNDARIES_TABLE}
+            (SYS_ADMIN_ID, DATASET_ID, ADMIN_LEVEL, ADMIN_NAME, ADMIN_CODE,
+             GEOM_WKB, BBOX_MIN_X, BBOX_MIN_Y, BBOX_MAX_X, BBOX_MAX_Y, CRS_EPSG, JSON_DATA, {tier_cols})
+            VALUES ({", ".join("?" * (12 + len(tiers)))})
+        ''', (str(uuid.uuid4()), config["id"], config["admin_level"], row.get(f"{level_str}_EN"),
+              row.get(f"{level_str}_PCODE"), row.geometry.wkb, min_x, min_y, max_x, max_y, 4326,
+              json.dumps(json_data), *tier_wkbs))
+    conn.commit()
+
+
+def columnar_insert(importer, conn, config, gdf):
+    c = conn.cursor()
+    insert_metadata(c, importer, config, len(gdf))
+    rows, _ = importer._boundary_rows(config, gdf)
+    importer._write_boundary_rows(c, rows)
+    conn.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--gdb", required=True, help="Extracted .gdb folder of the HDX archive")
+    parser.add_argument("--layers", nargs="*", default=[d["id"] for d in AVAILABLE_DATASETS])
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix="dbm_ingest_bench_")
+    print(f"{'dataset':<16} {'features':>9} {'legacy s':>10} {'columnar s':>11} {'speed-up':>9}")
+    for config in (d for d in AVAILABLE_DATASETS if d["id"] in args.layers):
+        gdf = gpd.read_file(args.gdb, layer=config["layer"]).to_crs(epsg=4326)
+
+        timings = {}
+        for name, insert in (("legacy", legacy_insert), ("columnar", columnar_insert)):
+            importer, conn = fresh_importer(work_dir, f"{config['id']}_{name}")
+            start = time.perf_counter()
+            insert(importer, conn, config, gdf)
+            timings[name] = time.perf_counter() - start
+            conn.close()
+
+        print(f"{config['id']:<16} {len(gdf):>9} {timings['legacy']:>10.2f} {timings['columnar']:>11.2f} "
+              f"{timings['legacy'] / timings['columnar']:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+bench_pragma_profile.py — Read/write throughput of the connection PRAGMA profile.
+
+Seeds a throw-away database with property skeletons through db_core, then runs
+the same mixed workload (several reader threads + one writer thread, each with
+its own connection, like concurrent Streamlit sessions) against:
+
+    legacy : rollback journal, synchronous=FULL (the old sqlite3 defaults)
+    tuned  : db_core.PRAGMA_PROFILE (WAL, synchronous=NORMAL, mmap, ...)
+
+Usage:
+    python scripts/bench_pragma_profile.py [--properties 2000] [--seconds 5] [--readers 4]
+"""
+import argparse
+import os
+import random
+import shutil
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "src"))
+
+import db_core
+
+LEGACY_PROFILE = {
+    "busy_timeout": 5000,
+    "foreign_keys": "ON",
+    "journal_mode": "DELETE",
+    "synchronous":  "FULL",
+}
+
+READ_SQL = """
+    SELECT p.*, a.*, l.*
+    FROM TBL_CORE_PROPERTY p
+    LEFT JOIN TBL_CORE_ADDRESS a ON a.FK_PROPERTY_ID = p.SYS_PROPERTY_ID
+    LEFT JOIN TBL_CORE_LEGAL_OWNERSHIP l ON l.FK_PROPERTY_ID = p.SYS_PROPERTY_ID
+    WHERE p.SYS_PROPERTY_ID = ?
+"""
+WRITE_SQL = "UPDATE TBL_CORE_LANDPLOT SET LAND_SIZE = ?, LAND_INFRA_NOTES = ? WHERE FK_PROPERTY_ID = ?"
+
+
+def seed(n_properties):
+    """Creates a seeded database in a temp working dir and returns (db_path, property_ids)."""
+    work_dir = tempfile.mkdtemp(prefix="dbm_bench_")
+    os.makedirs(os.path.join(work_dir, "data"))
+    os.chdir(work_dir)
+    db_core.reset_connection_pool()
+
+    db_core.init_db()
+    db_core.seed_enums()
+    ids = [db_core.add_property("UA80", f"BENCH-{i:06d}") for i in range(n_properties)]
+    db_core.checkpoint_database()
+    db_core.get_connection()._close()
+    return db_core.get_db_path(), ids
+
+
+def run_workload(db_path, profile, ids, seconds, readers):
+    counts = {"reads": 0, "writes": 0, "locked": 0}
+    lock = threading.Lock()
+    stop_at = time.perf_counter() + seconds
+
+    def open_conn():
+        conn = sqlite3.connect(db_path, timeout=profile.get("busy_timeout", 5000) / 1000)
+        db_core.apply_pragma_profile(conn, profile)
+        return conn
+
+    def reader():
+        conn, n = open_conn(), 0
+        while time.perf_counter() < stop_at:
+            conn.execute(READ_SQL, (random.choice(ids),)).fetchall()
+            n += 1
+        conn.close()
+        with lock:
+            counts["reads"] += n
+
+    def writer():
+        conn, n, locked = open_conn(), 0, 0
+        while time.perf_counter() < stop_at:
+            try:
+                conn.execute(WRITE_SQL, (random.random() * 1000, "bench", random.choice(ids)))
+                conn.commit()
+                n += 1
+            except sqlite3.OperationalError:
+                conn.rollback()
+                locked += 1
+        conn.close()
+        with lock:
+            counts["writes"] += n
+            counts["locked"] += locked
+
+    threads = [threading.Thread(target=reader) for _ in range(readers)]
+    threads.append(threading.Thread(target=writer))
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--properties", type=int, default=2000)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--readers", type=int, default=4)
+    args = parser.parse_args()
+
+    print(f"Seeding {args.properties} property skeletons...")
+    seed_path, ids = seed(args.properties)
+
+    print(f"{'profile':<8} {'reads/s':>10} {'writes/s':>10} {'locked':>8}")
+    for name, profile in (("legacy", LEGACY_PROFILE), ("tuned", db_core.PRAGMA_PROFILE)):
+        db_path = f"{seed_path}.{name}"
+        shutil.copyfile(seed_path, db_path)
+        # Convert the journal mode once up front; it needs an exclusive lock
+        conn = sqlite3.connect(db_path)
+        conn.execute(f"PRAGMA journal_mode = {profile['journal_mode']};")
+        conn.close()
+        counts = run_workload(db_path, profile, ids, args.seconds, args.readers)
+        print(f"{name:<8} {counts['reads'] / args.seconds:>10.0f} "
+              f"{counts['writes'] / args.seconds:>10.0f} {counts['locked']:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+check_query_plans.py — EXPLAIN QUERY PLAN check for the hot data-access queries.
+
+Builds a throw-away database through db_core.init_db() and fails (exit code 1)
+if any of the queries below still needs a full table SCAN. Run it after any
+schema / index change:
+
+    python scripts/check_query_plans.py
+"""
+import os
+import sys
+import tempfile
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "src"))
+
+import db_core
+
+# (label, SQL) — mirrors the statements issued by the pages and db_core helpers
+HOT_QUERIES = [
+    # get_property_skeleton()
+    ("skeleton: property",   "SELECT * FROM TBL_CORE_PROPERTY WHERE SYS_PROPERTY_ID = ?"),
+    ("skeleton: legal",      "SELECT * FROM TBL_CORE_LEGAL_OWNERSHIP WHERE FK_PROPERTY_ID = ?"),
+    ("skeleton: address",    "SELECT * FROM TBL_CORE_ADDRESS WHERE FK_PROPERTY_ID = ?"),
+    ("skeleton: landplot",   "SELECT * FROM TBL_CORE_LANDPLOT WHERE FK_PROPERTY_ID = ?"),
+    ("skeleton: governance", "SELECT * FROM TBL_CORE_GOVERNANCE WHERE FK_PROPERTY_ID = ?"),
+    # building_page() 5-way join
+    ("building_page join", """
+        SELECT b.*, i.INSP_ROUTINE_REPAIR, s.SUIT_IDP_YES, sa.SAFE_FIRE, ta.*
+        FROM TBL_CORE_BUILDING b
+        LEFT JOIN TBL_CORE_INSPECTION i ON b.SYS_BLD_ID = i.FK_BLD_ID
+        LEFT JOIN TBL_CORE_SUITABILITY s ON b.SYS_BLD_ID = s.FK_BUILDING_ID
+        LEFT JOIN TBL_CORE_SAFETY sa ON b.SYS_BLD_ID = sa.FK_BUILDING_ID
+        LEFT JOIN TBL_CORE_BUILDING_TECH_AUDIT ta ON b.SYS_BLD_ID = ta.FK_BLD_ID
+        WHERE b.FK_PROPERTY_ID = ?
+    """),
+    # Geometry updaters
+    ("address by geom",      "UPDATE TBL_CORE_ADDRESS SET ADDR_GEOM_CREATED = 1 WHERE ID_ADDR_GEOM = ?"),
+    ("building by geom",     "UPDATE TBL_CORE_BUILDING SET GEOM_BLD_CREATED = 0 WHERE ID_BUILDING_GEOM = ?"),
+    # delete_property() / delete_building() cascades
+    ("delete media",         "DELETE FROM TBL_CORE_BUILDING_MEDIA WHERE FK_BLD_ID = ?"),
+    ("delete inspection",    "DELETE FROM TBL_CORE_INSPECTION WHERE FK_BLD_ID = ?"),
+    ("delete tech audit",    "DELETE FROM TBL_CORE_BUILDING_TECH_AUDIT WHERE FK_BLD_ID = ?"),
+    ("delete suitability",   "DELETE FROM TBL_CORE_SUITABILITY WHERE FK_BUILDING_ID = ?"),
+    ("delete occupancy",     "DELETE FROM TBL_CORE_OCCUPANCY WHERE FK_BUILDING_ID = ?"),
+    ("delete safety",        "DELETE FROM TBL_CORE_SAFETY WHERE FK_BUILDING_ID = ?"),
+    ("delete allocation",    "DELETE FROM TBL_CORE_ALLOCATION WHERE FK_BUILDING_ID = ?"),
+    ("delete alloc links",   "DELETE FROM TBL_LINK_ALLOCATION WHERE FK_BUILDING_ID = ?"),
+    ("delete admin links",   """
+        DELETE FROM TBL_LINK_ADDRESS_ADMIN_REGION
+        WHERE FK_SYS_ADDR_ID IN (SELECT SYS_ADDR_ID FROM TBL_CORE_ADDRESS WHERE FK_PROPERTY_ID = ?)
+    """),
+    ("delete buildings",     "DELETE FROM TBL_CORE_BUILDING WHERE FK_PROPERTY_ID = ?"),
+    ("delete address",       "DELETE FROM TBL_CORE_ADDRESS WHERE FK_PROPERTY_ID = ?"),
+    ("delete legal",         "DELETE FROM TBL_CORE_LEGAL_OWNERSHIP WHERE FK_PROPERTY_ID = ?"),
+    ("delete landplot",      "DELETE FROM TBL_CORE_LANDPLOT WHERE FK_PROPERTY_ID = ?"),
+    ("delete governance",    "DELETE FROM TBL_CORE_GOVERNANCE WHERE FK_PROPERTY_ID = ?"),
+    ("delete gov links",     "DELETE FROM TBL_LINK_GOVERNANCE WHERE FK_PROPERTY_ID = ?"),
+    ("delete property",      "DELETE FROM TBL_CORE_PROPERTY WHERE SYS_PROPERTY_ID = ?"),
+    ("delete geometry",      "DELETE FROM TBL_CORE_GEOMETRY WHERE GEOM_ID = ?"),
+    # list_properties() pages (keyset cursor + server-side filters)
+    ("list: admin unit",     db_core._PROPERTY_LIST_SQL + """
+        WHERE (IFNULL(p.ID_CADASTRAL_NO, ''), p.SYS_PROPERTY_ID) > (?, ?) AND p.ID_ADMIN_UNIT = ?
+        ORDER BY IFNULL(p.ID_CADASTRAL_NO, ''), p.SYS_PROPERTY_ID LIMIT ?
+    """),
+    ("list: city",           db_core._PROPERTY_LIST_SQL + """
+        WHERE p.SYS_PROPERTY_ID IN (
+            SELECT FK_PROPERTY_ID FROM TBL_CORE_ADDRESS WHERE CITY = ? COLLATE NOCASE
+        )
+        ORDER BY IFNULL(p.ID_CADASTRAL_NO, ''), p.SYS_PROPERTY_ID LIMIT ?
+    """),
+    ("list: fieldwork",      """
+        SELECT 1 FROM TBL_CORE_BUILDING b
+        WHERE b.BLD_FIELDWORK_STATUS = ? AND b.FK_PROPERTY_ID = ?
+    """),
+    ("list: single row",     db_core._PROPERTY_LIST_SQL + " WHERE p.SYS_PROPERTY_ID = ?"),
+    # Completeness table (count_properties_by_status(), status triggers)
+    ("status count",         "SELECT COUNT(*) FROM TBL_SYS_PROPERTY_STATUS WHERE STATUS = ?"),
+    ("status legal check",   "SELECT OWN_TYPE FROM TBL_CORE_LEGAL_OWNERSHIP WHERE FK_PROPERTY_ID = ? LIMIT 1"),
+    # Search sync triggers (FTS5 MATCH itself is a virtual-table scan by design)
+    ("search key",           "SELECT SEARCH_ROWID FROM TBL_SEARCH_PROPERTY_KEY WHERE PROPERTY_ID = ?"),
+    ("search inspection",    """
+        SELECT i.INSP_DAMAGE_DESC FROM TBL_CORE_INSPECTION i
+        JOIN TBL_CORE_BUILDING b ON b.SYS_BLD_ID = i.FK_BLD_ID
+        WHERE b.FK_PROPERTY_ID = ?
+    """),
+]
+
+
+def query_plan(conn, sql):
+    """Returns the EXPLAIN QUERY PLAN detail lines for a statement (params bound to NULL)."""
+    n_params = sql.count("?")
+    rows = conn.execute(f"EXPLAIN QUERY PLAN {sql}", (None,) * n_params).fetchall()
+    return [row[-1] for row in rows]
+
+
+def main():
+    work_dir = tempfile.mkdtemp(prefix="dbm_plan_")
+    os.makedirs(os.path.join(work_dir, "data"))
+    os.chdir(work_dir)
+    db_core.init_db()
+    conn = db_core.get_connection()
+
+    failures = 0
+    for label, sql in HOT_QUERIES:
+        plan = query_plan(conn, sql)
+        scans = [step for step in plan if step.startswith("SCAN")]
+        status = "FAIL" if scans else "ok"
+        failures += bool(scans)
+        print(f"[{status:>4}] {label:<22} {' | '.join(plan)}")
+
+    print(f"\n{len(HOT_QUERIES) - failures}/{len(HOT_QUERIES)} hot queries use indexes.")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,36 @@
+"""
+import_osm_footprints.py — Build the local OSM building footprint index.
+
+Imports building polygons from an OSM extract into the footprint index used
+by fetch_osm_footprint() (see src/footprint_index.py), e.g. a Geofabrik
+oblast extract or a GeoJSON export of the working area.
+
+Usage:
+    python scripts/import_osm_footprints.py path/to/extract.osm.pbf [--replace] [--index data/osm_footprints.sqlite]
+"""
+import argparse
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "src"))
+
+import footprint_index
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("extract", help="OSM extract (.pbf, .geojson or any GDAL vector file)")
+    parser.add_argument("--replace", action="store_true", help="Empty the index before importing")
+    parser.add_argument("--index", default=None, help="Index file (default: FOOTPRINT_INDEX_PATH or data/osm_footprints.sqlite)")
+    args = parser.parse_args()
+
+    footprint_index.import_footprints(
+        args.extract,
+        replace=args.replace,
+        index_path=args.index,
+        progress_callback=lambda done: print(f"  {done} features read...")
+    )
+
+
+if __name__ == "__main__":
+    main()
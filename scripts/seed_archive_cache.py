@@ -0,0 +1,43 @@
+"""
+seed_archive_cache.py — Pre-seed the dataset archive cache from a local file.
+
+Stores a downloaded archive (e.g. the HDX GDB zip copied over on a USB stick)
+in the content-addressed cache under a dataset URL, so ingestion of every
+dataset pointing at that URL runs without network access.
+
+Usage:
+    python scripts/seed_archive_cache.py path/to/ukr_admbnd_gdb.gdb.zip [--dataset hdx_ukr_adm1] [--sha256 <hex>]
+"""
+import argparse
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from archive_cache import CACHE_DIR, seed_archive, extracted_gdb
+from utils.auxiliaryDataImport import AVAILABLE_DATASETS
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("archive", help="Local archive file to store in the cache")
+    parser.add_argument("--dataset", default=AVAILABLE_DATASETS[0]["id"],
+                        help="Dataset id whose URL the archive belongs to")
+    parser.add_argument("--sha256", help="Expected SHA-256 of the archive")
+    args = parser.parse_args()
+
+    config = next((d for d in AVAILABLE_DATASETS if d["id"] == args.dataset), None)
+    if config is None:
+        sys.exit(f"Unknown dataset id: '{args.dataset}'")
+
+    entry = seed_archive(config["url"], args.archive, args.sha256 or config.get("sha256"))
+    gdb_path = extracted_gdb(config["url"], entry["sha256"])
+
+    datasets = [d["id"] for d in AVAILABLE_DATASETS if d["url"] == config["url"]]
+    print(f"Cached {entry['size']} bytes as {entry['sha256'][:12]} in {CACHE_DIR}")
+    print(f"Extracted GDB: {gdb_path}")
+    print(f"Available offline: {', '.join(datasets)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+"""
+admin_resolver.py — Fills TBL_LINK_ADDRESS_ADMIN_REGION from the HDX layers.
+
+Two entry points:
+
+    resolve_address_admin_regions(addr_geom_id, latitude, longitude)
+        Single point, called by db_core.update_address_geometry() after the
+        point is stored. Uses the R*Tree lookup of AuxiliaryDataImporter
+        (bbox candidates + exact prepared-polygon test).
+
+    backfill_admin_regions(batch_size, progress_callback)
+        Every geocoded address at once: points are built in vectorised
+        batches and joined to the boundary polygons with GeoPandas sjoin
+        (STRtree + prepared predicates). Returns throughput figures.
+
+Links written here are marked RESOLVED_FROM_GEOM = 'address_point'; each
+run replaces the previous 'address_point' links of the address, so
+re-geocoding never leaves stale regions behind. Nothing is written when no
+boundary dataset is loaded.
+"""
+import time
+import uuid
+
+from db_core import get_connection, db_session
+from geom_cache import point_latlon
+
+RESOLVED_FROM = "address_point"
+BOUNDARIES_TABLE = "TBL_REF_ADMIN_BOUNDARIES"
+RTREE_TABLE = "TBL_REF_ADMIN_BOUNDARIES_RTREE"
+
+_DELETE_LINKS_SQL = '''
+    DELETE FROM TBL_LINK_ADDRESS_ADMIN_REGION
+    WHERE FK_SYS_ADDR_ID = ? AND RESOLVED_FROM_GEOM = ?
+'''
+_INSERT_LINK_SQL = '''
+    INSERT INTO TBL_LINK_ADDRESS_ADMIN_REGION
+        (SYS_ADDR_ADMIN_ID, FK_SYS_ADDR_ID, ADMIN_LEVEL, ADMIN_LEVEL_NAME,
+         ADMIN_CODE, ADMIN_SOURCE, RESOLVED_FROM_GEOM, RESOLVED_AT)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+'''
+
+
+def _boundaries_loaded(c):
+    c.execute("SELECT 1 FROM sqlite_master WHERE name = ?", (RTREE_TABLE,))
+    if c.fetchone() is None:
+        return False
+    c.execute(f"SELECT 1 FROM {BOUNDARIES_TABLE} LIMIT 1")
+    return c.fetchone() is not None
+
+
+def _link_row(addr_id, unit, resolved_at):
+    return (
+        str(uuid.uuid4()),
+        addr_id,
+        int(unit["ADMIN_LEVEL"]),
+        unit["ADMIN_NAME"] or unit["ADMIN_CODE"] or "",
+        unit["ADMIN_CODE"],
+        unit["DATASET_ID"],
+        RESOLVED_FROM,
+        resolved_at,
+    )
+
+
+def resolve_address_admin_regions(addr_geom_id, latitude, longitude):
+    """
+    Assigns ADM1-3 units to the address(es) using this point geometry.
+    Returns the number of link rows written (0 if no boundaries are loaded).
+    """
+    conn = get_connection()
+    c = conn.cursor()
+    try:
+        if not _boundaries_loaded(c):
+            return 0
+        c.execute("SELECT SYS_ADDR_ID FROM TBL_CORE_ADDRESS WHERE ID_ADDR_GEOM = ?", (addr_geom_id,))
+        addr_ids = [row[0] for row in c.fetchall()]
+    finally:
+        conn.close()
+    if not addr_ids:
+        return 0
+
+    from utils.auxiliaryDataImport import AuxiliaryDataImporter
+    units = AuxiliaryDataImporter(get_connection).lookup_admin_units(latitude, longitude)
+    resolved_at = int(time.time())
+    rows = [_link_row(addr_id, unit, resolved_at) for addr_id in addr_ids for unit in units]
+
+    with db_session() as conn:
+        conn.executemany(_DELETE_LINKS_SQL, [(addr_id, RESOLVED_FROM) for addr_id in addr_ids])
+        conn.executemany(_INSERT_LINK_SQL, rows)
+    return len(rows)
+
+
+def backfill_admin_regions(batch_size=5000, progress_callback=None):
+    """
+    Resolves admin regions for every geocoded address (ADDR_GEOM_CREATED = 1).
+    progress_callback(done, total) is called after each batch.
+    Returns {"addresses", "links", "seconds", "addresses_per_second"}.
+    """
+    import geopandas as gpd
+    from utils.auxiliaryDataImport import AuxiliaryDataImporter
+
+    stats = {"addresses": 0, "links": 0, "seconds": 0.0, "addresses_per_second": 0.0}
+    conn = get_connection()
+    c = conn.cursor()
+    try:
+        if not _boundaries_loaded(c):
+            return stats
+        c.execute('''
+            SELECT a.SYS_ADDR_ID, g.GEOM_WKT
+            FROM TBL_CORE_ADDRESS a
+            JOIN TBL_CORE_GEOMETRY g ON g.GEOM_ID = a.ID_ADDR_GEOM
+            WHERE a.ADDR_GEOM_CREATED = 1 AND g.GEOM_WKT IS NOT NULL
+        ''')
+        addresses = c.fetchall()
+    finally:
+        conn.close()
+
+    start = time.perf_counter()
+    boundaries = AuxiliaryDataImporter(get_connection).get_boundaries()
+    polygons = gpd.GeoDataFrame(boundaries, geometry="geometry", crs="EPSG:4326")
+    resolved_at = int(time.time())
+
+    for offset in range(0, len(addresses), batch_size):
+        batch = []
+        for addr_id, wkt in addresses[offset:offset + batch_size]:
+            point = point_latlon(None, None, wkt)
+            if point:
+                batch.append((addr_id, point["longitude"], point["latitude"]))
+        if not batch:
+            continue
+
+        points = gpd.GeoDataFrame(
+            {"ADDR_ID": [b[0] for b in batch]},
+            geometry=gpd.points_from_xy([b[1] for b in batch], [b[2] for b in batch]),
+            crs="EPSG:4326",
+        )
+        joined = gpd.sjoin(points, polygons, how="inner", predicate="within")
+        rows = [
+            _link_row(rec["ADDR_ID"], rec, resolved_at)
+            for rec in joined[["ADDR_ID", "ADMIN_LEVEL", "ADMIN_NAME", "ADMIN_CODE", "DATASET_ID"]].to_dict("records")
+        ]
+
+        with db_session() as conn:
+            conn.executemany(_DELETE_LINKS_SQL, [(b[0], RESOLVED_FROM) for b in batch])
+            conn.executemany(_INSERT_LINK_SQL, rows)
+
+        stats["addresses"] += len(batch)
+        stats["links"] += len(rows)
+        if progress_callback:
+            progress_callback(min(offset + batch_size, len(addresses)), len(addresses))
+
+    stats["seconds"] = time.perf_counter() - start
+    if stats["seconds"] > 0:
+        stats["addresses_per_second"] = stats["addresses"] / stats["seconds"]
+    print(f"Admin region backfill: {stats['addresses']} addresses, {stats['links']} links "
+          f"in {stats['seconds']:.2f}s ({stats['addresses_per_second']:.0f} addr/s)")
+    return stats
@@ -0,0 +1,200 @@
+"""
+archive_cache.py — Download-once, content-addressed store for dataset archives.
+
+All HDX admin levels ship in the same GDB zip, so every ingest used to
+download the full archive into memory and unpack it into a fresh temp dir
+that was never removed. Archives are now streamed to disk once and stored
+under their SHA-256; a small URL index maps each source URL to the archive it
+last produced, and each archive is extracted exactly once:
+
+    <cache_dir>/archives/<sha256>.zip       downloaded or seeded archive
+    <cache_dir>/urls/<sha256(url)>.json     {"url", "sha256", "size", "fetched_at"}
+    <cache_dir>/extracted/<sha256>/...      shared extraction of that archive
+
+    fetch_archive(url, expected_sha256)     -> local .zip path (no network if cached)
+    seed_archive(url, local_path, expected_sha256)
+                                            -> stores a local copy for offline ingestion
+    extracted_gdb(url, expected_sha256)     -> path of the .gdb folder inside the archive
+    clear_archive_cache()                   -> removes everything
+
+Partial downloads and extractions go to temp names inside the cache and are
+removed on failure, so an interrupted run never leaves a corrupt entry behind.
+The cache directory defaults to data/aux_cache and can be moved with the
+DBM_AUX_CACHE_DIR environment variable.
+"""
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+import zipfile
+from datetime import datetime, timezone
+
+CACHE_DIR  = os.environ.get("DBM_AUX_CACHE_DIR", os.path.join("data", "aux_cache"))
+CHUNK_SIZE = 1 << 20   # 1 MiB per streamed read/write
+
+# Serialises fetch + extract so two sessions never unpack the same archive twice
+_LOCK = threading.Lock()
+
+
+def _url_key(url):
+    return hashlib.sha256(url.encode("utf-8")).hexdigest()
+
+
+def _paths(cache_dir):
+    return (os.path.join(cache_dir, "archives"),
+            os.path.join(cache_dir, "urls"),
+            os.path.join(cache_dir, "extracted"))
+
+
+def _archive_path(cache_dir, sha256):
+    return os.path.join(_paths(cache_dir)[0], f"{sha256}.zip")
+
+
+def _load_index(cache_dir, url):
+    try:
+        with open(os.path.join(_paths(cache_dir)[1], f"{_url_key(url)}.json"), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _save_index(cache_dir, url, sha256, size):
+    urls_dir = _paths(cache_dir)[1]
+    os.makedirs(urls_dir, exist_ok=True)
+    entry = {
+        "url":        url,
+        "sha256":     sha256,
+        "size":       size,
+        "fetched_at": datetime.now(timezone.utc).isoformat(),
+    }
+    index_path = os.path.join(urls_dir, f"{_url_key(url)}.json")
+    with open(f"{index_path}.tmp", "w", encoding="utf-8") as f:
+        json.dump(entry, f)
+    os.replace(f"{index_path}.tmp", index_path)
+    return entry
+
+
+def _store(cache_dir, write_to, expected_sha256=None):
+    """
+    Writes an archive through write_to(file) into a temp file while hashing it,
+    then moves it to archives/<sha256>.zip. Returns (sha256, size).
+    """
+    archives_dir = _paths(cache_dir)[0]
+    os.makedirs(archives_dir, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=archives_dir, suffix=".part")
+    try:
+        h = hashlib.sha256()
+        size = 0
+        with os.fdopen(fd, "wb") as f:
+            for chunk in write_to():
+                h.update(chunk)
+                f.write(chunk)
+                size += len(chunk)
+        sha256 = h.hexdigest()
+        if expected_sha256 and sha256 != expected_sha256.lower():
+            raise ValueError(f"Checksum mismatch: expected {expected_sha256}, got {sha256}.")
+        os.replace(tmp_path, _archive_path(cache_dir, sha256))
+        return sha256, size
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def _cached_sha(cache_dir, url, expected_sha256=None):
+    """SHA-256 of the usable cached archive for url, or None."""
+    if expected_sha256 and os.path.exists(_archive_path(cache_dir, expected_sha256.lower())):
+        return expected_sha256.lower()
+    entry = _load_index(cache_dir, url)
+    if not entry or not os.path.exists(_archive_path(cache_dir, entry["sha256"])):
+        return None
+    if expected_sha256 and entry["sha256"] != expected_sha256.lower():
+        return None
+    return entry["sha256"]
+
+
+def _fetch_locked(cache_dir, url, expected_sha256):
+    sha256 = _cached_sha(cache_dir, url, expected_sha256)
+    if sha256:
+        return sha256
+
+    import requests
+    print(f"Downloading {url}...")
+    with requests.get(url, stream=True, timeout=120) as response:
+        response.raise_for_status()
+        sha256, size = _store(cache_dir, lambda: response.iter_content(CHUNK_SIZE), expected_sha256)
+    _save_index(cache_dir, url, sha256, size)
+    return sha256
+
+
+def fetch_archive(url, expected_sha256=None, cache_dir=None):
+    """
+    Returns the local path of the archive for url, downloading it (streamed to
+    disk) only if no cached copy exists. expected_sha256, when given, must
+    match the archive; a mismatching download raises ValueError.
+    """
+    cache_dir = cache_dir or CACHE_DIR
+    with _LOCK:
+        return _archive_path(cache_dir, _fetch_locked(cache_dir, url, expected_sha256))
+
+
+def seed_archive(url, local_path, expected_sha256=None, cache_dir=None):
+    """
+    Copies a locally available archive into the cache and records it for url,
+    so later ingestion of that URL needs no network. Returns the index entry.
+    """
+    cache_dir = cache_dir or CACHE_DIR
+
+    def read_chunks():
+        with open(local_path, "rb") as f:
+            for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+                yield chunk
+
+    with _LOCK:
+        sha256, size = _store(cache_dir, read_chunks, expected_sha256)
+        return _save_index(cache_dir, url, sha256, size)
+
+
+def _find_gdb(root):
+    for dirpath, dirnames, _ in os.walk(root):
+        for name in dirnames:
+            if name.endswith(".gdb"):
+                return os.path.join(dirpath, name)
+    return None
+
+
+def extracted_gdb(url, expected_sha256=None, cache_dir=None):
+    """
+    Returns the path of the .gdb folder inside the archive for url. The archive
+    is fetched via the cache and extracted once per checksum; later calls (for
+    other layers of the same GDB) reuse the same extraction.
+    """
+    cache_dir = cache_dir or CACHE_DIR
+    with _LOCK:
+        sha256 = _fetch_locked(cache_dir, url, expected_sha256)
+        extracted_dir = os.path.join(_paths(cache_dir)[2], sha256)
+
+        if not os.path.isdir(extracted_dir):
+            os.makedirs(_paths(cache_dir)[2], exist_ok=True)
+            tmp_dir = tempfile.mkdtemp(dir=_paths(cache_dir)[2], prefix=".tmp-")
+            try:
+                with zipfile.ZipFile(_archive_path(cache_dir, sha256)) as z:
+                    z.extractall(tmp_dir)
+                os.rename(tmp_dir, extracted_dir)
+            finally:
+                if os.path.isdir(tmp_dir):
+                    shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    gdb_path = _find_gdb(extracted_dir)
+    if gdb_path is None:
+        raise FileNotFoundError("No .gdb folder found in zip archive.")
+    return gdb_path
+
+
+def clear_archive_cache(cache_dir=None):
+    """Removes all cached archives, URL entries and extractions."""
+    cache_dir = cache_dir or CACHE_DIR
+    with _LOCK:
+        shutil.rmtree(cache_dir, ignore_errors=True)
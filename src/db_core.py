@@ -1,41 +1,482 @@
+import os
+import re
 import sqlite3
+import threading
 import uuid
+from contextlib import contextmanager
 from datetime import datetime
+from geom_cache import point_latlon, to_wkb, wkb_to_wkt, wkb_supported
 
 # ==================================================================
 # SCRIPT STRUCTURE & NAVIGATION
 # ==================================================================
 # Use the following keywords (Ctrl + F) to jump to specific sections:
 #
+# Connection Management       : [[DB_CONN]]
 # Table Creation              : [[TBL_GEN]]
 # Triggers                    : [[TRG_GEN]]
+# Indexes                     : [[IDX_GEN]]
+# Full-text Search            : [[FTS_GEN]]
+# Derived Property Status     : [[STATUS_GEN]]
 # Enumeration & Ref Data      : [[ENUM_REF]]
 # Python Supporting Functions : [[PY_API]]
 # ==================================================================
 
-def get_connection():
-    import os
+# [[DB_CONN]]
+# ------------------------------------------------------------------
+# DESIGN PATTERN: One pooled connection per thread
+# Streamlit renders every session in its own script thread, and a
+# single page render calls dozens of helpers. Instead of opening a
+# fresh sqlite3 connection per helper, each thread keeps one
+# connection that is created (and configured) on first use.
+#
+#   get_connection()      -> pooled connection for the current thread.
+#                            conn.close() only releases the unit of
+#                            work (rollback of uncommitted changes),
+#                            so existing helpers keep working as-is;
+#                            inside db_session() it is a no-op.
+#   db_session()          -> context manager: commit on success,
+#                            rollback on error. Nested sessions join
+#                            the outermost one.
+#   reset_connection_pool -> invalidates every pooled connection, e.g.
+#                            after the DB file was replaced on disk.
+# ------------------------------------------------------------------
+_POOL_LOCK       = threading.Lock()
+_POOL_GENERATION = 0
+_POOL_LOCAL      = threading.local()
+_DB_PATH         = None
+_PRAGMAS         = None
+
+
+class _PooledConnection(sqlite3.Connection):
+    """sqlite3 connection whose close() returns it to the per-thread pool."""
+
+    def close(self):
+        # Inside db_session() the unit of work belongs to the outermost
+        # session: a legacy helper's close() must not roll it back.
+        if getattr(_POOL_LOCAL, "depth", 0) > 0:
+            return
+        # Mirror sqlite3 close semantics: uncommitted work is discarded
+        if self.in_transaction:
+            self.rollback()
+
+    def _close(self):
+        super().close()
+
+
+def get_db_path():
+    """Resolves the database file path once per process (secrets are static)."""
+    global _DB_PATH
+    if _DB_PATH is None:
+        try:
+            import streamlit as st
+            # Try to access secrets
+            run_time = st.secrets.get("RUN_TIME", "cloud")
+            if run_time == "local":
+                db_path = os.path.join("data", "database_dev.sqlite")
+            else:
+                db_path = st.secrets.get("DB_FILE_PATH", os.path.join("data", "database.sqlite"))
+        except Exception:
+            # Fallback for local execution without streamlit secrets
+            db_path = os.path.join("data", "database_dev.sqlite")
+        _DB_PATH = db_path
+    return _DB_PATH
+
+
+# Connection PRAGMA profile — applied once to every pooled connection.
+# Individual values can be overridden in secrets.toml:
+#     [SQLITE_PRAGMAS]
+#     cache_size = -64000
+# journal_mode=WAL lets readers and a writer work concurrently, so several
+# Streamlit sessions saving at once no longer hit "database is locked".
+PRAGMA_PROFILE = {
+    "busy_timeout": 5000,         # ms to wait on a lock before failing (set first)
+    "foreign_keys": "ON",
+    "journal_mode": "WAL",        # persistent in the file once converted
+    "synchronous":  "NORMAL",     # safe with WAL; fsync only at checkpoints
+    "cache_size":   -16000,       # negative = KiB -> ~16 MB page cache
+    "mmap_size":    268435456,    # 256 MB memory-mapped reads
+    "temp_store":   "MEMORY",
+}
+
+
+def get_pragma_profile():
+    """Returns PRAGMA_PROFILE merged with any [SQLITE_PRAGMAS] overrides from secrets."""
+    profile = dict(PRAGMA_PROFILE)
     try:
         import streamlit as st
-        # Try to access secrets
-        run_time = st.secrets.get("RUN_TIME", "cloud")
-        if run_time == "local":
-             db_path = os.path.join("data", "database_dev.sqlite")
-        else:
-             db_path = st.secrets.get("DB_FILE_PATH", os.path.join("data", "database.sqlite"))
+        overrides = st.secrets.get("SQLITE_PRAGMAS", {})
+        profile.update({k.lower(): v for k, v in dict(overrides).items()})
     except Exception:
-        # Fallback for local execution without streamlit secrets
-        db_path = os.path.join("data", "database_dev.sqlite")
-    
-    return sqlite3.connect(db_path)
+        pass
+    return profile
+
+
+def apply_pragma_profile(conn, profile=None):
+    """Applies a PRAGMA profile (name -> value) to an open connection."""
+    profile = get_pragma_profile() if profile is None else profile
+    for name, value in profile.items():
+        if not str(name).replace("_", "").isalnum() or not str(value).lstrip("-").isalnum():
+            raise ValueError(f"Invalid PRAGMA setting: {name!r} = {value!r}")
+        conn.execute(f"PRAGMA {name} = {value};")
+
+
+def _configure_connection(conn):
+    """One-time setup applied to every new pooled connection."""
+    global _PRAGMAS
+    if _PRAGMAS is None:
+        _PRAGMAS = get_pragma_profile()
+    apply_pragma_profile(conn, _PRAGMAS)
+
+
+def checkpoint_database():
+    """
+    Folds the WAL file back into the main database file.
+    Must run before the raw .sqlite file is read for upload, otherwise the
+    most recent commits would still live only in the -wal sidecar file.
+    """
+    conn = get_connection()
+    conn.execute("PRAGMA wal_checkpoint(TRUNCATE);")
+
+
+def get_connection():
+    """Returns the pooled connection for the current thread, opening it on first use."""
+    conn = getattr(_POOL_LOCAL, "conn", None)
+    if conn is None or getattr(_POOL_LOCAL, "generation", None) != _POOL_GENERATION:
+        if conn is not None:
+            conn._close()
+        conn = sqlite3.connect(get_db_path(), factory=_PooledConnection)
+        _configure_connection(conn)
+        _POOL_LOCAL.conn       = conn
+        _POOL_LOCAL.generation = _POOL_GENERATION
+        _POOL_LOCAL.depth      = 0
+    return conn
+
+
+@contextmanager
+def db_session():
+    """
+    Yields the pooled connection as a single unit of work.
+    Commits when the outermost block exits cleanly, rolls back if it raises.
+
+    Usage:
+        with db_session() as conn:
+            conn.execute("UPDATE ...", params)
+    """
+    conn = get_connection()
+    _POOL_LOCAL.depth += 1
+    try:
+        yield conn
+        if _POOL_LOCAL.depth == 1:
+            conn.commit()
+    except Exception:
+        if _POOL_LOCAL.depth == 1:
+            conn.rollback()
+        raise
+    finally:
+        _POOL_LOCAL.depth -= 1
+
+
+def reset_connection_pool():
+    """
+    Invalidates all pooled connections (every thread reopens on next use)
+    and forces the DB path and PRAGMA profile to be resolved again.
+    """
+    global _POOL_GENERATION, _DB_PATH, _PRAGMAS
+    with _POOL_LOCK:
+        _POOL_GENERATION += 1
+        _DB_PATH = None
+        _PRAGMAS = None
+
+
+# (index name, table, column list) — created/migrated by init_db() [[IDX_GEN]]
+CORE_INDEXES = [
+    # Property level
+    ("idx_core_property_geom",          "TBL_CORE_PROPERTY",            "ID_PROPERTY_GEOM"),
+    ("idx_core_property_cadastral",     "TBL_CORE_PROPERTY",            "ID_CADASTRAL_NO"),
+    ("idx_core_legal_fk_property",      "TBL_CORE_LEGAL_OWNERSHIP",     "FK_PROPERTY_ID"),
+    ("idx_core_address_fk_property",    "TBL_CORE_ADDRESS",             "FK_PROPERTY_ID"),
+    ("idx_core_address_geom",           "TBL_CORE_ADDRESS",             "ID_ADDR_GEOM"),
+    ("idx_core_landplot_fk_property",   "TBL_CORE_LANDPLOT",            "FK_PROPERTY_ID"),
+    ("idx_core_governance_fk_property", "TBL_CORE_GOVERNANCE",          "FK_PROPERTY_ID"),
+    ("idx_core_building_fk_property",   "TBL_CORE_BUILDING",            "FK_PROPERTY_ID"),
+    ("idx_core_building_geom",          "TBL_CORE_BUILDING",            "ID_BUILDING_GEOM"),
+    # Building level
+    ("idx_core_inspection_fk_bld",      "TBL_CORE_INSPECTION",          "FK_BLD_ID"),
+    ("idx_core_media_fk_bld",           "TBL_CORE_BUILDING_MEDIA",      "FK_BLD_ID"),
+    ("idx_core_tech_audit_fk_bld",      "TBL_CORE_BUILDING_TECH_AUDIT", "FK_BLD_ID"),
+    ("idx_core_suitability_fk_bld",     "TBL_CORE_SUITABILITY",         "FK_BUILDING_ID"),
+    ("idx_core_occupancy_fk_bld",       "TBL_CORE_OCCUPANCY",           "FK_BUILDING_ID"),
+    ("idx_core_safety_fk_bld",          "TBL_CORE_SAFETY",              "FK_BUILDING_ID"),
+    ("idx_core_allocation_fk_bld",      "TBL_CORE_ALLOCATION",          "FK_BUILDING_ID"),
+    # Link tables
+    ("idx_link_allocation_fk_bld",      "TBL_LINK_ALLOCATION",          "FK_BUILDING_ID"),
+    ("idx_link_allocation_ext_sys",     "TBL_LINK_ALLOCATION",          "EXT_SYSTEM_NAME"),
+    ("idx_link_governance_fk_property", "TBL_LINK_GOVERNANCE",          "FK_PROPERTY_ID"),
+    ("idx_link_governance_ext_sys",     "TBL_LINK_GOVERNANCE",          "EXT_SYSTEM_NAME"),
+    ("idx_link_addr_admin_fk_addr",     "TBL_LINK_ADDRESS_ADMIN_REGION", "FK_SYS_ADDR_ID"),
+    # Property list (list_properties): keyset order, optionally per admin unit
+    ("idx_core_property_list",          "TBL_CORE_PROPERTY",            "IFNULL(ID_CADASTRAL_NO, ''), SYS_PROPERTY_ID"),
+    ("idx_core_property_admin_list",    "TBL_CORE_PROPERTY",            "ID_ADMIN_UNIT, IFNULL(ID_CADASTRAL_NO, ''), SYS_PROPERTY_ID"),
+    ("idx_core_address_city",           "TBL_CORE_ADDRESS",             "CITY COLLATE NOCASE, FK_PROPERTY_ID"),
+    ("idx_core_building_fieldwork",     "TBL_CORE_BUILDING",            "BLD_FIELDWORK_STATUS, FK_PROPERTY_ID"),
+]
+
+
+# [[FTS_GEN]]
+# ------------------------------------------------------------------
+# Full-text property search (SQLite FTS5)
+# One search document per property: cadastral number, address lines /
+# city / postcode, building use descriptions and inspection + safety
+# notes. Triggers on the source tables rebuild a property's document
+# whenever one of those columns changes, so no updater has to know
+# about the index.
+#
+# unicode61 folds case for Cyrillic and Latin alike and remove_diacritics
+# lets "київ" match "Київ" and "Kyiv" match "kyiv"; prefix indexes keep
+# "Хрещ*" style queries fast. FTS5 has no Ukrainian stemmer, so prefix
+# matching stands in for one.
+#
+# The FTS rowid comes from TBL_SEARCH_PROPERTY_KEY (INTEGER PRIMARY KEY)
+# rather than TBL_CORE_PROPERTY's implicit rowid, which VACUUM may renumber.
+# ------------------------------------------------------------------
+SEARCH_TABLE     = "TBL_SEARCH_PROPERTY"
+SEARCH_KEY_TABLE = "TBL_SEARCH_PROPERTY_KEY"
+
+_INSPECTION_NOTE_COLUMNS = (
+    "INSP_DEVIATIONS_DESC", "INSP_DAMAGE_DESC", "INSP_ELECTRICITY_DESC", "INSP_WATER_DESC",
+    "INSP_WASTEWATER_DESC", "INSP_GAS_DESC", "INSP_HEATING_DESC",
+)
+
+
+def _concat_sql(columns, alias):
+    return " || ' ' || ".join(f"IFNULL({alias}.{col}, '')" for col in columns)
+
+
+def _search_document_sql(condition):
+    """INSERT of the search documents of the properties matching condition (aliases p, k)."""
+    return f'''
+            INSERT INTO {SEARCH_TABLE} (rowid, PROPERTY_ID, CADASTRAL_NO, ADDRESS, BUILDING_USE, NOTES)
+            SELECT k.SEARCH_ROWID, p.SYS_PROPERTY_ID, p.ID_CADASTRAL_NO,
+                (SELECT group_concat({_concat_sql(("ADDR_LINE1", "ADDR_LINE2", "CITY", "POSTCODE"), "a")}, ' ')
+                 FROM TBL_CORE_ADDRESS a WHERE a.FK_PROPERTY_ID = p.SYS_PROPERTY_ID),
+                (SELECT group_concat(b.BLD_USE_DESC, ' ')
+                 FROM TBL_CORE_BUILDING b WHERE b.FK_PROPERTY_ID = p.SYS_PROPERTY_ID),
+                IFNULL((SELECT group_concat({_concat_sql(_INSPECTION_NOTE_COLUMNS, "i")}, ' ')
+                        FROM TBL_CORE_INSPECTION i JOIN TBL_CORE_BUILDING b ON b.SYS_BLD_ID = i.FK_BLD_ID
+                        WHERE b.FK_PROPERTY_ID = p.SYS_PROPERTY_ID), '') || ' ' ||
+                IFNULL((SELECT group_concat(sa.SAFE_NOTES, ' ')
+                        FROM TBL_CORE_SAFETY sa JOIN TBL_CORE_BUILDING b ON b.SYS_BLD_ID = sa.FK_BUILDING_ID
+                        WHERE b.FK_PROPERTY_ID = p.SYS_PROPERTY_ID), '')
+            FROM TBL_CORE_PROPERTY p
+            JOIN {SEARCH_KEY_TABLE} k ON k.PROPERTY_ID = p.SYS_PROPERTY_ID
+            WHERE {condition};
+    '''
+
+
+def _search_refresh_sql(pid):
+    """Trigger body that rebuilds the search document of property <pid> (an SQL expression)."""
+    return f'''
+            INSERT OR IGNORE INTO {SEARCH_KEY_TABLE} (PROPERTY_ID)
+            SELECT SYS_PROPERTY_ID FROM TBL_CORE_PROPERTY WHERE SYS_PROPERTY_ID = {pid};
+            DELETE FROM {SEARCH_TABLE}
+            WHERE rowid = (SELECT SEARCH_ROWID FROM {SEARCH_KEY_TABLE} WHERE PROPERTY_ID = {pid});
+            {_search_document_sql(f"p.SYS_PROPERTY_ID = {pid}")}
+    '''
+
+
+# (table, indexed columns, property id expression; {row} is NEW or OLD)
+# Each source gets an insert, update and delete trigger. The WHEN clauses
+# skip rows whose indexed columns are empty or unchanged, so skeleton
+# inserts and form saves that do not touch searchable text cost nothing.
+SEARCH_SOURCES = [
+    ("TBL_CORE_ADDRESS",    ("ADDR_LINE1", "ADDR_LINE2", "CITY", "POSTCODE"), "{row}.FK_PROPERTY_ID"),
+    ("TBL_CORE_BUILDING",   ("BLD_USE_DESC",),                                "{row}.FK_PROPERTY_ID"),
+    ("TBL_CORE_INSPECTION", _INSPECTION_NOTE_COLUMNS,
+        "(SELECT FK_PROPERTY_ID FROM TBL_CORE_BUILDING WHERE SYS_BLD_ID = {row}.FK_BLD_ID)"),
+    ("TBL_CORE_SAFETY",     ("SAFE_NOTES",),
+        "(SELECT FK_PROPERTY_ID FROM TBL_CORE_BUILDING WHERE SYS_BLD_ID = {row}.FK_BUILDING_ID)"),
+]
+
+
+def _source_triggers(prefix, sources, refresh_sql):
+    """
+    Insert/update/delete triggers that run refresh_sql(property id) for each
+    (table, columns, property id expression) source. WHEN clauses skip rows
+    whose columns are all NULL (insert/delete) or unchanged (update).
+    """
+    triggers = []
+    for table, columns, pid in sources:
+        short = table.replace("TBL_CORE_", "").lower()
+        has_new = f"COALESCE({', '.join('NEW.' + col for col in columns)}, NULL) IS NOT NULL"
+        has_old = f"COALESCE({', '.join('OLD.' + col for col in columns)}, NULL) IS NOT NULL"
+        changed = " OR ".join(f"OLD.{col} IS NOT NEW.{col}" for col in columns)
+        triggers += [
+            (f"trg_{prefix}_{short}_ins", f"AFTER INSERT ON {table} WHEN {has_new} "
+                                          f"BEGIN {refresh_sql(pid.format(row='NEW'))} END"),
+            (f"trg_{prefix}_{short}_upd", f"AFTER UPDATE OF {', '.join(columns)} ON {table} WHEN {changed} "
+                                          f"BEGIN {refresh_sql(pid.format(row='NEW'))} END"),
+            (f"trg_{prefix}_{short}_del", f"AFTER DELETE ON {table} WHEN {has_old} "
+                                          f"BEGIN {refresh_sql(pid.format(row='OLD'))} END"),
+        ]
+    return triggers
+
+
+def _search_triggers():
+    """(name, CREATE TRIGGER body) for every search sync trigger."""
+    return [
+        ("trg_search_property_ins",
+         f"AFTER INSERT ON TBL_CORE_PROPERTY BEGIN {_search_refresh_sql('NEW.SYS_PROPERTY_ID')} END"),
+        ("trg_search_property_upd",
+         "AFTER UPDATE OF ID_CADASTRAL_NO ON TBL_CORE_PROPERTY "
+         "WHEN OLD.ID_CADASTRAL_NO IS NOT NEW.ID_CADASTRAL_NO "
+         f"BEGIN {_search_refresh_sql('NEW.SYS_PROPERTY_ID')} END"),
+        ("trg_search_property_del", f'''AFTER DELETE ON TBL_CORE_PROPERTY BEGIN
+            DELETE FROM {SEARCH_TABLE}
+            WHERE rowid = (SELECT SEARCH_ROWID FROM {SEARCH_KEY_TABLE} WHERE PROPERTY_ID = OLD.SYS_PROPERTY_ID);
+            DELETE FROM {SEARCH_KEY_TABLE} WHERE PROPERTY_ID = OLD.SYS_PROPERTY_ID;
+        END'''),
+    ] + _source_triggers("search", SEARCH_SOURCES, _search_refresh_sql)
+
+
+def _init_search_index(c):
+    """
+    Creates the FTS5 table, its key table and the sync triggers, and builds
+    documents for properties that have none yet (existing databases).
+    Skipped with a message if this SQLite build lacks FTS5.
+    """
+    try:
+        c.execute(f'''
+            CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} USING fts5(
+                PROPERTY_ID UNINDEXED, CADASTRAL_NO, ADDRESS, BUILDING_USE, NOTES,
+                tokenize = "unicode61 remove_diacritics 2",
+                prefix = '2 3'
+            )
+        ''')
+    except sqlite3.OperationalError as e:
+        print(f"Full-text search disabled (FTS5 unavailable): {e}")
+        return
+
+    c.execute(f'''
+        CREATE TABLE IF NOT EXISTS {SEARCH_KEY_TABLE} (
+            SEARCH_ROWID INTEGER PRIMARY KEY,  -- rowid of the document in {SEARCH_TABLE}
+            PROPERTY_ID  TEXT UNIQUE NOT NULL
+        )
+    ''')
+    for name, body in _search_triggers():
+        c.execute(f"CREATE TRIGGER IF NOT EXISTS {name} {body};")
+
+    # Backfill: one set-based pass for properties without a document
+    c.execute(f"INSERT OR IGNORE INTO {SEARCH_KEY_TABLE} (PROPERTY_ID) SELECT SYS_PROPERTY_ID FROM TBL_CORE_PROPERTY")
+    c.execute(_search_document_sql(f"k.SEARCH_ROWID NOT IN (SELECT rowid FROM {SEARCH_TABLE})"))
+    if c.rowcount > 0:
+        print(f"Indexed {c.rowcount} properties for full-text search")
+
+
+# [[STATUS_GEN]]
+# ------------------------------------------------------------------
+# Materialised property completeness
+# TBL_SYS_PROPERTY_STATUS holds, per property, the checks of the
+# inspection page's get_skeleton_status(): ownership type, address text,
+# address geometry and commission decision. Triggers on the legal,
+# address and governance tables recompute a property's row when one of
+# those columns changes, so status filters and counts are indexed
+# lookups instead of a skeleton fetch per property.
+#
+#   STATUS: READY    nothing missing
+#           PARTIAL  1-2 items missing
+#           SKELETON 3 or more missing
+# ------------------------------------------------------------------
+STATUS_TABLE = "TBL_SYS_PROPERTY_STATUS"
+COMPLETENESS_STATUSES = ("READY", "PARTIAL", "SKELETON")
+
+_ADDR_TEXT_MISSING_SQL = "(a.ADDR_LINE1 IS NULL OR a.ADDR_LINE1 IN ('', 'UNKNOWN'))"
+
+
+def _status_rows_sql(condition):
+    """INSERT OR REPLACE of the status rows of the properties matching condition (alias p)."""
+    return f'''
+            INSERT OR REPLACE INTO {STATUS_TABLE} (
+                FK_PROPERTY_ID, MISSING_LEGAL, MISSING_ADDRESS, MISSING_GEOMETRY, MISSING_GOV,
+                MISSING_COUNT, STATUS, UPDATED_AT
+            )
+            SELECT SYS_PROPERTY_ID, ML, MA, MG, MV, ML + MA + MG + MV,
+                CASE WHEN ML + MA + MG + MV = 0 THEN 'READY'
+                     WHEN ML + MA + MG + MV >= 3 THEN 'SKELETON'
+                     ELSE 'PARTIAL' END,
+                datetime('now')
+            FROM (
+                SELECT p.SYS_PROPERTY_ID,
+                    IFNULL((SELECT l.OWN_TYPE IS NULL OR l.OWN_TYPE IN ('', 'UNKNOWN')
+                            FROM TBL_CORE_LEGAL_OWNERSHIP l
+                            WHERE l.FK_PROPERTY_ID = p.SYS_PROPERTY_ID LIMIT 1), 1) AS ML,
+                    IFNULL((SELECT {_ADDR_TEXT_MISSING_SQL}
+                            FROM TBL_CORE_ADDRESS a
+                            WHERE a.FK_PROPERTY_ID = p.SYS_PROPERTY_ID LIMIT 1), 1) AS MA,
+                    IFNULL((SELECT NOT {_ADDR_TEXT_MISSING_SQL} AND IFNULL(a.ADDR_GEOM_CREATED, 0) = 0
+                            FROM TBL_CORE_ADDRESS a
+                            WHERE a.FK_PROPERTY_ID = p.SYS_PROPERTY_ID LIMIT 1), 0) AS MG,
+                    IFNULL((SELECT g.GOV_COMMISSION_DEC IS NULL OR g.GOV_COMMISSION_DEC = ''
+                            FROM TBL_CORE_GOVERNANCE g
+                            WHERE g.FK_PROPERTY_ID = p.SYS_PROPERTY_ID LIMIT 1), 1) AS MV
+                FROM TBL_CORE_PROPERTY p
+                WHERE {condition}
+            );
+    '''
+
+
+def _status_refresh_sql(pid):
+    return _status_rows_sql(f"p.SYS_PROPERTY_ID = {pid}")
+
+
+# (table, checked columns, property id expression; {row} is NEW or OLD)
+STATUS_SOURCES = [
+    ("TBL_CORE_LEGAL_OWNERSHIP", ("OWN_TYPE",),                        "{row}.FK_PROPERTY_ID"),
+    ("TBL_CORE_ADDRESS",         ("ADDR_LINE1", "ADDR_GEOM_CREATED"),  "{row}.FK_PROPERTY_ID"),
+    ("TBL_CORE_GOVERNANCE",      ("GOV_COMMISSION_DEC",),              "{row}.FK_PROPERTY_ID"),
+]
+
+
+def _init_status_table(c):
+    """Creates the status table + triggers and fills rows for properties without one."""
+    c.execute(f'''
+        CREATE TABLE IF NOT EXISTS {STATUS_TABLE} (
+            FK_PROPERTY_ID   TEXT PRIMARY KEY,
+            MISSING_LEGAL    INTEGER NOT NULL,  -- ownership type not given
+            MISSING_ADDRESS  INTEGER NOT NULL,  -- address line not given
+            MISSING_GEOMETRY INTEGER NOT NULL,  -- address given, location not set
+            MISSING_GOV      INTEGER NOT NULL,  -- commission decision not recorded
+            MISSING_COUNT    INTEGER NOT NULL,
+            STATUS           TEXT NOT NULL,     -- READY / PARTIAL / SKELETON
+            UPDATED_AT       TEXT
+        )
+    ''')
+    c.execute(f"CREATE INDEX IF NOT EXISTS idx_sys_property_status ON {STATUS_TABLE} (STATUS, FK_PROPERTY_ID)")
+
+    triggers = [
+        ("trg_status_property_ins",
+         f"AFTER INSERT ON TBL_CORE_PROPERTY BEGIN {_status_refresh_sql('NEW.SYS_PROPERTY_ID')} END"),
+        ("trg_status_property_del",
+         f"AFTER DELETE ON TBL_CORE_PROPERTY BEGIN "
+         f"DELETE FROM {STATUS_TABLE} WHERE FK_PROPERTY_ID = OLD.SYS_PROPERTY_ID; END"),
+    ] + _source_triggers("status", STATUS_SOURCES, _status_refresh_sql)
+    for name, body in triggers:
+        c.execute(f"CREATE TRIGGER IF NOT EXISTS {name} {body};")
+
+    c.execute(_status_rows_sql(
+        f"NOT EXISTS (SELECT 1 FROM {STATUS_TABLE} s WHERE s.FK_PROPERTY_ID = p.SYS_PROPERTY_ID)"
+    ))
+    if c.rowcount > 0:
+        print(f"Computed completeness status for {c.rowcount} properties")
+
 
 def init_db():
     conn = get_connection()
     c = conn.cursor()
-    
-    # Enable foreign keys
-    c.execute('PRAGMA foreign_keys = ON;')
-    
+
+    # Foreign keys and the rest of PRAGMA_PROFILE are applied per connection
+    # in _configure_connection(), so every pooled connection gets them.
+
     # [[TBL_GEN]]
     # ------------------------------------------------------------------
     # Table Generation SQL statements:
@@ -74,6 +515,7 @@ def init_db():
             GEOM_ID TEXT PRIMARY KEY,               -- UUID, referenced by other tables
             GEOM_TYPE TEXT NOT NULL,                -- POINT | POLYGON | LINESTRING
             GEOM_WKT TEXT,                          -- Geometry in WKT format, NULL until created
+            GEOM_WKB BLOB,                          -- Same geometry as WKB (preferred by readers)
             CRS_EPSG INTEGER DEFAULT 4326,          -- Coordinate reference system (WGS84 default)
             SOURCE TEXT,                            -- e.g. Field survey, OSM, Satellite, Admin data
             CAPTURE_METHOD TEXT,                    -- GPS, Digitised, Imported
@@ -536,6 +978,9 @@ def init_db():
             ("SAFE_CLASS", "INTEGER DEFAULT 0"),
             ("SAFE_CAT", "INTEGER DEFAULT 0"),
             ("SAFE_NOTES", "TEXT")
+        ],
+        "TBL_CORE_GEOMETRY": [
+            ("GEOM_WKB", "BLOB")
         ]
     }
 
@@ -546,6 +991,19 @@ def init_db():
             if col_name not in existing_cols:
                 c.execute(f"ALTER TABLE {table} ADD COLUMN {col_name} {col_def}")
 
+    # --- Geometry Storage Migration ---
+    # Backfill GEOM_WKB for rows written before the column existed
+    # (needs shapely; without it the backfill waits for a run that has it).
+    # WKT that does not parse gets an empty blob: readers treat it like NULL
+    # and fall back to the WKT, but the row is not re-parsed on every run.
+    if wkb_supported():
+        c.execute("SELECT GEOM_ID, GEOM_WKT FROM TBL_CORE_GEOMETRY WHERE GEOM_WKB IS NULL AND GEOM_WKT IS NOT NULL")
+        wkb_rows = [(to_wkb(wkt) or b"", geom_id) for geom_id, wkt in c.fetchall()]
+        if wkb_rows:
+            c.executemany("UPDATE TBL_CORE_GEOMETRY SET GEOM_WKB = ? WHERE GEOM_ID = ?", wkb_rows)
+            failed = sum(1 for wkb, _ in wkb_rows if not wkb)
+            print(f"Backfilled GEOM_WKB for {len(wkb_rows) - failed} geometries ({failed} unparseable WKT marked)")
+
     # --- Media Schema Migration ---
     # Migration: TBL_CORE_INSPECTION_MEDIA -> TBL_CORE_BUILDING_MEDIA
     c.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='TBL_CORE_INSPECTION_MEDIA'")
@@ -568,6 +1026,17 @@ def init_db():
         except Exception as e:
             print(f"Migration error (Media): {e}")
 
+    # [[IDX_GEN]]
+    # ------------------------------------------------------------------
+    # Foreign-key & lookup indexes
+    # SQLite does not index FK columns automatically. Without these, the
+    # skeleton loaders, the building join and the delete cascades (and
+    # the FK checks on every parent delete) scan whole child tables.
+    # CREATE INDEX IF NOT EXISTS doubles as the migration for existing DBs.
+    # ------------------------------------------------------------------
+    for idx_name, table, columns in CORE_INDEXES:
+        c.execute(f"CREATE INDEX IF NOT EXISTS {idx_name} ON {table} ({columns})")
+
 # [[TRG_GEN]]
     # Triggers & Business Logic SQL
     # ------------------------------------------------------------------
@@ -636,6 +1105,12 @@ def init_db():
     # ''')
     # ------------------------------------------------------------------
 
+    # Full-text search index + its sync triggers [[FTS_GEN]]
+    _init_search_index(c)
+
+    # Property completeness table + its triggers [[STATUS_GEN]]
+    _init_status_table(c)
+
     conn.commit()
     conn.close()
 
@@ -643,6 +1118,59 @@ def init_db():
 
 from db_enums import _ENUM_SEED
 
+# ------------------------------------------------------------------
+# Enum catalogue cache
+# Selectboxes call get_enum_options() dozens of times per rerun for
+# data that only changes when the seeders write to it. The whole
+# catalogue is loaded in one query and served from memory until the
+# version stamp moves: seed_enums()/seed_admin_units() bump it when they
+# change rows, and a swapped DB file (pool generation) also invalidates.
+# ------------------------------------------------------------------
+_ENUM_LOCK      = threading.Lock()
+_ENUM_VERSION   = 0
+_ENUM_CATALOGUE = {"key": None, "groups": {}}
+
+
+def bump_enum_version():
+    """Invalidates the in-memory enum catalogue (call after writing TBL_REF_ENUM*)."""
+    global _ENUM_VERSION
+    with _ENUM_LOCK:
+        _ENUM_VERSION += 1
+
+
+def _get_enum_catalogue():
+    """
+    Returns {ENUM_GROUP: [(ENUM_CODE, {LANGUAGE_CODE: ENUM_LABEL}), ...]}
+    for all active enums, in display order. Reloaded when the stamp changes.
+    """
+    key = (_ENUM_VERSION, _POOL_GENERATION)
+    if _ENUM_CATALOGUE["key"] == key:
+        return _ENUM_CATALOGUE["groups"]
+
+    conn = get_connection()
+    c = conn.cursor()
+    c.execute('''
+        SELECT e.ENUM_GROUP, e.ENUM_CODE, i.LANGUAGE_CODE, COALESCE(i.ENUM_LABEL, e.ENUM_CODE)
+        FROM TBL_REF_ENUM e
+        LEFT JOIN TBL_REF_ENUM_I18N i ON i.FK_ENUM_ID = e.SYS_ENUM_ID
+        WHERE e.IS_ACTIVE = 1
+        ORDER BY e.ENUM_GROUP, e.SORT_ORDER, e.ENUM_CODE
+    ''')
+    rows = c.fetchall()
+    conn.close()
+
+    groups = {}
+    for group, code, lang, label in rows:
+        entries = groups.setdefault(group, [])
+        if not entries or entries[-1][0] != code:
+            entries.append((code, {}))
+        if lang is not None:
+            entries[-1][1][lang] = label
+
+    with _ENUM_LOCK:
+        _ENUM_CATALOGUE.update(key=key, groups=groups)
+    return groups
+
 
 def seed_admin_units():
     """
@@ -667,6 +1195,7 @@ def seed_admin_units():
     
     conn = get_connection()
     c = conn.cursor()
+    changes_before = conn.total_changes
     
     # 1. Seed OBLAST_SUFFIX (Metadata for translation)
     suffix_id = str(uuid.uuid5(uuid.NAMESPACE_DNS, "OBLAST_SUFFIX"))
@@ -700,6 +1229,7 @@ def seed_admin_units():
             INSERT INTO TBL_REF_ENUM (SYS_ENUM_ID, ENUM_GROUP, ENUM_CODE, SORT_ORDER)
             VALUES (?, 'ADMIN_UNIT', ?, ?)
             ON CONFLICT(SYS_ENUM_ID) DO UPDATE SET SORT_ORDER = excluded.SORT_ORDER
+            WHERE SORT_ORDER IS NOT excluded.SORT_ORDER   -- identical rows are not a change
         ''', (enum_id, pcode, sort_order))
         
         # English translation (Label + Suffix)
@@ -719,6 +1249,8 @@ def seed_admin_units():
         ''', (i18n_id_ua, enum_id, label_ua))
         
     conn.commit()
+    if conn.total_changes != changes_before:
+        bump_enum_version()
     conn.close()
     return True
 
@@ -728,6 +1260,7 @@ def seed_enums():
     """
     conn = get_connection()
     c = conn.cursor()
+    changes_before = conn.total_changes
 
     for group, code, sort_order, label, description, is_active in _ENUM_SEED:
         enum_id = str(uuid.uuid5(uuid.NAMESPACE_DNS, f"{group}.{code}"))
@@ -745,6 +1278,8 @@ def seed_enums():
         ''', (i18n_id, enum_id, label, description))
 
     conn.commit()
+    if conn.total_changes != changes_before:
+        bump_enum_version()
     conn.close()
     
     # Import Admin Units from external DB
@@ -771,21 +1306,7 @@ def get_enum_options(group: str, lang: str = "en") -> list:
         labels = [o[1] for o in options]
         selected_code = codes[st.selectbox("Building Type", range(len(labels)), format_func=lambda i: labels[i])]
     """
-    conn = get_connection()
-    c = conn.cursor()
-    c.execute('''
-        SELECT e.ENUM_CODE, COALESCE(i.ENUM_LABEL, e.ENUM_CODE) AS LABEL
-        FROM TBL_REF_ENUM e
-        LEFT JOIN TBL_REF_ENUM_I18N i
-            ON i.FK_ENUM_ID = e.SYS_ENUM_ID
-           AND i.LANGUAGE_CODE = ?
-        WHERE e.ENUM_GROUP = ?
-          AND e.IS_ACTIVE = 1
-        ORDER BY e.SORT_ORDER, e.ENUM_CODE
-    ''', (lang, group))
-    rows = c.fetchall()
-    conn.close()
-    return rows
+    return [(code, labels.get(lang, code)) for code, labels in _get_enum_catalogue().get(group, [])]
 
 def add_user(email, password_hash, role):
     conn = get_connection()
@@ -846,7 +1367,417 @@ def clear_first_login_flag(email):
     finally:
         conn.close()
 
+# ------------------------------------------------------------------
+# Property aggregate (read side of the skeleton)
+# The 1:1 skeleton tables are read in one joined SELECT; sentinel
+# columns (_T_<KEY>) mark where each table's columns start, so the
+# sqlite3.Row can be split back into one dict per table.
+# ------------------------------------------------------------------
+_AGGREGATE_PARTS = [
+    # (result key,    alias, table)
+    ("property_dict", "p",  "TBL_CORE_PROPERTY"),
+    ("legal_dict",    "l",  "TBL_CORE_LEGAL_OWNERSHIP"),
+    ("address_dict",  "a",  "TBL_CORE_ADDRESS"),
+    ("land_dict",     "lp", "TBL_CORE_LANDPLOT"),
+    ("gov_dict",      "g",  "TBL_CORE_GOVERNANCE"),
+]
+
+_AGGREGATE_SKELETON_SQL = "SELECT " + ", ".join(
+    f"NULL AS _T_{key.upper()}, {alias}.*" for key, alias, _ in _AGGREGATE_PARTS
+) + " FROM TBL_CORE_PROPERTY p " + " ".join(
+    f"LEFT JOIN {table} {alias} ON {alias}.FK_PROPERTY_ID = p.SYS_PROPERTY_ID"
+    for _, alias, table in _AGGREGATE_PARTS[1:]
+) + " WHERE p.SYS_PROPERTY_ID = ?"
+
+_AGGREGATE_BUILDINGS_SQL = """
+    SELECT b.*, 
+           i.INSP_ROUTINE_REPAIR, i.INSP_MAJOR_REPAIR, 
+           i.INSP_RECONSTRUCTION, i.INSP_REFITTING,
+           s.SUIT_IDP_YES, s.SUIT_AFTER_RECON, s.SUIT_AFTER_REFIT, s.SUIT_UNSUITABLE,
+           sa.SAFE_PWD_ACCESS, sa.SAFE_FIRE, sa.SAFE_SANITARY, sa.SAFE_CIVIL_DEF,
+           sa.SAFE_HAZARD_ZONE, sa.SAFE_CLASS, sa.SAFE_CAT, sa.SAFE_NOTES,
+           ta.*
+    FROM TBL_CORE_BUILDING b
+    LEFT JOIN TBL_CORE_INSPECTION i ON b.SYS_BLD_ID = i.FK_BLD_ID
+    LEFT JOIN TBL_CORE_SUITABILITY s ON b.SYS_BLD_ID = s.FK_BUILDING_ID
+    LEFT JOIN TBL_CORE_SAFETY sa ON b.SYS_BLD_ID = sa.FK_BUILDING_ID
+    LEFT JOIN TBL_CORE_BUILDING_TECH_AUDIT ta ON b.SYS_BLD_ID = ta.FK_BLD_ID
+    WHERE b.FK_PROPERTY_ID = ?
+"""
+
+
+def get_property_aggregate(property_id):
+    """
+    Returns the whole property aggregate in one read:
+        property_dict, legal_dict, address_dict, land_dict, gov_dict
+                      -> one dict per skeleton table ({} if missing)
+        buildings     -> list of building dicts joined with inspection,
+                         suitability, safety and technical audit
+        geometries    -> {GEOM_ID: {"type", "wkt", "wkb", "updated_at"}} for
+                         the parcel, address point, footprints and entrances
+    """
+    conn = get_connection()
+    c = conn.cursor()
+    c.row_factory = sqlite3.Row
+    data = {key: {} for key, _, _ in _AGGREGATE_PARTS}
+    data["buildings"] = []
+    data["geometries"] = {}
+    try:
+        c.execute(_AGGREGATE_SKELETON_SQL, (property_id,))
+        row = c.fetchone()
+        if row is None:
+            return data
+
+        current = None
+        for name in row.keys():
+            if name.startswith("_T_"):
+                current = data[name[3:].lower()]
+                continue
+            current[name] = row[name]
+        # A LEFT JOIN miss yields all-NULL columns: treat as no record
+        for key, _, _ in _AGGREGATE_PARTS[1:]:
+            if data[key].get("FK_PROPERTY_ID") is None:
+                data[key] = {}
+
+        c.execute(_AGGREGATE_BUILDINGS_SQL, (property_id,))
+        # dict(zip()) keeps the last duplicate column, as the pages always did
+        data["buildings"] = [dict(zip(r.keys(), r)) for r in c.fetchall()]
+
+        geom_ids = {data["property_dict"].get("ID_PROPERTY_GEOM"),
+                    data["address_dict"].get("ID_ADDR_GEOM")}
+        for b in data["buildings"]:
+            geom_ids.update((b.get("ID_BUILDING_GEOM"), b.get("SYS_BLD_ID")))
+        data["geometries"] = _fetch_geometries(c, geom_ids)
+        return data
+    finally:
+        conn.close()
+
+# ------------------------------------------------------------------
+# Property list (inspection page selector)
+# Keyset pagination: pages are ordered by (IFNULL(ID_CADASTRAL_NO, ''),
+# SYS_PROPERTY_ID) and the next page starts after the last key of the
+# previous one, so every page is an index range scan of PROPERTY_PAGE_SIZE
+# rows instead of sorting the whole register. Filters run in SQL.
+# ------------------------------------------------------------------
+PROPERTY_PAGE_SIZE = 50
+
+# One address per property (the first one, as the aggregate and the status
+# table use), so a property with several addresses is still one list row
+_PRIMARY_ADDRESS_JOIN = """
+    LEFT JOIN TBL_CORE_ADDRESS a ON a.rowid = (
+        SELECT MIN(a1.rowid) FROM TBL_CORE_ADDRESS a1 WHERE a1.FK_PROPERTY_ID = p.SYS_PROPERTY_ID
+    )"""
+
+_PROPERTY_LIST_SQL = f"""
+    SELECT
+        p.SYS_PROPERTY_ID,
+        p.ID_ADMIN_UNIT,
+        COALESCE(i.ENUM_LABEL, p.ID_ADMIN_UNIT) AS ADMIN_UNIT_LABEL,
+        p.ID_CADASTRAL_NO,
+        a.CITY,
+        a.ADDR_LINE1,
+        s.STATUS AS COMPLETENESS,
+        IFNULL(p.ID_CADASTRAL_NO, '') AS SORT_KEY
+    FROM TBL_CORE_PROPERTY p{_PRIMARY_ADDRESS_JOIN}
+    LEFT JOIN TBL_SYS_PROPERTY_STATUS s ON s.FK_PROPERTY_ID = p.SYS_PROPERTY_ID
+    LEFT JOIN TBL_REF_ENUM e ON e.ENUM_GROUP = 'ADMIN_UNIT' AND e.ENUM_CODE = p.ID_ADMIN_UNIT
+    LEFT JOIN TBL_REF_ENUM_I18N i ON i.FK_ENUM_ID = e.SYS_ENUM_ID AND i.LANGUAGE_CODE = ?
+"""
+
+
+def _property_filters(admin_unit=None, city=None, status=None, fieldwork_status=None, search=None):
+    """WHERE clauses + params for list_properties() / count_properties()."""
+    clauses, params = [], []
+    if admin_unit:
+        clauses.append("p.ID_ADMIN_UNIT = ?")
+        params.append(admin_unit)
+    if city:
+        # Any address of the property, read from idx_core_address_city
+        clauses.append("""p.SYS_PROPERTY_ID IN (
+            SELECT FK_PROPERTY_ID FROM TBL_CORE_ADDRESS WHERE CITY = ? COLLATE NOCASE
+        )""")
+        params.append(city)
+    if status:
+        if status not in COMPLETENESS_STATUSES:
+            raise ValueError(f"Unknown completeness status: '{status}'")
+        clauses.append("s.STATUS = ?")
+        params.append(status)
+    if fieldwork_status is not None:
+        clauses.append("""EXISTS (
+            SELECT 1 FROM TBL_CORE_BUILDING b
+            WHERE b.BLD_FIELDWORK_STATUS = ? AND b.FK_PROPERTY_ID = p.SYS_PROPERTY_ID
+        )""")
+        params.append(int(fieldwork_status))
+    if search:
+        match = _fts_query(search)
+        if match and search_index_available():
+            clauses.append(f"p.SYS_PROPERTY_ID IN (SELECT PROPERTY_ID FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH ?)")
+            params.append(match)
+        else:
+            pattern = f"%{search.strip()}%"
+            clauses.append("(p.ID_CADASTRAL_NO LIKE ? OR a.ADDR_LINE1 LIKE ? OR a.CITY LIKE ?)")
+            params.extend([pattern, pattern, pattern])
+    return clauses, params
+
+
+def list_properties(after=None, limit=PROPERTY_PAGE_SIZE, lang="en", **filters):
+    """
+    One page of the property list.
+
+    after:   cursor returned by the previous page (None = first page)
+    filters: admin_unit, city, status (one of COMPLETENESS_STATUSES),
+             fieldwork_status (BLD_FIELDWORK_STATUS of any building), search
+
+    Returns {"rows": [dict, ...], "next_cursor": cursor or None}.
+    """
+    clauses, params = _property_filters(**filters)
+    if after is not None:
+        clauses.insert(0, "(IFNULL(p.ID_CADASTRAL_NO, ''), p.SYS_PROPERTY_ID) > (?, ?)")
+        params[:0] = list(after)
+    sql = _PROPERTY_LIST_SQL
+    if clauses:
+        sql += " WHERE " + " AND ".join(clauses)
+    sql += " ORDER BY IFNULL(p.ID_CADASTRAL_NO, ''), p.SYS_PROPERTY_ID LIMIT ?"
+
+    conn = get_connection()
+    c = conn.cursor()
+    try:
+        c.execute(sql, [lang] + params + [limit + 1])
+        columns = [d[0] for d in c.description]
+        rows = [dict(zip(columns, r)) for r in c.fetchall()]
+    finally:
+        conn.close()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = (rows[-1]["SORT_KEY"], rows[-1]["SYS_PROPERTY_ID"])
+    return {"rows": rows, "next_cursor": next_cursor}
+
+
+def count_properties(**filters):
+    """Number of properties matching the list_properties() filters."""
+    clauses, params = _property_filters(**filters)
+    sql = f"""
+        SELECT COUNT(DISTINCT p.SYS_PROPERTY_ID)
+        FROM TBL_CORE_PROPERTY p{_PRIMARY_ADDRESS_JOIN}
+        LEFT JOIN TBL_SYS_PROPERTY_STATUS s ON s.FK_PROPERTY_ID = p.SYS_PROPERTY_ID
+    """
+    if clauses:
+        sql += " WHERE " + " AND ".join(clauses)
+    conn = get_connection()
+    c = conn.cursor()
+    try:
+        c.execute(sql, params)
+        return c.fetchone()[0]
+    finally:
+        conn.close()
+
+
+def count_properties_by_status():
+    """{status: number of properties} from the completeness table (all statuses present)."""
+    conn = get_connection()
+    c = conn.cursor()
+    try:
+        counts = {}
+        for status in COMPLETENESS_STATUSES:
+            c.execute(f"SELECT COUNT(*) FROM {STATUS_TABLE} WHERE STATUS = ?", (status,))
+            counts[status] = c.fetchone()[0]
+        return counts
+    finally:
+        conn.close()
+
+
+def get_property_status(property_id):
+    """Completeness row of one property as a dict (None if missing)."""
+    conn = get_connection()
+    c = conn.cursor()
+    try:
+        c.execute(f"SELECT * FROM {STATUS_TABLE} WHERE FK_PROPERTY_ID = ?", (property_id,))
+        row = c.fetchone()
+        return dict(zip([d[0] for d in c.description], row)) if row else None
+    finally:
+        conn.close()
+
+
+def get_property_list_row(property_id, lang="en"):
+    """The list_properties() row of a single property (None if missing)."""
+    conn = get_connection()
+    c = conn.cursor()
+    try:
+        c.execute(_PROPERTY_LIST_SQL + " WHERE p.SYS_PROPERTY_ID = ?", (lang, property_id))
+        row = c.fetchone()
+        return dict(zip([d[0] for d in c.description], row)) if row else None
+    finally:
+        conn.close()
+
+
+def get_property_cities():
+    """Distinct address cities for the list filter (read from the CITY index)."""
+    conn = get_connection()
+    c = conn.cursor()
+    try:
+        c.execute("""
+            SELECT DISTINCT CITY COLLATE NOCASE FROM TBL_CORE_ADDRESS
+            WHERE CITY IS NOT NULL AND CITY != '' ORDER BY 1
+        """)
+        return [r[0] for r in c.fetchall()]
+    finally:
+        conn.close()
+
+
+# ------------------------------------------------------------------
+# Full-text property search (index maintained by triggers, see [[FTS_GEN]])
+# ------------------------------------------------------------------
+# bm25 column weights: PROPERTY_ID, CADASTRAL_NO, ADDRESS, BUILDING_USE, NOTES
+SEARCH_WEIGHTS = (0.0, 10.0, 5.0, 2.0, 1.0)
+
+
+def _fts_query(text):
+    """MATCH expression for free text: every term as a quoted prefix query, all required."""
+    terms = [t.replace('"', '""') for t in (text or "").split() if re.search(r"\w", t)]
+    return " ".join(f'"{t}"*' for t in terms)
+
+
+def search_index_available():
+    """True if the FTS5 search table exists in this database."""
+    conn = get_connection()
+    try:
+        return conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (SEARCH_TABLE,)
+        ).fetchone() is not None
+    finally:
+        conn.close()
+
+
+def search_properties(text, limit=20, lang="en"):
+    """
+    Ranked property search over cadastral numbers, addresses, building use
+    and inspection/safety notes. Terms are prefix-matched ("Хрещ" finds
+    "Хрещатик") and all must occur.
+
+    Returns list_properties()-style row dicts, best match first, with RANK
+    (bm25, lower is better) and SNIPPET (matched text in [brackets]).
+    Falls back to the LIKE filter of list_properties() without FTS5.
+    """
+    match = _fts_query(text)
+    if not match:
+        return []
+    if not search_index_available():
+        rows = list_properties(limit=limit, lang=lang, search=text)["rows"]
+        return [dict(r, RANK=None, SNIPPET=None) for r in rows]
+
+    conn = get_connection()
+    c = conn.cursor()
+    try:
+        c.execute(f'''
+            SELECT PROPERTY_ID,
+                   bm25({SEARCH_TABLE}, {", ".join(map(str, SEARCH_WEIGHTS))}) AS RANK,
+                   snippet({SEARCH_TABLE}, -1, '[', ']', '…', 8) AS SNIPPET
+            FROM {SEARCH_TABLE}
+            WHERE {SEARCH_TABLE} MATCH ?
+            ORDER BY RANK
+            LIMIT ?
+        ''', (match, limit))
+        hits = c.fetchall()
+        if not hits:
+            return []
+
+        placeholders = ", ".join("?" * len(hits))
+        c.execute(_PROPERTY_LIST_SQL + f" WHERE p.SYS_PROPERTY_ID IN ({placeholders})",
+                  [lang] + [h[0] for h in hits])
+        columns = [d[0] for d in c.description]
+        rows = {r[0]: dict(zip(columns, r)) for r in c.fetchall()}
+    finally:
+        conn.close()
+
+    # Empty note columns leave runs of blanks in the document; collapse them
+    return [dict(rows[pid], RANK=rank, SNIPPET=" ".join((snippet or "").split()))
+            for pid, rank, snippet in hits if pid in rows]
+
+
+def rebuild_search_index():
+    """Drops and rebuilds every search document (e.g. after manual SQL edits)."""
+    if not search_index_available():
+        return False
+    try:
+        with db_session() as conn:
+            c = conn.cursor()
+            c.execute(f"DELETE FROM {SEARCH_TABLE}")
+            c.execute(f"DELETE FROM {SEARCH_KEY_TABLE}")
+            _init_search_index(c)
+            c.execute(f"INSERT INTO {SEARCH_TABLE} ({SEARCH_TABLE}) VALUES ('optimize')")
+        return True
+    except Exception as e:
+        print(f"Error rebuilding search index: {e}")
+        return False
+
+
 # Add property:
+def _insert_property_skeletons(c, properties):
+    """
+    Inserts the skeleton rows for each (admin_unit, cadastral_no) on cursor c
+    (no commit) and returns the new property ids, in input order. Shared by
+    add_property() and add_properties_bulk(); one executemany per table.
+    """
+    # Generate all UUIDs upfront to maintain relational integrity
+    n = len(properties)
+    def new_ids():
+        return [str(uuid.uuid4()) for _ in range(n)]
+    property_ids, prop_geom_ids  = new_ids(), new_ids()
+    bld_ids, bld_geom_ids        = new_ids(), new_ids()
+    addr_ids, addr_geom_ids      = new_ids(), new_ids()
+    legal_ids, gov_ids, land_ids = new_ids(), new_ids(), new_ids()
+
+    # 1. Insert property (triggers plot polygon)
+    c.executemany("""
+        INSERT INTO TBL_CORE_PROPERTY (
+            SYS_PROPERTY_ID, ID_ADMIN_UNIT, ID_CADASTRAL_NO,
+            ID_PROPERTY_GEOM
+        ) VALUES (?, ?, ?, ?)
+    """, [(pid, admin_unit, cadastral_no, geom_id)
+          for pid, (admin_unit, cadastral_no), geom_id in zip(property_ids, properties, prop_geom_ids)])
+
+    # 2. Insert building (triggers footprint polygon)
+    c.executemany("""
+        INSERT INTO TBL_CORE_BUILDING (
+            SYS_BLD_ID, FK_PROPERTY_ID, ID_BUILDING_GEOM,
+            BLD_TYPE, BLD_STRUCT_COND, BLD_LOAD_STATUS
+        ) VALUES (?, ?, ?, 'UNKNOWN', 'UNKNOWN', 'UNKNOWN')
+    """, list(zip(bld_ids, property_ids, bld_geom_ids)))
+
+    # 3. Insert address (triggers location point)
+    c.executemany("""
+        INSERT INTO TBL_CORE_ADDRESS (
+            SYS_ADDR_ID, FK_PROPERTY_ID, ID_ADDR_GEOM,
+            ADDR_TYPE
+        ) VALUES (?, ?, ?, 'UNKNOWN')
+    """, list(zip(addr_ids, property_ids, addr_geom_ids)))
+
+    # 4. Insert legal placeholder (Owned/Admin data)
+    c.executemany("""
+        INSERT INTO TBL_CORE_LEGAL_OWNERSHIP (
+            SYS_LegalOwner_ID, FK_PROPERTY_ID, OWN_TYPE, OWN_ENTITY
+        ) VALUES (?, ?, 'UNKNOWN', 'UNKNOWN')
+    """, list(zip(legal_ids, property_ids)))
+
+    # 5. Insert governance placeholder (Commission/Disclosure data)
+    c.executemany("""
+        INSERT INTO TBL_CORE_GOVERNANCE (
+            SYS_GOV_ID, FK_PROPERTY_ID
+        ) VALUES (?, ?)
+    """, list(zip(gov_ids, property_ids)))
+
+    # 6. Insert landplot placeholder (Cadastral/Vegetation data)
+    c.executemany("""
+        INSERT INTO TBL_CORE_LANDPLOT (
+            SYS_LAND_ID, FK_PROPERTY_ID
+        ) VALUES (?, ?)
+    """, list(zip(land_ids, property_ids)))
+
+    return property_ids
+
+
 def add_property(admin_unit, cadastral_no, created_by='SYSTEM'):
     """
     MASTER ORCHESTRATOR: Creates a full property 'skeleton'.
@@ -863,65 +1794,71 @@ def add_property(admin_unit, cadastral_no, created_by='SYSTEM'):
     c = conn.cursor()
 
     try:
-        # Generate all UUIDs upfront to maintain relational integrity
-        property_id  = str(uuid.uuid4())
-        prop_geom_id = str(uuid.uuid4())
-        bld_id       = str(uuid.uuid4())
-        bld_geom_id  = str(uuid.uuid4())
-        addr_id      = str(uuid.uuid4())
-        addr_geom_id = str(uuid.uuid4())
-        legal_id     = str(uuid.uuid4())
-        gov_id       = str(uuid.uuid4())
-        land_id      = str(uuid.uuid4())
-
-        # 1. Insert property (triggers plot polygon)
-        c.execute("""
-            INSERT INTO TBL_CORE_PROPERTY (
-                SYS_PROPERTY_ID, ID_ADMIN_UNIT, ID_CADASTRAL_NO,
-                ID_PROPERTY_GEOM
-            ) VALUES (?, ?, ?, ?)
-        """, (property_id, admin_unit, cadastral_no, prop_geom_id))
-
-        # 2. Insert building (triggers footprint polygon)
-        c.execute("""
-            INSERT INTO TBL_CORE_BUILDING (
-                SYS_BLD_ID, FK_PROPERTY_ID, ID_BUILDING_GEOM,
-                BLD_TYPE, BLD_STRUCT_COND, BLD_LOAD_STATUS
-            ) VALUES (?, ?, ?, ?, ?, ?)
-        """, (bld_id, property_id, bld_geom_id,
-              'UNKNOWN', 'UNKNOWN', 'UNKNOWN'))
-
-        # 3. Insert address (triggers location point)
-        c.execute("""
-            INSERT INTO TBL_CORE_ADDRESS (
-                SYS_ADDR_ID, FK_PROPERTY_ID, ID_ADDR_GEOM,
-                ADDR_TYPE
-            ) VALUES (?, ?, ?, ?)
-        """, (addr_id, property_id, addr_geom_id, 'UNKNOWN'))
+        property_id = _insert_property_skeletons(c, [(admin_unit, cadastral_no)])[0]
+        conn.commit()
+        return property_id
 
-        # 4. Insert legal placeholder (Owned/Admin data)
-        c.execute("""
-            INSERT INTO TBL_CORE_LEGAL_OWNERSHIP (
-                SYS_LegalOwner_ID, FK_PROPERTY_ID, OWN_TYPE, OWN_ENTITY
-            ) VALUES (?, ?, ?, ?)
-        """, (legal_id, property_id, 'UNKNOWN', 'UNKNOWN'))
+    except Exception as e:
+        conn.rollback()
+        raise e
+    finally:
+        conn.close()
 
-        # 5. Insert governance placeholder (Commission/Disclosure data)
-        c.execute("""
-            INSERT INTO TBL_CORE_GOVERNANCE (
-                SYS_GOV_ID, FK_PROPERTY_ID
-            ) VALUES (?, ?)
-        """, (gov_id, property_id))
 
-        # 6. Insert landplot placeholder (Cadastral/Vegetation data)
-        c.execute("""
-            INSERT INTO TBL_CORE_LANDPLOT (
-                SYS_LAND_ID, FK_PROPERTY_ID
-            ) VALUES (?, ?)
-        """, (land_id, property_id))
+def add_properties_bulk(rows):
+    """
+    Bulk variant of add_property() for onboarding commission lists.
+
+    rows: iterable of dicts with 'admin_unit' (ADMIN_UNIT code or label) and
+    'cadastral_no'. Every row is validated first; the valid ones are then
+    created in ONE transaction through the same skeleton inserts as
+    add_property(). Invalid rows are skipped and reported. Labels are mapped
+    to their code; the unit is only checked against the ADMIN_UNIT enum when
+    that enum has entries (add_property() itself does not check it).
+
+    Returns {"created": [property_id, ...], "errors": [(row_number, message), ...]}
+    with 1-based row numbers. Raises if the insert itself fails (nothing is
+    written then).
+    """
+    admin_options = get_enum_options("ADMIN_UNIT")
+    admin_codes   = {code for code, label in admin_options}
+    label_to_code = {str(label).casefold(): code for code, label in admin_options}
 
+    conn = get_connection()
+    c = conn.cursor()
+    try:
+        c.execute("SELECT ID_CADASTRAL_NO FROM TBL_CORE_PROPERTY WHERE ID_CADASTRAL_NO IS NOT NULL")
+        existing = {row[0] for row in c.fetchall()}
+
+        # 1. Validate
+        valid, errors, seen = [], [], set()
+        for row_number, row in enumerate(rows, start=1):
+            cadastral_no = str(row.get('cadastral_no') or '').strip()
+            admin_unit   = str(row.get('admin_unit') or '').strip()
+            if admin_unit in admin_codes or not admin_codes:
+                admin_code = admin_unit or None
+            else:
+                admin_code = label_to_code.get(admin_unit.casefold())
+
+            if not cadastral_no:
+                errors.append((row_number, "Cadastral number is missing."))
+            elif admin_codes and admin_code is None:
+                errors.append((row_number, f"Unknown administrative unit '{admin_unit}'."))
+            elif cadastral_no in existing:
+                errors.append((row_number, f"Cadastral number '{cadastral_no}' already exists."))
+            elif cadastral_no in seen:
+                errors.append((row_number, f"Cadastral number '{cadastral_no}' is duplicated in the import."))
+            else:
+                seen.add(cadastral_no)
+                valid.append((admin_code, cadastral_no))
+
+        if not valid:
+            return {"created": [], "errors": errors}
+
+        # 2. Insert (triggers create the geometry placeholders)
+        property_ids = _insert_property_skeletons(c, valid)
         conn.commit()
-        return property_id
+        return {"created": property_ids, "errors": errors}
 
     except Exception as e:
         conn.rollback()
@@ -931,82 +1868,102 @@ def add_property(admin_unit, cadastral_no, created_by='SYSTEM'):
 ### End Add
 
 # Delete property:
-def delete_property(property_id):
+# Set-based cascade shared by delete_property(), delete_properties() and
+# delete_building(): the ids to remove go into TEMP tables, every child
+# table is cleared with one indexed "FK IN (SELECT ...)" statement, and all
+# collected geometries are removed by a single DELETE at the end.
+# Children first, parents last, so the FK checks never fail mid-way.
+_BUILDING_CHILD_TABLES = [
+    ("TBL_CORE_BUILDING_MEDIA",      "FK_BLD_ID"),
+    ("TBL_CORE_INSPECTION",          "FK_BLD_ID"),
+    ("TBL_CORE_BUILDING_TECH_AUDIT", "FK_BLD_ID"),
+    ("TBL_CORE_SUITABILITY",         "FK_BUILDING_ID"),
+    ("TBL_CORE_OCCUPANCY",           "FK_BUILDING_ID"),
+    ("TBL_CORE_SAFETY",              "FK_BUILDING_ID"),
+    ("TBL_CORE_ALLOCATION",          "FK_BUILDING_ID"),
+    ("TBL_LINK_ALLOCATION",          "FK_BUILDING_ID"),
+]
+_PROPERTY_CHILD_TABLES = [
+    ("TBL_CORE_ADDRESS",         "FK_PROPERTY_ID"),
+    ("TBL_CORE_LEGAL_OWNERSHIP", "FK_PROPERTY_ID"),
+    ("TBL_CORE_LANDPLOT",        "FK_PROPERTY_ID"),
+    ("TBL_CORE_GOVERNANCE",      "FK_PROPERTY_ID"),
+    ("TBL_LINK_GOVERNANCE",      "FK_PROPERTY_ID"),
+]
+
+
+def _cascade_delete(c, property_ids=(), building_ids=()):
     """
-    Fully removes a property and all linked records across all tables.
-    Cascade order respects FK constraints — children first, parent last.
-    Geometry records cleaned up after parent records are removed.
+    Deletes the given properties and buildings with everything linked to
+    them, on cursor c (the caller commits). Returns (properties, buildings)
+    deleted.
     """
-    conn = get_connection()
-    c = conn.cursor()
-    try:
-        # 1. Collect all geometry IDs before deleting anything
-        geom_ids = []
-        
-        # 1a. Property Geometry
-        c.execute("SELECT ID_PROPERTY_GEOM FROM TBL_CORE_PROPERTY WHERE SYS_PROPERTY_ID = ?", (property_id,))
-        prop_row = c.fetchone()
-        if prop_row and prop_row[0]:
-            geom_ids.append(prop_row[0])
-
-        # 1b. Building Geometries (Footprint + Entrance Point)
-        c.execute("SELECT ID_BUILDING_GEOM, SYS_BLD_ID FROM TBL_CORE_BUILDING WHERE FK_PROPERTY_ID = ?", (property_id,))
-        bld_rows = c.fetchall()
-        bld_ids = []
-        for b_geom, b_id in bld_rows:
-            if b_geom: geom_ids.append(b_geom)
-            if b_id: 
-                geom_ids.append(b_id) # entrance point
-                bld_ids.append(b_id)
-
-        # 1c. Address Geometry
-        c.execute("SELECT ID_ADDR_GEOM FROM TBL_CORE_ADDRESS WHERE FK_PROPERTY_ID = ?", (property_id,))
-        addr_row = c.fetchone()
-        if addr_row and addr_row[0]:
-            geom_ids.append(addr_row[0])
-
-        # 2. Deeper cascade for buildings (Inspections, Media, etc.)
-        for bld_id in bld_ids:
-            c.execute("SELECT SYS_INSPECTION_ID FROM TBL_CORE_INSPECTION WHERE FK_BLD_ID = ?", (bld_id,))
-            insp_ids = [r[0] for r in c.fetchall()]
-
-            # 3. Delete building media
-            c.execute("DELETE FROM TBL_CORE_BUILDING_MEDIA WHERE FK_BLD_ID = ?", (bld_id,))
-
-            # 4. Delete inspections
-            c.execute("DELETE FROM TBL_CORE_INSPECTION  WHERE FK_BLD_ID = ?", (bld_id,))
-
-            # 5. Delete building linked tables
-            c.execute("DELETE FROM TBL_CORE_SUITABILITY WHERE FK_BUILDING_ID = ?", (bld_id,))
-            c.execute("DELETE FROM TBL_CORE_OCCUPANCY   WHERE FK_BUILDING_ID = ?", (bld_id,))
-            c.execute("DELETE FROM TBL_CORE_SAFETY      WHERE FK_BUILDING_ID = ?", (bld_id,))
-            c.execute("DELETE FROM TBL_CORE_ALLOCATION  WHERE FK_BUILDING_ID = ?", (bld_id,))
-            c.execute("DELETE FROM TBL_LINK_ALLOCATION  WHERE FK_BUILDING_ID = ?", (bld_id,))
-
-        # 6. Delete address admin region links
-        c.execute("""
-            DELETE FROM TBL_LINK_ADDRESS_ADMIN_REGION 
-            WHERE FK_SYS_ADDR_ID IN (
-                SELECT SYS_ADDR_ID FROM TBL_CORE_ADDRESS 
-                WHERE FK_PROPERTY_ID = ?
-            )
-        """, (property_id,))
+    c.execute("CREATE TEMP TABLE IF NOT EXISTS TMP_DEL_PROPERTY (ID TEXT PRIMARY KEY)")
+    c.execute("CREATE TEMP TABLE IF NOT EXISTS TMP_DEL_BUILDING (ID TEXT PRIMARY KEY)")
+    c.execute("CREATE TEMP TABLE IF NOT EXISTS TMP_DEL_GEOM (ID TEXT PRIMARY KEY)")
+    for tmp in ("TMP_DEL_PROPERTY", "TMP_DEL_BUILDING", "TMP_DEL_GEOM"):
+        c.execute(f"DELETE FROM temp.{tmp}")
+
+    c.executemany("INSERT OR IGNORE INTO temp.TMP_DEL_PROPERTY (ID) VALUES (?)", [(i,) for i in property_ids])
+    c.executemany("INSERT OR IGNORE INTO temp.TMP_DEL_BUILDING (ID) VALUES (?)", [(i,) for i in building_ids])
+    c.execute("""
+        INSERT OR IGNORE INTO temp.TMP_DEL_BUILDING (ID)
+        SELECT SYS_BLD_ID FROM TBL_CORE_BUILDING
+        WHERE FK_PROPERTY_ID IN (SELECT ID FROM temp.TMP_DEL_PROPERTY)
+    """)
+
+    # 1. Collect all geometry IDs before deleting anything
+    #    (Entrance points use SYS_BLD_ID as GEOM_ID)
+    c.execute("""
+        INSERT OR IGNORE INTO temp.TMP_DEL_GEOM (ID)
+        SELECT ID_PROPERTY_GEOM FROM TBL_CORE_PROPERTY
+        WHERE SYS_PROPERTY_ID IN (SELECT ID FROM temp.TMP_DEL_PROPERTY) AND ID_PROPERTY_GEOM IS NOT NULL
+        UNION
+        SELECT ID_BUILDING_GEOM FROM TBL_CORE_BUILDING
+        WHERE SYS_BLD_ID IN (SELECT ID FROM temp.TMP_DEL_BUILDING) AND ID_BUILDING_GEOM IS NOT NULL
+        UNION
+        SELECT ID FROM temp.TMP_DEL_BUILDING
+        UNION
+        SELECT ID_ADDR_GEOM FROM TBL_CORE_ADDRESS
+        WHERE FK_PROPERTY_ID IN (SELECT ID FROM temp.TMP_DEL_PROPERTY) AND ID_ADDR_GEOM IS NOT NULL
+    """)
+
+    # 2. Building children (Inspections, Media, etc.), then the buildings
+    for table, fk_col in _BUILDING_CHILD_TABLES:
+        c.execute(f"DELETE FROM {table} WHERE {fk_col} IN (SELECT ID FROM temp.TMP_DEL_BUILDING)")
+    c.execute("DELETE FROM TBL_CORE_BUILDING WHERE SYS_BLD_ID IN (SELECT ID FROM temp.TMP_DEL_BUILDING)")
+    buildings_deleted = c.rowcount
+
+    # 3. Address admin region links, property-level records, then the properties
+    c.execute("""
+        DELETE FROM TBL_LINK_ADDRESS_ADMIN_REGION
+        WHERE FK_SYS_ADDR_ID IN (
+            SELECT SYS_ADDR_ID FROM TBL_CORE_ADDRESS
+            WHERE FK_PROPERTY_ID IN (SELECT ID FROM temp.TMP_DEL_PROPERTY)
+        )
+    """)
+    for table, fk_col in _PROPERTY_CHILD_TABLES:
+        c.execute(f"DELETE FROM {table} WHERE {fk_col} IN (SELECT ID FROM temp.TMP_DEL_PROPERTY)")
+    c.execute("DELETE FROM TBL_CORE_PROPERTY WHERE SYS_PROPERTY_ID IN (SELECT ID FROM temp.TMP_DEL_PROPERTY)")
+    properties_deleted = c.rowcount
 
-        # 7. Delete property-level records
-        c.execute("DELETE FROM TBL_CORE_BUILDING       WHERE FK_PROPERTY_ID = ?", (property_id,))
-        c.execute("DELETE FROM TBL_CORE_ADDRESS        WHERE FK_PROPERTY_ID = ?", (property_id,))
-        c.execute("DELETE FROM TBL_CORE_LEGAL_OWNERSHIP WHERE FK_PROPERTY_ID = ?", (property_id,))
-        c.execute("DELETE FROM TBL_CORE_LANDPLOT       WHERE FK_PROPERTY_ID = ?", (property_id,))
-        c.execute("DELETE FROM TBL_CORE_GOVERNANCE     WHERE FK_PROPERTY_ID = ?", (property_id,))
-        c.execute("DELETE FROM TBL_LINK_GOVERNANCE     WHERE FK_PROPERTY_ID = ?", (property_id,))
+    # 4. Clean up the collected geometry records in one statement
+    c.execute("DELETE FROM TBL_CORE_GEOMETRY WHERE GEOM_ID IN (SELECT ID FROM temp.TMP_DEL_GEOM)")
 
-        # 8. Delete property
-        c.execute("DELETE FROM TBL_CORE_PROPERTY WHERE SYS_PROPERTY_ID = ?", (property_id,))
+    for tmp in ("TMP_DEL_PROPERTY", "TMP_DEL_BUILDING", "TMP_DEL_GEOM"):
+        c.execute(f"DELETE FROM temp.{tmp}")
+    return properties_deleted, buildings_deleted
 
-        # 9. Clean up Collected Geometry records
-        for geom_id in set(geom_ids): # Set to avoid double delete if IDs overlap
-            c.execute("DELETE FROM TBL_CORE_GEOMETRY WHERE GEOM_ID = ?", (geom_id,))
 
+def delete_property(property_id):
+    """
+    Fully removes a property and all linked records across all tables,
+    in one transaction (see _cascade_delete).
+    """
+    conn = get_connection()
+    c = conn.cursor()
+    try:
+        _cascade_delete(c, property_ids=[property_id])
         conn.commit()
         print(f"✅ Property {property_id} and all linked records deleted.")
         return True
@@ -1017,6 +1974,28 @@ def delete_property(property_id):
         return False
     finally:
         conn.close()
+
+
+def delete_properties(property_ids):
+    """
+    Bulk variant of delete_property() for admin cleanup: removes all given
+    properties with their linked records in one transaction (all or nothing).
+    Returns the number of properties deleted, or False on error.
+    """
+    conn = get_connection()
+    c = conn.cursor()
+    try:
+        properties_deleted, buildings_deleted = _cascade_delete(c, property_ids=list(property_ids))
+        conn.commit()
+        print(f"✅ {properties_deleted} properties ({buildings_deleted} buildings) and all linked records deleted.")
+        return properties_deleted
+
+    except Exception as e:
+        conn.rollback()
+        print(f"❌ Error deleting properties: {e}")
+        return False
+    finally:
+        conn.close()
 ### End Delete
 
 ### Updates to different tables
@@ -1249,33 +2228,7 @@ def delete_building(building_id):
     conn = get_connection()
     c = conn.cursor()
     try:
-        # 1. Get geometry IDs for this building
-        c.execute("SELECT ID_BUILDING_GEOM FROM TBL_CORE_BUILDING WHERE SYS_BLD_ID = ?", (building_id,))
-        row = c.fetchone()
-        bld_geom_id = row[0] if row else None
-        
-        # 2. Delete building media
-        c.execute("DELETE FROM TBL_CORE_BUILDING_MEDIA WHERE FK_BLD_ID = ?", (building_id,))
-        
-        # 3. Delete inspections
-        c.execute("DELETE FROM TBL_CORE_INSPECTION WHERE FK_BLD_ID = ?", (building_id,))
-        
-        # 4. Delete building linked tables
-        c.execute("DELETE FROM TBL_CORE_SUITABILITY WHERE FK_BUILDING_ID = ?", (building_id,))
-        c.execute("DELETE FROM TBL_CORE_OCCUPANCY   WHERE FK_BUILDING_ID = ?", (building_id,))
-        c.execute("DELETE FROM TBL_CORE_SAFETY      WHERE FK_BUILDING_ID = ?", (building_id,))
-        c.execute("DELETE FROM TBL_CORE_ALLOCATION  WHERE FK_BUILDING_ID = ?", (building_id,))
-        c.execute("DELETE FROM TBL_LINK_ALLOCATION  WHERE FK_BUILDING_ID = ?", (building_id,))
-        
-        # 5. Delete the building itself
-        c.execute("DELETE FROM TBL_CORE_BUILDING WHERE SYS_BLD_ID = ?", (building_id,))
-        
-        # 6. Delete geometry records (Footprint and Entrance)
-        # Note: Entrance uses SYS_BLD_ID as GEOM_ID
-        if bld_geom_id:
-            c.execute("DELETE FROM TBL_CORE_GEOMETRY WHERE GEOM_ID = ?", (bld_geom_id,))
-        c.execute("DELETE FROM TBL_CORE_GEOMETRY WHERE GEOM_ID = ?", (building_id,))
-        
+        _cascade_delete(c, building_ids=[building_id])
         conn.commit()
         return True
     except Exception as e:
@@ -1342,18 +2295,11 @@ def get_address_geometry(geom_id):
     conn = get_connection()
     c = conn.cursor()
     try:
-        c.execute("SELECT GEOM_WKT FROM TBL_CORE_GEOMETRY WHERE GEOM_ID = ?", (geom_id,))
+        c.execute("SELECT GEOM_WKT, UPDATED_AT FROM TBL_CORE_GEOMETRY WHERE GEOM_ID = ?", (geom_id,))
         row = c.fetchone()
         if row and row[0]:
-            wkt = row[0]
-            # Simple POINT extraction
-            import re
-            match = re.search(r"POINT\(([-\d\.]+) ([-\d\.]+)\)", wkt)
-            if match:
-                return {
-                    "longitude": float(match.group(1)),
-                    "latitude": float(match.group(2))
-                }
+            # Parsed points are cached per (GEOM_ID, UPDATED_AT)
+            return point_latlon(geom_id, row[1], row[0])
         return None
     finally:
         conn.close()
@@ -1361,6 +2307,8 @@ def get_address_geometry(geom_id):
 def update_address_geometry(addr_geom_id, latitude, longitude, resolved_address, updated_by='SYSTEM'):
     """
     Updates the geometry WKT and marks ADDR_GEOM_CREATED as 1.
+    Then resolves the point's admin regions into TBL_LINK_ADDRESS_ADMIN_REGION
+    (see admin_resolver.py; skipped while no boundary dataset is loaded).
     """
     conn = get_connection()
     c = conn.cursor()
@@ -1373,11 +2321,12 @@ def update_address_geometry(addr_geom_id, latitude, longitude, resolved_address,
             UPDATE TBL_CORE_GEOMETRY
             SET GEOM_TYPE      = 'POINT',
                 GEOM_WKT       = ?, 
+                GEOM_WKB       = ?, 
                 UPDATED_AT     = ?, 
                 SOURCE         = 'Geocoding', 
                 CAPTURE_METHOD = 'API'
             WHERE GEOM_ID = ?
-        """, (wkt, now, addr_geom_id))
+        """, (wkt, to_wkb(wkt), now, addr_geom_id))
         
         # 2. Update Address Table flag
         c.execute("""
@@ -1402,12 +2351,19 @@ def update_address_geometry(addr_geom_id, latitude, longitude, resolved_address,
             """, (prop_id,))
         
         conn.commit()
-        return True
     except Exception as e:
         print(f"Error updating geometry: {e}")
         return False
     finally:
         conn.close()
+
+    # 4. Admin regions (ADM1-3) for the new point — best effort, after commit
+    try:
+        from admin_resolver import resolve_address_admin_regions
+        resolve_address_admin_regions(addr_geom_id, latitude, longitude)
+    except Exception as e:
+        print(f"Admin region resolution skipped: {e}")
+    return True
     
 def reset_address_geometry(addr_geom_id, updated_by='SYSTEM'):
     """
@@ -1422,7 +2378,7 @@ def reset_address_geometry(addr_geom_id, updated_by='SYSTEM'):
         # 1. Clear geometry record back to placeholder state
         c.execute("""
             UPDATE TBL_CORE_GEOMETRY
-            SET GEOM_WKT = NULL, SOURCE = NULL, CAPTURE_METHOD = NULL,
+            SET GEOM_WKT = NULL, GEOM_WKB = NULL, SOURCE = NULL, CAPTURE_METHOD = NULL,
                 UPDATED_AT = ?, CREATED_BY = ?
             WHERE GEOM_ID = ?
         """, (now, updated_by, addr_geom_id))
@@ -1434,6 +2390,13 @@ def reset_address_geometry(addr_geom_id, updated_by='SYSTEM'):
             WHERE ID_ADDR_GEOM = ?
         """, (addr_geom_id,))
 
+        # 3. Drop admin regions resolved from the rejected point
+        c.execute("""
+            DELETE FROM TBL_LINK_ADDRESS_ADMIN_REGION
+            WHERE RESOLVED_FROM_GEOM = 'address_point'
+              AND FK_SYS_ADDR_ID IN (SELECT SYS_ADDR_ID FROM TBL_CORE_ADDRESS WHERE ID_ADDR_GEOM = ?)
+        """, (addr_geom_id,))
+
         conn.commit()
         return True
     except Exception as e:
@@ -1674,9 +2637,9 @@ def update_building_geometry(bld_geom_id, geometry, updated_by='SYSTEM'):
     try:
         c.execute("""
             UPDATE TBL_CORE_GEOMETRY 
-            SET GEOM_WKT = ?, UPDATED_AT = ?, CREATED_BY = ?
+            SET GEOM_WKT = ?, GEOM_WKB = ?, UPDATED_AT = ?, CREATED_BY = ?
             WHERE GEOM_ID = ?
-        """, (wkt, datetime.now().isoformat(), updated_by, bld_geom_id))
+        """, (wkt, to_wkb(geometry), datetime.now().isoformat(), updated_by, bld_geom_id))
         conn.commit()
         return True
     except Exception as e:
@@ -1722,13 +2685,14 @@ def update_building_entrance_geometry(bld_id, latitude, longitude, updated_by='S
         # Check if it exists to preserve CREATED_AT if possible, or just REPLACE
         # For simplicity and standardisation, we use REPLACE INTO for this specific implicit-ID case
         c.execute("""
-            INSERT INTO TBL_CORE_GEOMETRY (GEOM_ID, GEOM_TYPE, GEOM_WKT, UPDATED_AT, CREATED_BY, CREATED_AT)
-            VALUES (?, 'POINT', ?, ?, ?, ?)
+            INSERT INTO TBL_CORE_GEOMETRY (GEOM_ID, GEOM_TYPE, GEOM_WKT, GEOM_WKB, UPDATED_AT, CREATED_BY, CREATED_AT)
+            VALUES (?, 'POINT', ?, ?, ?, ?, ?)
             ON CONFLICT(GEOM_ID) DO UPDATE SET
                 GEOM_WKT = excluded.GEOM_WKT,
+                GEOM_WKB = excluded.GEOM_WKB,
                 UPDATED_AT = excluded.UPDATED_AT,
                 CREATED_BY = excluded.CREATED_BY
-        """, (bld_id, wkt, now, updated_by, now))
+        """, (bld_id, wkt, to_wkb(wkt), now, updated_by, now))
         conn.commit()
         return True
     except Exception as e:
@@ -1739,8 +2703,8 @@ def update_building_entrance_geometry(bld_id, latitude, longitude, updated_by='S
 
 def get_geometry_data(geom_id):
     """
-    Retrieves the GEOM_TYPE and GEOM_WKT for a given geometry ID.
-    Returns a dictionary or None.
+    Retrieves the GEOM_TYPE, GEOM_WKT and GEOM_WKB for a given geometry ID.
+    Returns a dictionary or None (WKT is derived from WKB if only WKB is stored).
     """
     if not geom_id:
         return None
@@ -1749,13 +2713,13 @@ def get_geometry_data(geom_id):
     c = conn.cursor()
     try:
         c.execute("""
-            SELECT GEOM_TYPE, GEOM_WKT 
+            SELECT GEOM_TYPE, GEOM_WKT, GEOM_WKB 
             FROM TBL_CORE_GEOMETRY 
             WHERE GEOM_ID = ?
         """, (geom_id,))
         row = c.fetchone()
         if row:
-            return {"type": row[0], "wkt": row[1]}
+            return {"type": row[0], "wkt": row[1] or wkb_to_wkt(row[2]), "wkb": row[2]}
         return None
     except Exception as e:
         print(f"Error fetching geometry data: {e}")
@@ -1763,6 +2727,25 @@ def get_geometry_data(geom_id):
     finally:
         conn.close()
 
+def _fetch_geometries(c, geom_ids):
+    """
+    One IN (...) query on cursor c for all ids (None ids are ignored).
+    Returns {GEOM_ID: {"type", "wkt", "wkb", "updated_at"}} for the ids that exist.
+    """
+    ids = list({g for g in geom_ids if g})
+    if not ids:
+        return {}
+    placeholders = ",".join("?" * len(ids))
+    c.execute(f"""
+        SELECT GEOM_ID, GEOM_TYPE, GEOM_WKT, GEOM_WKB, UPDATED_AT
+        FROM TBL_CORE_GEOMETRY
+        WHERE GEOM_ID IN ({placeholders})
+    """, ids)
+    return {
+        row[0]: {"type": row[1], "wkt": row[2] or wkb_to_wkt(row[3]), "wkb": row[3], "updated_at": row[4]}
+        for row in c.fetchall()
+    }
+
 if __name__ == "__main__":
     init_db()
     print("Database initialized successfully with UUID-based schema.")
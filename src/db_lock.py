@@ -1,39 +1,27 @@
 import sqlite3
 from datetime import datetime
-from db_core import get_connection
+from db_core import get_connection, db_session
 
 def lock_property(property_id, user_id):
     """Marks a property as locked for fieldwork."""
-    conn = get_connection()
-    c = conn.cursor()
     locked_at = datetime.now().isoformat()
-    try:
-        c.execute('''
+    with db_session() as conn:
+        c = conn.execute('''
             UPDATE TBL_PROPERTY 
             SET IS_LOCKED = 1, LOCKED_BY = ?, LOCKED_AT = ?
             WHERE ID_PROPERTY = ? AND IS_LOCKED = 0
         ''', (user_id, locked_at, property_id))
-        conn.commit()
-        return c.rowcount > 0
-    finally:
-        conn.close()
+    return c.rowcount > 0
 
 def unlock_property(property_id):
     """Releases the lock on a property."""
-    conn = get_connection()
-    c = conn.cursor()
-    try:
-        c.execute('''
+    with db_session() as conn:
+        conn.execute('''
             UPDATE TBL_PROPERTY 
             SET IS_LOCKED = 0, LOCKED_BY = NULL, LOCKED_AT = NULL
             WHERE ID_PROPERTY = ?
         ''', (property_id,))
-        conn.commit()
-        return True
-    finally:
-        conn.close()
-
-    return False, None
+    return True
 
 def get_all_properties_with_lock_status():
     """
@@ -0,0 +1,244 @@
+"""
+db_sync.py — Page-level delta engine for syncing the SQLite file to GitHub.
+
+Instead of uploading the whole database after every save, the file is split
+into SQLite pages and compared with the page hashes recorded at the last
+sync. Only changed pages are shipped, as a compressed delta file:
+
+    remote layout (next to the snapshot in the data repo)
+        data/database.sqlite                              full (compacted) snapshot
+        data/database.sqlite.deltas/<snapshot_sha12>/000001.delta
+        data/database.sqlite.deltas/<snapshot_sha12>/000002.delta ...
+
+    local manifest (next to the local DB file)
+        data/database.sqlite.sync.json  -> snapshot sha, last applied seq,
+                                           page size and per-page hashes
+
+Deltas are grouped by the blob SHA of the snapshot they apply to, so a new
+snapshot (compaction) starts a fresh chain and pull never mixes chains.
+This module has no network or Streamlit dependencies; github_bridge.py does
+the transport.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import struct
+import tempfile
+import zlib
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+DELTA_MAGIC      = b"DBMDELTA1\n"
+SQLITE_MAGIC     = b"SQLite format 3\x00"
+DEFAULT_PAGE_SIZE = 4096
+
+
+def read_page_size(db_path):
+    """Reads the page size from the SQLite file header (offset 16, big-endian)."""
+    with open(db_path, "rb") as f:
+        header = f.read(100)
+    if len(header) < 100 or not header.startswith(SQLITE_MAGIC):
+        return DEFAULT_PAGE_SIZE
+    size = struct.unpack(">H", header[16:18])[0]
+    return 65536 if size == 1 else size
+
+
+def page_hashes(db_path, page_size):
+    """Returns one sha1 hex digest per page of the file."""
+    hashes = []
+    with open(db_path, "rb") as f:
+        while True:
+            page = f.read(page_size)
+            if not page:
+                break
+            hashes.append(hashlib.sha1(page).hexdigest())
+    return hashes
+
+
+def file_sha1(db_path):
+    h = hashlib.sha1()
+    with open(db_path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+# ------------------------------------------------------------------
+# Consistent copies
+# The live file can change between any two reads (sessions commit, SQLite
+# checkpoints the WAL). Everything that is uploaded or recorded as synced
+# is therefore read from a private copy made with the SQLite backup API,
+# which sees one committed state including pages still in the WAL.
+# ------------------------------------------------------------------
+def remove_database_file(path):
+    """Removes a database file together with its -wal/-shm/-journal sidecars."""
+    for suffix in ("", "-wal", "-shm", "-journal"):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+
+
+def copy_database(src_path, dest_path):
+    """
+    Copies the committed state of src_path into dest_path (backup API).
+    Writers on src_path may keep working while the copy is taken. When
+    dest_path is an open database (a restore), its other connections stay
+    valid and see the new content on their next read.
+    """
+    src = sqlite3.connect(src_path)
+    dest = sqlite3.connect(dest_path, timeout=30)
+    try:
+        src.backup(dest)
+    finally:
+        dest.close()
+        src.close()
+
+
+@contextmanager
+def database_snapshot(db_path):
+    """Yields the path of a consistent private copy of db_path; removed afterwards."""
+    fd, snapshot_path = tempfile.mkstemp(
+        dir=os.path.dirname(db_path) or ".", prefix=f"{os.path.basename(db_path)}.", suffix=".snapshot"
+    )
+    os.close(fd)
+    try:
+        copy_database(db_path, snapshot_path)
+        yield snapshot_path
+    finally:
+        remove_database_file(snapshot_path)
+
+
+# ------------------------------------------------------------------
+# Local sync manifest
+# ------------------------------------------------------------------
+def manifest_path(db_path):
+    return f"{db_path}.sync.json"
+
+
+def load_manifest(db_path):
+    """Returns the local sync manifest dict, or None if the file was never synced."""
+    try:
+        with open(manifest_path(db_path), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_manifest(db_path, manifest):
+    tmp_path = f"{manifest_path(db_path)}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f)
+    os.replace(tmp_path, manifest_path(db_path))
+    return manifest
+
+
+def save_manifest(db_path, snapshot_sha, seq, source_path=None):
+    """
+    Records the synced state (snapshot + seq deltas) for db_path. The page
+    hashes are read from source_path: the exact copy that was uploaded or
+    pulled, never the live file, which may already hold newer pages.
+    """
+    source_path = source_path or db_path
+    page_size = read_page_size(source_path)
+    manifest = {
+        "snapshot_sha": snapshot_sha,
+        "seq":          seq,
+        "page_size":    page_size,
+        "page_hashes":  page_hashes(source_path, page_size),
+        "synced_at":    datetime.now(timezone.utc).isoformat(),
+    }
+    return _write_manifest(db_path, manifest)
+
+
+def update_manifest(db_path, **fields):
+    """Stores extra keys (e.g. the branch ETag) in an existing manifest."""
+    manifest = load_manifest(db_path)
+    if manifest is None:
+        return None
+    manifest.update(fields)
+    return _write_manifest(db_path, manifest)
+
+
+# ------------------------------------------------------------------
+# Delta build / apply
+# ------------------------------------------------------------------
+def delta_dir(remote_db_path, snapshot_sha):
+    return f"{remote_db_path}.deltas/{snapshot_sha[:12]}"
+
+
+def delta_name(seq):
+    return f"{seq:06d}.delta"
+
+
+def build_delta(db_path, manifest):
+    """
+    Compares a database file with the manifest and packs the changed pages.
+    Returns (delta_bytes, changed_page_count); delta_bytes is None if nothing
+    changed. The manifest must share the file's current page size.
+    db_path must not change while this runs (pass a database_snapshot()),
+    otherwise the pages and result_sha1 describe different states.
+    """
+    page_size = manifest["page_size"]
+    old_hashes = manifest["page_hashes"]
+
+    changed, payload = [], []
+    with open(db_path, "rb") as f:
+        index = 0
+        while True:
+            page = f.read(page_size)
+            if not page:
+                break
+            if index >= len(old_hashes) or hashlib.sha1(page).hexdigest() != old_hashes[index]:
+                changed.append(index)
+                payload.append(page)
+            index += 1
+    page_count = index
+
+    if not changed and page_count == len(old_hashes):
+        return None, 0
+
+    header = {
+        "base_seq":    manifest["seq"],
+        "seq":         manifest["seq"] + 1,
+        "page_size":   page_size,
+        "page_count":  page_count,
+        "pages":       changed,
+        "result_sha1": file_sha1(db_path),
+        "created_at":  datetime.now(timezone.utc).isoformat(),
+    }
+    header_bytes = json.dumps(header).encode("utf-8")
+    body = zlib.compress(b"".join(payload), 6)
+    return DELTA_MAGIC + struct.pack(">I", len(header_bytes)) + header_bytes + body, len(changed)
+
+
+def read_delta_header(delta_bytes):
+    if not delta_bytes.startswith(DELTA_MAGIC):
+        raise ValueError("Not a database delta file.")
+    offset = len(DELTA_MAGIC)
+    (header_len,) = struct.unpack(">I", delta_bytes[offset:offset + 4])
+    offset += 4
+    header = json.loads(delta_bytes[offset:offset + header_len].decode("utf-8"))
+    return header, offset + header_len
+
+
+def apply_delta(db_path, delta_bytes, expected_seq=None):
+    """
+    Writes the delta's pages into the local file in place and truncates it to
+    the recorded page count. Verifies the resulting file checksum.
+    Returns the delta header.
+    """
+    header, body_offset = read_delta_header(delta_bytes)
+    if expected_seq is not None and header["seq"] != expected_seq:
+        raise ValueError(f"Delta out of order: expected seq {expected_seq}, got {header['seq']}.")
+
+    page_size = header["page_size"]
+    body = zlib.decompress(delta_bytes[body_offset:])
+    with open(db_path, "r+b") as f:
+        for i, page_index in enumerate(header["pages"]):
+            f.seek(page_index * page_size)
+            f.write(body[i * page_size:(i + 1) * page_size])
+        f.truncate(header["page_count"] * page_size)
+
+    if file_sha1(db_path) != header["result_sha1"]:
+        raise ValueError(f"Checksum mismatch after applying delta {header['seq']}.")
+    return header
@@ -0,0 +1,253 @@
+"""
+footprint_index.py — Local, spatially indexed store of OSM building footprints.
+
+Footprint suggestions used to be a live osmnx/Overpass query per building
+(several seconds, and triggered automatically on building_page reruns).
+An OSM extract (PBF or GeoJSON) of the working oblasts is now imported once
+into a separate SQLite file with an R*Tree, so a suggestion is a bbox lookup
+plus an exact contains() test:
+
+    import_footprints(path, progress_callback=None) -> {"footprints", "seconds"}
+    find_footprint(latitude, longitude)             -> shapely polygon | None
+    index_available()                               -> True once an extract is imported
+
+The index lives in its own file (FOOTPRINT_INDEX_PATH, default
+data/osm_footprints.sqlite) rather than in the main database, so a
+country-sized extract never bloats the database synced to GitHub.
+
+The source is chosen by config (secrets.toml or environment):
+
+    FOOTPRINT_SOURCE = "auto"      local index if imported, else Overpass (default)
+                       "local"     local index only (offline)
+                       "overpass"  live Overpass only (previous behaviour)
+"""
+import json
+import os
+import sqlite3
+import time
+
+from geom_cache import shape
+
+DEFAULT_INDEX_PATH = os.path.join("data", "osm_footprints.sqlite")
+FOOTPRINT_SOURCES  = ("auto", "local", "overpass")
+
+FOOTPRINT_TABLE = "TBL_REF_OSM_FOOTPRINT"
+RTREE_TABLE     = "TBL_REF_OSM_FOOTPRINT_RTREE"
+
+IMPORT_CHUNK_SIZE = 50000   # features read + written per step (bounds memory)
+
+
+def _setting(name, default):
+    value = os.environ.get(name)
+    if value:
+        return value
+    try:
+        import streamlit as st
+        return st.secrets.get(name, default)
+    except Exception:
+        return default
+
+
+def get_index_path():
+    return _setting("FOOTPRINT_INDEX_PATH", DEFAULT_INDEX_PATH)
+
+
+def footprint_source():
+    """Configured FOOTPRINT_SOURCE ("auto" if unset or unknown)."""
+    source = str(_setting("FOOTPRINT_SOURCE", "auto")).lower()
+    return source if source in FOOTPRINT_SOURCES else "auto"
+
+
+def _connect(path=None):
+    conn = sqlite3.connect(path or get_index_path(), timeout=5)
+    conn.execute("PRAGMA journal_mode = WAL")
+    return conn
+
+
+def ensure_index(path=None):
+    """Creates the footprint table and its R*Tree in the index file."""
+    path = path or get_index_path()
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    conn = _connect(path)
+    try:
+        conn.execute(f'''
+            CREATE TABLE IF NOT EXISTS {FOOTPRINT_TABLE} (
+                FOOTPRINT_ID INTEGER PRIMARY KEY,  -- R*Tree id (stable rowid alias)
+                OSM_ID       TEXT UNIQUE NOT NULL, -- e.g. 'way/123456' or source feature id
+                BUILDING     TEXT,                 -- OSM building=* value
+                GEOM_WKB     BLOB NOT NULL,        -- footprint polygon (EPSG:4326)
+                TAGS_JSON    TEXT,
+                SOURCE       TEXT,                 -- extract file name
+                IMPORTED_AT  TEXT
+            )
+        ''')
+        # One R*Tree entry per footprint bbox, keyed by FOOTPRINT_ID
+        conn.execute(f'''
+            CREATE VIRTUAL TABLE IF NOT EXISTS {RTREE_TABLE}
+            USING rtree(ID, MIN_X, MAX_X, MIN_Y, MAX_Y)
+        ''')
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def index_available(path=None):
+    """True if the index file exists and holds at least one footprint."""
+    path = path or get_index_path()
+    if not os.path.exists(path):
+        return False
+    conn = _connect(path)
+    try:
+        return conn.execute(f"SELECT 1 FROM {FOOTPRINT_TABLE} LIMIT 1").fetchone() is not None
+    except sqlite3.OperationalError:
+        return False
+    finally:
+        conn.close()
+
+
+# ------------------------------------------------------------------
+# Import
+# ------------------------------------------------------------------
+def _read_chunks(path):
+    """
+    Yields (building polygons in EPSG:4326, features read) for consecutive
+    IMPORT_CHUNK_SIZE batches. The extract is streamed in one pass through
+    pyogrio's Arrow reader; re-opening it per chunk (read_file(rows=...))
+    made a PBF import quadratic, since GDAL has to re-scan the file up to
+    the requested offset every time.
+    """
+    import geopandas as gpd
+    from pyogrio import open_arrow
+
+    if path.lower().endswith(".pbf"):
+        # GDAL OSM driver: closed ways and relations are in the "multipolygons" layer
+        source = open_arrow(path, layer="multipolygons", where="building IS NOT NULL",
+                            batch_size=IMPORT_CHUNK_SIZE, use_pyarrow=True)
+    else:
+        source = open_arrow(path, batch_size=IMPORT_CHUNK_SIZE, use_pyarrow=True)
+
+    with source as (meta, reader):
+        geometry_column = meta["geometry_name"] or "wkb_geometry"
+        for batch in reader:
+            df = batch.to_pandas()
+            n_read = len(df)
+            gdf = gpd.GeoDataFrame(
+                df.drop(columns=[geometry_column]),
+                geometry=gpd.GeoSeries.from_wkb(df[geometry_column]),
+                crs=meta["crs"],
+            )
+
+            if "building" in gdf.columns:
+                gdf = gdf[gdf["building"].notna()]
+            gdf = gdf[gdf.geometry.notna() & gdf.geom_type.isin(["Polygon", "MultiPolygon"])]
+            if gdf.crs is not None and gdf.crs.to_epsg() != 4326:
+                gdf = gdf.to_crs(epsg=4326)
+            yield gdf, n_read
+
+
+def _osm_ids(gdf, start, source):
+    """
+    OSM_ID keys for a chunk. Features without an OSM id are keyed by source
+    file and position, so a second id-less extract does not overwrite the
+    first one (re-importing the same file still updates in place).
+    """
+    if "osm_way_id" in gdf.columns or "osm_id" in gdf.columns:
+        way_ids = gdf["osm_way_id"].tolist() if "osm_way_id" in gdf.columns else [None] * len(gdf)
+        rel_ids = gdf["osm_id"].tolist() if "osm_id" in gdf.columns else [None] * len(gdf)
+        return [f"way/{w}" if w else f"relation/{r}" for w, r in zip(way_ids, rel_ids)]
+    if "id" in gdf.columns:
+        return [str(v) for v in gdf["id"].tolist()]
+    return [f"feature/{source}/{start + i}" for i in range(len(gdf))]
+
+
+def import_footprints(path, replace=False, index_path=None, progress_callback=None):
+    """
+    Imports building polygons from an OSM extract (.pbf or any GDAL vector
+    file such as GeoJSON) into the local index, IMPORT_CHUNK_SIZE features at
+    a time. replace=True empties the index first. progress_callback(done)
+    receives the number of features read so far.
+    Returns {"footprints", "seconds"}.
+    """
+    index_path = index_path or get_index_path()
+    ensure_index(index_path)
+    start_time = time.perf_counter()
+    source = os.path.basename(path)
+    imported_at = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+
+    conn = _connect(index_path)
+    try:
+        if replace:
+            conn.execute(f"DELETE FROM {FOOTPRINT_TABLE}")
+            conn.execute(f"DELETE FROM {RTREE_TABLE}")
+
+        written, start = 0, 0
+        for gdf, n_read in _read_chunks(path):
+            ids       = _osm_ids(gdf, start, source)
+            buildings = gdf["building"].tolist() if "building" in gdf.columns else [None] * len(gdf)
+            wkbs      = gdf.geometry.to_wkb().tolist()
+            boxes     = list(gdf.geometry.bounds[["minx", "miny", "maxx", "maxy"]].itertuples(index=False, name=None))
+            tag_cols  = [col for col in gdf.columns if col not in ("geometry", "building")]
+            tags      = [
+                json.dumps({k: str(v) for k, v in rec.items() if v is not None})
+                for rec in gdf[tag_cols].astype(object).to_dict("records")
+            ]
+
+            # Re-imports update a footprint in place (FOOTPRINT_ID kept) and
+            # overwrite its R*Tree entry
+            conn.executemany(f'''
+                INSERT INTO {FOOTPRINT_TABLE}
+                    (OSM_ID, BUILDING, GEOM_WKB, TAGS_JSON, SOURCE, IMPORTED_AT)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT (OSM_ID) DO UPDATE SET
+                    BUILDING = excluded.BUILDING, GEOM_WKB = excluded.GEOM_WKB,
+                    TAGS_JSON = excluded.TAGS_JSON, SOURCE = excluded.SOURCE,
+                    IMPORTED_AT = excluded.IMPORTED_AT
+            ''', [(i, b, w, t, source, imported_at) for i, b, w, t in zip(ids, buildings, wkbs, tags)])
+            conn.executemany(f'''
+                INSERT OR REPLACE INTO {RTREE_TABLE} (ID, MIN_X, MAX_X, MIN_Y, MAX_Y)
+                VALUES ((SELECT FOOTPRINT_ID FROM {FOOTPRINT_TABLE} WHERE OSM_ID = ?), ?, ?, ?, ?)
+            ''', [(i, min_x, max_x, min_y, max_y) for i, (min_x, min_y, max_x, max_y) in zip(ids, boxes)])
+            conn.commit()
+
+            written += len(ids)
+            start += n_read
+            if progress_callback:
+                progress_callback(start)
+    finally:
+        conn.close()
+
+    stats = {"footprints": written, "seconds": time.perf_counter() - start_time}
+    print(f"Imported {written} footprints from {source} in {stats['seconds']:.1f}s")
+    return stats
+
+
+# ------------------------------------------------------------------
+# Lookup
+# ------------------------------------------------------------------
+def find_footprint(latitude, longitude, index_path=None):
+    """
+    Returns the indexed footprint polygon containing the point (the smallest
+    one if several overlap), or None.
+    """
+    from shapely.geometry import Point
+
+    conn = _connect(index_path)
+    try:
+        candidates = conn.execute(f'''
+            SELECT f.OSM_ID, f.IMPORTED_AT, f.GEOM_WKB
+            FROM {RTREE_TABLE} r
+            JOIN {FOOTPRINT_TABLE} f ON f.FOOTPRINT_ID = r.ID
+            WHERE r.MIN_X <= ? AND r.MAX_X >= ? AND r.MIN_Y <= ? AND r.MAX_Y >= ?
+        ''', (longitude, longitude, latitude, latitude)).fetchall()
+    finally:
+        conn.close()
+
+    point = Point(longitude, latitude)
+    containing = [
+        # IMPORTED_AT in the key: a re-import replaces the polygon under the same OSM_ID
+        geom for geom in (shape(f"osm:{osm_id}", imported_at, wkb=wkb) for osm_id, imported_at, wkb in candidates)
+        if geom is not None and geom.contains(point)
+    ]
+    if not containing:
+        return None
+    return min(containing, key=lambda geom: geom.area)
@@ -0,0 +1,388 @@
+"""
+geocoder.py — Cached, rate-limited address geocoding.
+
+Every lookup goes through TBL_REF_GEOCODE_CACHE first, keyed by a normalised
+query string (Unicode form, case, comma spacing and whitespace folded), so
+re-saving an unchanged address never touches the network.
+Successful results are kept indefinitely; "not found" answers are kept for
+MISS_TTL_DAYS so typos are not retried on every save.
+
+    geocode_address(a_dict, provider=None)
+        Single address (the inspection pages): full address string first,
+        structured components as fallback. Same return value as before:
+        {"latitude", "longitude", "resolved_address"} or None.
+        A single attempt per query (INTERACTIVE_MAX_RETRIES), so a provider
+        outage costs at most two provider timeouts.
+
+    geocode_pending_addresses(provider=None, progress_callback=None, limit=None)
+        Every TBL_CORE_ADDRESS row with ADDR_GEOM_CREATED = 0 and an address
+        text. One worker thread does all network calls through the shared
+        rate limiter with retry and exponential backoff. Results are only
+        stored as candidates in the cache; nothing is written to the address
+        geometry until a user confirms it ("Validate Address Location").
+
+    get_geocode_candidate(a_dict)
+        Cache-only lookup of the candidate for an address (no network call).
+
+Network access is behind a provider object with a `name` and a
+`geocode(query) -> dict | None` method that raises GeocodingUnavailable on
+transient failures. NominatimProvider is the default; set_provider() or the
+provider argument swaps in a local stub.
+"""
+import queue
+import re
+import threading
+import time
+import unicodedata
+from datetime import datetime, timedelta, timezone
+
+from db_core import get_connection, db_session, _ADDR_TEXT_MISSING_SQL
+
+CACHE_TABLE = "TBL_REF_GEOCODE_CACHE"
+
+MIN_INTERVAL_SECONDS = 1.0    # Nominatim usage policy: at most 1 request per second
+MAX_RETRIES          = 3      # attempts per query in batch runs
+INTERACTIVE_MAX_RETRIES = 1   # attempts per query while a user is waiting
+BACKOFF_SECONDS      = 2.0    # doubled after every failed attempt
+MISS_TTL_DAYS        = 7
+
+
+class GeocodingUnavailable(Exception):
+    """Transient provider failure (timeout, 429/5xx); the lookup may be retried."""
+
+
+class NominatimProvider:
+    """OpenStreetMap Nominatim through geopy."""
+
+    name = "nominatim"
+
+    def __init__(self, user_agent="habitat_ukraine_refit", timeout=10):
+        from geopy.geocoders import Nominatim
+        self._geolocator = Nominatim(user_agent=user_agent)
+        self._timeout = timeout
+
+    def geocode(self, query):
+        from geopy.exc import GeocoderTimedOut, GeocoderServiceError
+        try:
+            location = self._geolocator.geocode(query, timeout=self._timeout)
+        except (GeocoderTimedOut, GeocoderServiceError) as e:
+            raise GeocodingUnavailable(str(e)) from e
+        if not location:
+            return None
+        return {
+            "latitude":         location.latitude,
+            "longitude":        location.longitude,
+            "resolved_address": location.address
+        }
+
+
+_PROVIDER = None
+_PROVIDER_LOCK = threading.Lock()
+
+
+def get_provider():
+    global _PROVIDER
+    with _PROVIDER_LOCK:
+        if _PROVIDER is None:
+            _PROVIDER = NominatimProvider()
+        return _PROVIDER
+
+
+def set_provider(provider):
+    """Replaces the process-wide provider (None restores Nominatim on next use)."""
+    global _PROVIDER
+    with _PROVIDER_LOCK:
+        _PROVIDER = provider
+
+
+class RateLimiter:
+    """Spaces calls at least min_interval seconds apart across all threads."""
+
+    def __init__(self, min_interval=MIN_INTERVAL_SECONDS):
+        self.min_interval = min_interval
+        self._lock = threading.Lock()
+        self._next_at = 0.0
+
+    def wait(self):
+        with self._lock:
+            now = time.monotonic()
+            delay = self._next_at - now
+            self._next_at = max(now, self._next_at) + self.min_interval
+        if delay > 0:
+            time.sleep(delay)
+
+
+_RATE_LIMITER = RateLimiter()
+
+
+# ------------------------------------------------------------------
+# Cache
+# ------------------------------------------------------------------
+def normalize_address(query):
+    """Cache key for a query string: NFKC, casefolded, single spaces, ', ' separators."""
+    text = unicodedata.normalize("NFKC", query or "").casefold()
+    text = re.sub(r"\s*,\s*", ", ", text)
+    text = re.sub(r"\s+", " ", text).strip(" ,")
+    return text
+
+
+def ensure_cache_table():
+    with db_session() as conn:
+        conn.execute(f'''
+            CREATE TABLE IF NOT EXISTS {CACHE_TABLE} (
+                ADDR_KEY         TEXT PRIMARY KEY,  -- normalize_address(query)
+                QUERY            TEXT,              -- query as last sent
+                LATITUDE         REAL,              -- NULL for a cached "not found"
+                LONGITUDE        REAL,
+                RESOLVED_ADDRESS TEXT,
+                PROVIDER         TEXT,
+                CACHED_AT        TEXT               -- UTC ISO timestamp
+            )
+        ''')
+
+
+def _cache_get(key):
+    """Returns (hit, result); result is None for a cached miss."""
+    conn = get_connection()
+    c = conn.cursor()
+    try:
+        c.execute(f'''
+            SELECT LATITUDE, LONGITUDE, RESOLVED_ADDRESS, CACHED_AT
+            FROM {CACHE_TABLE} WHERE ADDR_KEY = ?
+        ''', (key,))
+        row = c.fetchone()
+    finally:
+        conn.close()
+    if row is None:
+        return False, None
+    latitude, longitude, resolved, cached_at = row
+    if latitude is None:
+        expires = datetime.fromisoformat(cached_at) + timedelta(days=MISS_TTL_DAYS)
+        if datetime.now(timezone.utc) >= expires:
+            return False, None
+        return True, None
+    return True, {"latitude": latitude, "longitude": longitude, "resolved_address": resolved}
+
+
+def _cache_put(key, query, result, provider_name):
+    with db_session() as conn:
+        conn.execute(f'''
+            INSERT OR REPLACE INTO {CACHE_TABLE}
+                (ADDR_KEY, QUERY, LATITUDE, LONGITUDE, RESOLVED_ADDRESS, PROVIDER, CACHED_AT)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        ''', (
+            key, query,
+            result["latitude"] if result else None,
+            result["longitude"] if result else None,
+            result["resolved_address"] if result else None,
+            provider_name,
+            datetime.now(timezone.utc).isoformat()
+        ))
+
+
+def clear_geocode_cache():
+    ensure_cache_table()
+    with db_session() as conn:
+        conn.execute(f"DELETE FROM {CACHE_TABLE}")
+
+
+# ------------------------------------------------------------------
+# Lookups
+# ------------------------------------------------------------------
+def _provider_call(provider, query, max_retries=MAX_RETRIES):
+    """Rate-limited provider call with retry + exponential backoff. Raises after max_retries attempts."""
+    delay = BACKOFF_SECONDS
+    for attempt in range(max_retries):
+        _RATE_LIMITER.wait()
+        try:
+            return provider.geocode(query)
+        except GeocodingUnavailable as e:
+            if attempt == max_retries - 1:
+                raise
+            print(f"Geocoding retry {attempt + 1}/{max_retries - 1} in {delay:.0f}s: {e}")
+            time.sleep(delay)
+            delay *= 2
+
+
+def geocode_query(query, provider=None, max_retries=MAX_RETRIES):
+    """
+    Geocodes one query string through the cache.
+    Returns (result, from_cache); raises GeocodingUnavailable if the provider
+    stayed unavailable after max_retries attempts (nothing is cached then).
+    """
+    key = normalize_address(query)
+    if not key:
+        return None, False
+    hit, result = _cache_get(key)
+    if hit:
+        return result, True
+
+    provider = provider or get_provider()
+    result = _provider_call(provider, query, max_retries)
+    _cache_put(key, query, result, provider.name)
+    return result, False
+
+
+def _address_queries(a_dict):
+    full_address = ", ".join(filter(None, [
+        a_dict.get('ADDR_LINE1'),
+        a_dict.get('ADDR_LINE2'),
+        a_dict.get('CITY'),
+        a_dict.get('POSTCODE'),
+        a_dict.get('ADMIN_UNIT'),
+        a_dict.get('COUNTRY'),
+    ]))
+    structured = ", ".join(filter(None, [
+        a_dict.get('ADDR_LINE1'),
+        a_dict.get('CITY'),
+        a_dict.get('COUNTRY'),
+    ]))
+    return [q for q in (full_address, structured) if q]
+
+
+def _geocode_address_dict(a_dict, provider, max_retries=MAX_RETRIES):
+    """
+    Returns (result, all_from_cache). An unavailable provider only skips that
+    query, so the structured fallback still runs; GeocodingUnavailable is
+    raised only if no query found a result and at least one failed.
+    """
+    all_cached = True
+    unavailable = None
+    for query in _address_queries(a_dict):
+        try:
+            result, from_cache = geocode_query(query, provider, max_retries)
+        except GeocodingUnavailable as e:
+            unavailable = e
+            all_cached = False
+            continue
+        all_cached = all_cached and from_cache
+        if result:
+            return result, all_cached
+    if unavailable is not None:
+        raise unavailable
+    return None, all_cached
+
+
+def get_geocode_candidate(a_dict):
+    """
+    Cached candidate location for an address (e.g. from a batch run), or
+    None. Never calls the provider; keyed on the address text, so an edited
+    address has no candidate until it is geocoded again.
+    """
+    ensure_cache_table()
+    for query in _address_queries(a_dict):
+        key = normalize_address(query)
+        if not key:
+            continue
+        hit, result = _cache_get(key)
+        if hit and result:
+            return result
+    return None
+
+
+def geocode_address(a_dict, provider=None):
+    """
+    Attempts to geocode an address from TBL_CORE_ADDRESS data.
+    Tries full address string first, falls back to structured components.
+
+    Args:
+        a_dict: address dictionary from get_property_address()
+        provider: optional provider object (defaults to Nominatim)
+
+    Returns:
+        dict with 'latitude', 'longitude', 'resolved_address' or None if failed
+    """
+    ensure_cache_table()
+    try:
+        return _geocode_address_dict(a_dict, provider, INTERACTIVE_MAX_RETRIES)[0]
+    except GeocodingUnavailable as e:
+        print(f"Geocoding failed: {e}")
+        return None
+
+
+# ------------------------------------------------------------------
+# Batch geocoding
+# ------------------------------------------------------------------
+_DONE = object()
+
+
+def geocode_pending_addresses(provider=None, progress_callback=None, limit=None):
+    """
+    Geocodes every address with ADDR_GEOM_CREATED = 0 that has an address
+    text (same rule as the completeness status) and an address point
+    geometry row. Results become unconfirmed candidates in the cache (see
+    get_geocode_candidate); the geometry itself is only written when a user
+    validates the location. progress_callback(done, total) runs on the
+    calling thread after each address.
+    Returns {"addresses", "geocoded", "cached", "not_found", "failed", "seconds"}.
+    """
+    ensure_cache_table()
+    provider = provider or get_provider()
+
+    conn = get_connection()
+    c = conn.cursor()
+    try:
+        sql = f'''
+            SELECT a.ID_ADDR_GEOM, a.ADDR_LINE1, a.ADDR_LINE2, a.CITY, a.POSTCODE, a.ADMIN_UNIT, a.COUNTRY
+            FROM TBL_CORE_ADDRESS a
+            WHERE COALESCE(a.ADDR_GEOM_CREATED, 0) = 0 AND a.ID_ADDR_GEOM IS NOT NULL
+              AND NOT {_ADDR_TEXT_MISSING_SQL}
+            ORDER BY a.ROWID
+        '''
+        params = ()
+        if limit:
+            sql += " LIMIT ?"
+            params = (limit,)
+        c.execute(sql, params)
+        columns = [d[0] for d in c.description]
+        pending = [dict(zip(columns, row)) for row in c.fetchall()]
+    finally:
+        conn.close()
+
+    stats = {"addresses": len(pending), "geocoded": 0, "cached": 0, "not_found": 0, "failed": 0, "seconds": 0.0}
+    start = time.perf_counter()
+    jobs, results = queue.Queue(), queue.Queue()
+    for a_dict in pending:
+        jobs.put(a_dict)
+    jobs.put(_DONE)
+
+    # Single network worker: requests are serialised and rate limited. The
+    # worker reads and writes the geocode cache through its own pooled
+    # connection; stats and progress reporting stay on the calling thread.
+    def worker():
+        while True:
+            a_dict = jobs.get()
+            if a_dict is _DONE:
+                results.put(_DONE)
+                return
+            try:
+                result, from_cache = _geocode_address_dict(a_dict, provider)
+                results.put((a_dict, result, from_cache, None))
+            except Exception as e:
+                results.put((a_dict, None, False, e))
+
+    threading.Thread(target=worker, name="geocode-worker", daemon=True).start()
+
+    done = 0
+    while True:
+        item = results.get()
+        if item is _DONE:
+            break
+        a_dict, result, from_cache, error = item
+        if error is not None:
+            print(f"Geocoding failed for {a_dict['ID_ADDR_GEOM']}: {error}")
+            stats["failed"] += 1
+        elif result is None:
+            stats["not_found"] += 1
+        else:
+            stats["geocoded"] += 1
+            stats["cached"] += int(from_cache)
+        done += 1
+        if progress_callback:
+            progress_callback(done, len(pending))
+
+    stats["seconds"] = time.perf_counter() - start
+    print(f"Batch geocoding: {stats['geocoded']}/{stats['addresses']} geocoded "
+          f"({stats['cached']} from cache, {stats['not_found']} not found, {stats['failed']} failed) "
+          f"in {stats['seconds']:.1f}s")
+    return stats
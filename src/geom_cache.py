@@ -0,0 +1,218 @@
+"""
+geom_cache.py — Bounded LRU cache of parsed geometries.
+
+Parsing WKT (shapely.wkt.loads for footprints, a regex for POINTs) is
+repeated on every Streamlit rerun for geometries that rarely change.
+Parsed results are cached under (GEOM_ID, UPDATED_AT): every updater in
+db_core stamps UPDATED_AT, so an edit produces a new key and the stale
+entry simply ages out of the LRU.
+
+Each kind has its own LRU so that a burst of address points cannot evict
+the expensive boundary polygons. Points are bounded by entry count; shapes
+and prepared shapes are bounded by their total vertex count, so one
+country-sized ADM1 polygon costs as much as thousands of footprints.
+
+    point_latlon(geom_id, updated_at, wkt) -> {"latitude", "longitude"} | None
+    shape(geom_id, updated_at, wkt, wkb)   -> shapely geometry | None
+    prepared_shape(geom_id, updated_at, load)
+                                           -> prepared geometry for repeated
+                                              contains() tests | None
+    cache_info()                           -> hits / misses / size per kind
+
+It also holds the WKB codec for the GEOM_WKB columns (to_wkb / wkb_to_wkt).
+shapely is imported lazily, so db_core keeps working without it (WKB is
+then simply not written and readers fall back to WKT).
+"""
+import re
+import threading
+from collections import OrderedDict
+
+POINT_MAXSIZE = 20000          # one (lat, lon) tuple per address / entrance
+SHAPE_MAX_VERTICES = 2000000   # footprints, coarse boundaries (~32 MB of coordinates)
+PREPARED_MAX_VERTICES = 2000000  # full ADM1-3 boundaries used for contains()
+
+_POINT_RE = re.compile(r"POINT\(([-\d\.]+) ([-\d\.]+)\)")
+_MISSING = object()
+
+
+def _vertex_count(value):
+    """Cost of a cached shapely (or prepared) geometry; 1 if it cannot be measured."""
+    if value is None:
+        return 1
+    try:
+        import shapely
+        return max(1, int(shapely.get_num_coordinates(getattr(value, "context", value))))
+    except Exception:
+        return 1
+
+
+class GeometryCache:
+    """
+    Thread-safe LRU map with hit/miss counters (shared by all sessions).
+    Bounded by `maxsize` entries, or by the summed `weigh(value)` when
+    `maxweight` is given.
+    """
+
+    def __init__(self, maxsize=None, maxweight=None, weigh=None):
+        self.maxsize = maxsize
+        self.maxweight = maxweight
+        self.weight = 0
+        self.hits = 0
+        self.misses = 0
+        self._weigh = weigh or (lambda value: 1)
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _over_budget(self):
+        if self.maxsize is not None and len(self._data) > self.maxsize:
+            return True
+        return self.maxweight is not None and self.weight > self.maxweight
+
+    def get_or_parse(self, key, parse):
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is not _MISSING:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+
+        # Parse outside the lock; a concurrent miss on the same key is harmless
+        value = parse()
+        weight = self._weigh(value)
+        with self._lock:
+            previous = self._data.pop(key, _MISSING)
+            if previous is not _MISSING:
+                self.weight -= previous[1]
+            self._data[key] = (value, weight)
+            self.weight += weight
+            # Always keep the entry just added, even if it alone exceeds the budget
+            while len(self._data) > 1 and self._over_budget():
+                _, (_, evicted) = self._data.popitem(last=False)
+                self.weight -= evicted
+        return value
+
+    def info(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "vertices": self.weight if self.maxweight is not None else None,
+                "max_vertices": self.maxweight,
+            }
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.weight = 0
+            self.hits = 0
+            self.misses = 0
+
+
+_CACHES = {
+    "point": GeometryCache(maxsize=POINT_MAXSIZE),
+    "shape": GeometryCache(maxweight=SHAPE_MAX_VERTICES, weigh=_vertex_count),
+    "prepared": GeometryCache(maxweight=PREPARED_MAX_VERTICES, weigh=_vertex_count),
+}
+
+
+def _parse_point(wkt):
+    match = _POINT_RE.search(wkt) if wkt else None
+    if match:
+        return float(match.group(2)), float(match.group(1))  # (lat, lon)
+    return None
+
+
+def point_latlon(geom_id, updated_at, wkt):
+    """Returns {"latitude", "longitude"} from a POINT(longitude latitude) WKT, or None."""
+    if geom_id is None:
+        latlon = _parse_point(wkt)
+    else:
+        latlon = _CACHES["point"].get_or_parse((geom_id, updated_at), lambda: _parse_point(wkt))
+    if latlon is None:
+        return None
+    return {"latitude": latlon[0], "longitude": latlon[1]}
+
+
+def _load_shape(wkt, wkb):
+    # WKB is binary and parses much faster than WKT text, so prefer it
+    if wkb:
+        import shapely.wkb
+        return shapely.wkb.loads(bytes(wkb))
+    import shapely.wkt
+    return shapely.wkt.loads(wkt)
+
+
+def shape(geom_id, updated_at, wkt=None, wkb=None):
+    """Returns the shapely geometry from WKB or WKT (None if both are empty). Raises on invalid input."""
+    if not wkt and not wkb:
+        return None
+    if geom_id is None:
+        return _load_shape(wkt, wkb)
+    return _CACHES["shape"].get_or_parse((geom_id, updated_at), lambda: _load_shape(wkt, wkb))
+
+
+def prepared_shape(geom_id, updated_at, load):
+    """
+    Returns a shapely prepared geometry, cached like shape(). `load` is only
+    called on a miss and returns (wkt, wkb) or None, so callers can skip
+    reading large blobs when the geometry is already cached.
+    """
+    def parse():
+        row = load()
+        if not row or (not row[0] and not row[1]):
+            return None
+        from shapely.prepared import prep
+        return prep(_load_shape(row[0], row[1]))
+
+    return _CACHES["prepared"].get_or_parse((geom_id, updated_at), parse)
+
+
+# ------------------------------------------------------------------
+# WKB codec (GEOM_WKB columns)
+# ------------------------------------------------------------------
+def wkb_supported():
+    """True if shapely is installed (WKB can be written and read)."""
+    try:
+        import shapely.wkb  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def to_wkb(geometry):
+    """
+    WKB bytes for a WKT string or shapely geometry.
+    Returns None if shapely is not installed or the input cannot be parsed.
+    """
+    if geometry is None:
+        return None
+    try:
+        import shapely.wkb
+        import shapely.wkt
+        geom = shapely.wkt.loads(geometry) if isinstance(geometry, str) else geometry
+        return shapely.wkb.dumps(geom)
+    except Exception:
+        return None
+
+
+def wkb_to_wkt(wkb):
+    """WKT view of a WKB blob (None for NULL)."""
+    if not wkb:
+        return None
+    import shapely.wkb
+    return shapely.wkb.loads(bytes(wkb)).wkt
+
+
+def cache_info():
+    """{kind: {"hits", "misses", "hit_rate", "size", "maxsize", "vertices", "max_vertices"}}"""
+    return {kind: cache.info() for kind, cache in _CACHES.items()}
+
+
+def clear_cache():
+    for cache in _CACHES.values():
+        cache.clear()
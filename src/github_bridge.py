@@ -1,7 +1,27 @@
 import os
+import time
+import atexit
+import threading
+from datetime import datetime
+import requests
 import streamlit as st
-from github import Github
+from github import Github, GithubException, UnknownObjectException, BadCredentialsException
 import base64
+import db_sync
+from db_core import reset_connection_pool
+
+# Push a compacted full snapshot after this many deltas (override: SYNC_COMPACT_EVERY)
+DEFAULT_COMPACT_EVERY = 25
+
+# Background push queue: edits within the debounce window become one commit
+DEFAULT_PUSH_DEBOUNCE = 5      # seconds of quiet before a batch is pushed
+DEFAULT_PUSH_MAX_WAIT = 30     # upper bound on how long the first queued edit waits
+PUSH_BACKOFF_BASE     = 2      # retry delay doubles from here ...
+PUSH_BACKOFF_MAX      = 120    # ... up to this many seconds
+
+# Serialises pushes (worker thread) against pulls (session threads), so each
+# delta is built against the manifest left by the previous sync.
+_PUSH_LOCK = threading.Lock()
 
 # === Detect runtime ===
 # Set this manually for local testing, or detect automatically
@@ -20,7 +40,8 @@ def get_config():
             "db_path": "data/database_dev.sqlite",
             "token": None,
             "repo_name": None,
-            "branch": "main"
+            "branch": "main",
+            "compact_every": DEFAULT_COMPACT_EVERY
         }
     else:
         # Cloud config using secrets
@@ -29,7 +50,10 @@ def get_config():
                 "token": st.secrets["GITHUB_TOKEN"],
                 "repo_name": st.secrets["REPO_NAME"],
                 "db_path": st.secrets.get("DB_FILE_PATH", "data/database.sqlite"),
-                "branch": st.secrets.get("REPO_BRANCH", "main")
+                "branch": st.secrets.get("REPO_BRANCH", "main"),
+                "compact_every": int(st.secrets.get("SYNC_COMPACT_EVERY", DEFAULT_COMPACT_EVERY)),
+                "push_debounce": float(st.secrets.get("PUSH_DEBOUNCE_SECONDS", DEFAULT_PUSH_DEBOUNCE)),
+                "push_max_wait": float(st.secrets.get("PUSH_MAX_WAIT_SECONDS", DEFAULT_PUSH_MAX_WAIT))
             }
             # Check for placeholders
             if "your_personal_access_token" in config["token"] or "your_username" in config["repo_name"]:
@@ -38,6 +62,93 @@ def get_config():
         except Exception:
             return None
 
+# ------------------------------------------------------------------
+# Shared GitHub client (one per server process)
+# ------------------------------------------------------------------
+# Github() keeps its own pooled HTTP connection, so reusing the client and
+# repo handle across sessions saves the get_repo() round-trip and the TLS
+# handshake on every save. Raw downloads share one requests.Session.
+_CLIENT_LOCK = threading.Lock()
+_CLIENT = {"key": None, "github": None, "repo": None}
+_HTTP = requests.Session()
+
+def get_repo_handle(config):
+    """Returns the cached repo handle for (token, repo_name), creating it on first use."""
+    key = (config["token"], config["repo_name"])
+    with _CLIENT_LOCK:
+        if _CLIENT["key"] != key:
+            g = Github(config["token"])
+            _CLIENT.update(key=key, github=g, repo=g.get_repo(config["repo_name"]))
+        return _CLIENT["repo"]
+
+def reset_github_client():
+    """Drops the cached client; the next call re-authenticates."""
+    with _CLIENT_LOCK:
+        _CLIENT.update(key=None, github=None, repo=None)
+
+def _with_auth_retry(fn, config, *args):
+    """Runs fn(config, *args); on an auth error, rebuilds the client once and retries."""
+    try:
+        return fn(config, *args)
+    except BadCredentialsException:
+        print("DEBUG: GitHub auth error, refreshing client.")
+        reset_github_client()
+        return fn(config, *args)
+
+def _download_raw(content_file, token):
+    """Downloads a (small) repo file via its raw URL into memory."""
+    headers = {"Authorization": f"token {token}"}
+    response = _HTTP.get(content_file.download_url, headers=headers)
+    if response.status_code != 200:
+        raise RuntimeError(f"Raw download failed: {response.status_code}")
+    return response.content
+
+def _download_to_file(content_file, token, dest_path, chunk_size=1 << 20):
+    """Streams a repo file via its raw URL to dest_path without buffering it in memory."""
+    headers = {"Authorization": f"token {token}"}
+    with _HTTP.get(content_file.download_url, headers=headers, stream=True) as response:
+        if response.status_code != 200:
+            raise RuntimeError(f"Raw download failed: {response.status_code}")
+        with open(dest_path, "wb") as f:
+            for chunk in response.iter_content(chunk_size=chunk_size):
+                f.write(chunk)
+
+def _branch_changed(config, etag=None):
+    """
+    Conditional GET on the branch head. Returns (changed, etag); a 304 reply
+    means no commit since `etag` was issued and does not count against the
+    API rate limit.
+    """
+    url = f"https://api.github.com/repos/{config['repo_name']}/branches/{config['branch']}"
+    headers = {"Authorization": f"token {config['token']}"}
+    if etag:
+        headers["If-None-Match"] = etag
+    try:
+        response = _HTTP.get(url, headers=headers, timeout=10)
+    except requests.RequestException:
+        return True, None
+    if response.status_code == 304:
+        return False, etag
+    return True, response.headers.get("ETag")
+
+def _list_deltas(repo, config, snapshot_sha):
+    """Returns the delta files recorded on top of a snapshot, in sequence order."""
+    try:
+        entries = repo.get_contents(db_sync.delta_dir(config["db_path"], snapshot_sha), ref=config["branch"])
+    except UnknownObjectException:
+        return []
+    return sorted((e for e in entries if e.name.endswith(".delta")), key=lambda e: e.name)
+
+def _swap_in_database(tmp_path, db_path):
+    """
+    Loads the downloaded file into the local DB and makes every session reconnect.
+    The content is restored through the SQLite backup API into the open
+    database instead of replacing the file, so pooled connections in other
+    threads never commit into an orphaned WAL or a file swapped under them.
+    """
+    db_sync.copy_database(tmp_path, db_path)
+    reset_connection_pool()
+
 def pull_database():
     """Pull the database from GitHub if running in Cloud"""
     if RUN_TIME == "local":
@@ -55,41 +166,134 @@ def pull_database():
         st.warning("GitHub Secrets not configured. Persistence disabled.")
         return False
 
-    try:
-        g = Github(config["token"])
-        repo = g.get_repo(config["repo_name"])
-                
-        # 1. Get file metadata
-        contents = repo.get_contents(config["db_path"], ref=config["branch"])
-        
-        # 2. Ensure local folder exists
-        local_folder = os.path.dirname(config["db_path"])
-        os.makedirs(local_folder, exist_ok=True)
-
-        # 3. USE RAW DOWNLOAD for binary files (fixes "unsupported encoding: none")
-        import requests
-        headers = {"Authorization": f"token {config['token']}"}
-        response = requests.get(contents.download_url, headers=headers)
-        
-        if response.status_code == 200:
-            with open(config["db_path"], "wb") as f:
-                f.write(response.content)
-            st.write(f"✅ DATABASE SYNCED (Raw Download) to {config['db_path']}")
-        else:
-            st.error(f"❌ Raw download failed: {response.status_code}")
-            return False
+    # Ship queued local edits first, they would be overwritten by the snapshot
+    flushed = flush_push_queue()
 
-        # Store SHA to prevent overwrite conflicts
-        st.session_state['db_sha'] = contents.sha
-        st.sidebar.success(f"✅ DB Synced (v.{contents.sha[:7]})")
-        return True
+    try:
+        with _PUSH_LOCK:
+            return _with_auth_retry(_pull_locked, config, flushed)
     except Exception as e:
         st.sidebar.error(f"❌ Pull failed: {e}")
         return False
 
-def push_database(commit_message="Update database from Streamlit App"):
+def _pull_locked(config, flushed=True):
+    """
+    Brings the local DB up to the remote snapshot + deltas. Never overwrites
+    local edits: if the push queue could not be flushed (retrying, conflict,
+    timeout) or the local copy has pages the manifest does not know, the
+    local DB is kept as is and the sync status is left alone.
+    """
+    db_path = config["db_path"]
+    manifest = db_sync.load_manifest(db_path) if os.path.exists(db_path) else None
+    if not flushed:
+        return _pull_kept_local("queued edits could not be pushed")
+
+    # 0. Conditional request on the branch head: 304 = nothing pushed since our last check
+    changed, branch_etag = _branch_changed(config, manifest.get("branch_etag") if manifest else None)
+    if not changed:
+        return _pull_done(manifest["snapshot_sha"], manifest["seq"], "DB up to date")
+
+    repo = get_repo_handle(config)
+
+    # 1. Get file metadata
+    contents = repo.get_contents(db_path, ref=config["branch"])
+    deltas = _list_deltas(repo, config, contents.sha)
+
+    # 2. Ensure local folder exists
+    local_folder = os.path.dirname(db_path)
+    os.makedirs(local_folder, exist_ok=True)
+    tmp_path = db_path + ".download"
+
+    try:
+        # 3. One consistent copy of the local DB is checked for unsynced pages;
+        #    those edits exist nowhere else, so the remote must not replace them
+        local_seq = manifest["seq"] if manifest else 0
+        if manifest:
+            db_sync.copy_database(db_path, tmp_path)
+            if db_sync.build_delta(tmp_path, manifest)[0] is not None:
+                return _pull_kept_local("the local database has edits that were never pushed")
+
+            # Same snapshot: patch the copy with the missing deltas only
+            if manifest["snapshot_sha"] == contents.sha and local_seq <= len(deltas):
+                missing = deltas[local_seq:]
+                if missing:
+                    for seq, entry in enumerate(missing, start=local_seq + 1):
+                        db_sync.apply_delta(tmp_path, _download_raw(entry, config["token"]), expected_seq=seq)
+                    _swap_in_database(tmp_path, db_path)
+                    db_sync.save_manifest(db_path, contents.sha, len(deltas), source_path=tmp_path)
+                db_sync.update_manifest(db_path, branch_etag=branch_etag)
+                label = f"Applied {len(missing)} new deltas" if missing else "DB up to date"
+                return _pull_done(contents.sha, len(deltas), label)
+            db_sync.remove_database_file(tmp_path)
+
+        # 4. USE RAW DOWNLOAD for binary files, streamed to a temp file
+        try:
+            _download_to_file(contents, config["token"], tmp_path)
+        except RuntimeError as e:
+            st.error(f"❌ {e}")
+            return False
+
+        # 5. Replay the deltas pushed on top of this snapshot, in order
+        for seq, entry in enumerate(deltas, start=1):
+            db_sync.apply_delta(tmp_path, _download_raw(entry, config["token"]), expected_seq=seq)
+
+        _swap_in_database(tmp_path, db_path)
+        db_sync.save_manifest(db_path, contents.sha, len(deltas), source_path=tmp_path)
+        db_sync.update_manifest(db_path, branch_etag=branch_etag)
+        st.write(f"✅ DATABASE SYNCED (snapshot + {len(deltas)} deltas) to {db_path}")
+        return _pull_done(contents.sha, len(deltas), "DB Synced")
+    finally:
+        # Partial downloads / patched copies never outlive the pull
+        db_sync.remove_database_file(tmp_path)
+
+def _pull_kept_local(reason):
+    """The remote was not loaded to protect local edits; the sync status (e.g. conflict) is kept."""
+    print(f"DEBUG: Pull skipped, {reason}.")
+    st.sidebar.warning(f"⚠️ Server copy not loaded: {reason}. Working on the local database.")
+    return True
+
+def _pull_done(sha, seq, label):
+    with _QUEUE_COND:
+        if _SYNC_STATUS["state"] == "conflict":
+            _SYNC_STATUS.update(state="idle", last_error=None)
+
+    # Store SHA to prevent overwrite conflicts
+    st.session_state['db_sha'] = sha
+    st.session_state['db_seq'] = seq
+    st.sidebar.success(f"✅ {label} (v.{sha[:7]}+{seq})")
+    return True
+
+# ------------------------------------------------------------------
+# Push: background queue
+# ------------------------------------------------------------------
+# Button handlers only enqueue a commit message; one daemon worker per
+# server process coalesces edits made within the debounce window into a
+# single commit and retries failed pushes with exponential backoff.
+# The worker has no Streamlit script context, so it reports through
+# _SYNC_STATUS, which render_sync_status() shows in the sidebar.
+_QUEUE_COND = threading.Condition()
+_QUEUE = {
+    "messages": [],      # commit messages waiting for the next push
+    "first_at": None,    # monotonic time of the oldest queued edit
+    "last_at":  None,    # monotonic time of the newest queued edit
+    "retry_at": None,    # backoff: no push attempt before this time
+    "flush":    False,   # skip the debounce / backoff wait once
+    "config":   None,
+    "base_sha": None,
+}
+_SYNC_STATUS = {
+    "state":          "idle",   # idle | pushing | retrying | conflict
+    "attempts":       0,
+    "last_error":     None,
+    "last_synced_at": None,
+    "last_sha":       None,
+}
+_WORKER = None
+
+def push_database(commit_message="Update database from Streamlit App", wait=False):
     """
-    Commits local DB using Optimistic Locking (SHA Check).
+    Queues the local DB for syncing to GitHub and returns immediately.
+    With wait=True, blocks until the queue (including this edit) is pushed.
     """
     config = get_config()
     if not config:
@@ -100,43 +304,193 @@ def push_database(commit_message="Update database from Streamlit App"):
         print("DEBUG: Skipping GitHub push (runner is local/no token).")
         return True
 
-    try:
-        g = Github(config["token"])
-        repo = g.get_repo(config["repo_name"])
-        
-        # 1. Get current remote SHA
-        remote_contents = repo.get_contents(config["db_path"], ref=config["branch"])
-        remote_sha = remote_contents.sha
-        
-        # 2. Get the SHA we started with
-        local_base_sha = st.session_state.get('db_sha')
-        
-        # 3. SAFETY CHECK: Has the remote file changed since we pulled?
-        if local_base_sha and remote_sha != local_base_sha:
-            st.sidebar.error("⚠️ CONFLICT: Database changed on server! Pulling latest version...")
-            # LOGIC for handling conflict (Pull -> Re-apply?)
-            # For now, we abort to prevent overwrite
-            return False
-            
-        # 4. Read local file
-        with open(config["db_path"], "rb") as f:
+    now = time.monotonic()
+    with _QUEUE_COND:
+        if not _QUEUE["messages"]:
+            _QUEUE["first_at"] = now
+        _QUEUE["messages"].append(commit_message)
+        _QUEUE["last_at"] = now
+        _QUEUE["config"] = config
+        _QUEUE["base_sha"] = st.session_state.get('db_sha')
+        _ensure_worker()
+        _QUEUE_COND.notify_all()
+
+    if wait:
+        return flush_push_queue()
+    return True
+
+def flush_push_queue(timeout=60):
+    """
+    Pushes queued edits now and waits for the worker. Returns True if every
+    edit reached GitHub (False while retrying, after a conflict or on timeout).
+    """
+    deadline = time.monotonic() + timeout
+    with _QUEUE_COND:
+        if not _QUEUE["messages"]:
+            return _SYNC_STATUS["state"] == "idle"
+        _QUEUE["flush"] = True
+        _QUEUE_COND.notify_all()
+        while _QUEUE["messages"] or _SYNC_STATUS["state"] == "pushing":
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            _QUEUE_COND.wait(remaining)
+        return _SYNC_STATUS["state"] == "idle"
+
+def render_sync_status():
+    """Sidebar widget: pending edits and the last successful sync."""
+    with _QUEUE_COND:
+        pending = len(_QUEUE["messages"])
+        status = dict(_SYNC_STATUS)
+
+    if status["state"] == "conflict":
+        st.sidebar.error(f"⚠️ Sync stopped: {status['last_error']}")
+    elif status["state"] == "retrying":
+        st.sidebar.warning(f"⏳ {pending} edit(s) pending, retrying (attempt {status['attempts']}): {status['last_error']}")
+    elif pending or status["state"] == "pushing":
+        st.sidebar.info(f"⏳ Syncing... {pending} edit(s) pending")
+
+    if status["last_synced_at"]:
+        st.sidebar.caption(f"☁️ Last synced {status['last_synced_at']:%H:%M:%S} (v.{status['last_sha'][:7]})")
+
+def _ensure_worker():
+    global _WORKER
+    if _WORKER is None or not _WORKER.is_alive():
+        _WORKER = threading.Thread(target=_push_worker, name="db-push-worker", daemon=True)
+        _WORKER.start()
+
+def _combine_messages(messages):
+    """One commit message for a batch of edits (duplicates collapsed)."""
+    if len(messages) == 1:
+        return messages[0]
+    unique = list(dict.fromkeys(messages))
+    return f"Batch update ({len(messages)} edits)\n\n" + "\n".join(f"- {m}" for m in unique)
+
+def _push_worker():
+    while True:
+        with _QUEUE_COND:
+            while not _QUEUE["messages"]:
+                _QUEUE_COND.wait()
+
+            # Debounce: wait for a quiet window (capped), or for the retry backoff
+            while not _QUEUE["flush"]:
+                config = _QUEUE["config"]
+                due = min(_QUEUE["last_at"] + config["push_debounce"],
+                          _QUEUE["first_at"] + config["push_max_wait"])
+                if _QUEUE["retry_at"]:
+                    due = max(due, _QUEUE["retry_at"])
+                remaining = due - time.monotonic()
+                if remaining <= 0:
+                    break
+                _QUEUE_COND.wait(remaining)
+
+            messages = _QUEUE["messages"]
+            config, base_sha = _QUEUE["config"], _QUEUE["base_sha"]
+            _QUEUE.update(messages=[], first_at=None, last_at=None, flush=False)
+            _SYNC_STATUS["state"] = "pushing"
+
+        try:
+            with _PUSH_LOCK:
+                result, sha = _with_auth_retry(_push_locked, config, _combine_messages(messages), base_sha)
+            error = None
+        except Exception as e:
+            result, sha, error = "error", None, str(e)
+            print(f"DEBUG: Push failed exception: {e}")
+
+        with _QUEUE_COND:
+            if result == "error":
+                # Put the batch back in front of anything queued meanwhile and back off
+                attempts = _SYNC_STATUS["attempts"] + 1
+                now = time.monotonic()
+                _QUEUE["messages"] = messages + _QUEUE["messages"]
+                _QUEUE["first_at"] = _QUEUE["first_at"] or now
+                _QUEUE["last_at"] = _QUEUE["last_at"] or now
+                _QUEUE["retry_at"] = now + min(PUSH_BACKOFF_BASE * 2 ** (attempts - 1), PUSH_BACKOFF_MAX)
+                _SYNC_STATUS.update(state="retrying", attempts=attempts, last_error=error)
+            elif result == "conflict":
+                # Retrying cannot help: the remote moved on, a pull is needed
+                _QUEUE["retry_at"] = None
+                _SYNC_STATUS.update(state="conflict", attempts=0,
+                                    last_error="Database changed on server! Reload the app to pull the latest version.")
+            else:
+                _QUEUE["retry_at"] = None
+                _SYNC_STATUS.update(state="idle", attempts=0, last_error=None,
+                                    last_synced_at=datetime.now(), last_sha=sha)
+            _QUEUE_COND.notify_all()
+
+# Give queued edits a last chance when the server shuts down cleanly
+atexit.register(flush_push_queue, 30)
+
+def _push_locked(config, commit_message, base_sha=None):
+    """
+    Syncs the local DB to GitHub using Optimistic Locking (SHA Check).
+    Ships only the changed SQLite pages as a delta file; every
+    `compact_every` deltas (or when a delta is not worth it) the full file
+    is pushed as a new snapshot, which starts a fresh delta chain.
+    Returns (result, snapshot_sha) with result "ok", "noop" or "conflict".
+    """
+    repo = get_repo_handle(config)
+    db_path = config["db_path"]
+
+    manifest = db_sync.load_manifest(db_path)
+
+    # 1. Get current remote snapshot SHA
+    remote_contents = repo.get_contents(db_path, ref=config["branch"])
+    remote_sha = remote_contents.sha
+
+    # 2. Get the SHA we started with
+    local_base_sha = manifest["snapshot_sha"] if manifest else base_sha
+
+    # 3. SAFETY CHECK: Has the remote snapshot changed since we pulled?
+    if local_base_sha and remote_sha != local_base_sha:
+        return "conflict", remote_sha
+
+    # One consistent copy of the DB: the delta pages, its result checksum, a
+    # full upload and the new manifest all describe exactly this state.
+    # Commits landing meanwhile stay unsynced and go out with the next push.
+    with db_sync.database_snapshot(db_path) as snapshot_path:
+        # 4. Delta push: only the pages changed since the last sync
+        can_delta = (manifest is not None
+                     and manifest["page_size"] == db_sync.read_page_size(snapshot_path)
+                     and manifest["seq"] < config["compact_every"])
+        if can_delta:
+            delta, n_pages = db_sync.build_delta(snapshot_path, manifest)
+            if delta is None:
+                return "noop", remote_sha
+
+            if len(delta) < os.path.getsize(snapshot_path) // 2:
+                seq = manifest["seq"] + 1
+                delta_path = f"{db_sync.delta_dir(db_path, remote_sha)}/{db_sync.delta_name(seq)}"
+                try:
+                    repo.create_file(delta_path, commit_message, delta, branch=config["branch"])
+                except GithubException as e:
+                    if e.status == 422:
+                        # Another server already pushed this sequence number
+                        return "conflict", remote_sha
+                    raise
+
+                db_sync.save_manifest(db_path, remote_sha, seq, source_path=snapshot_path)
+                print(f"DEBUG: Pushed delta {seq} ({n_pages} pages) on v.{remote_sha[:7]}")
+                return "ok", remote_sha
+
+        # 5. Compacted snapshot: make sure no deltas were appended that we have not seen
+        known_seq = manifest["seq"] if manifest else 0
+        if len(_list_deltas(repo, config, remote_sha)) > known_seq:
+            return "conflict", remote_sha
+
+        with open(snapshot_path, "rb") as f:
             content = f.read()
-            
-        # 5. Push
+
         commit = repo.update_file(
-            config["db_path"],
+            db_path,
             commit_message,
             content,
             remote_sha, # Use the fresh remote SHA to ensure the chain is valid
             branch=config["branch"]
         )
-        
-        # 6. Update local SHA to the new commit's file SHA
-        st.session_state['db_sha'] = commit['content'].sha
-        st.sidebar.success(f"🚀 Saved (v.{commit['content'].sha[:7]})")
-        return True
-        
-    except Exception as e:
-        st.sidebar.error(f"❌ Push failed 2: {e}")
-        print(f"DEBUG: Push failed exception: {e}")
-        return False
+
+        # 6. New snapshot's file SHA starts a new delta chain
+        new_sha = commit['content'].sha
+        db_sync.save_manifest(db_path, new_sha, 0, source_path=snapshot_path)
+    print(f"DEBUG: Pushed snapshot v.{new_sha[:7]}")
+    return "ok", new_sha
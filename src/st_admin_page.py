@@ -1,10 +1,21 @@
 import streamlit as st
 import pandas as pd
-from db_core import get_users, add_user, get_enum_options, get_connection, update_user_password, delete_user
+from db_core import get_users, add_user, get_enum_options, get_connection, update_user_password, delete_user, delete_properties
 from github_bridge import push_database
 
 from auth_manager import hash_password
-from utils.auxiliaryDataImport import AuxiliaryDataImporter, AVAILABLE_DATASETS
+from utils.auxiliaryDataImport import AuxiliaryDataImporter, AVAILABLE_DATASETS, geocode_pending_addresses
+from admin_resolver import backfill_admin_regions
+from geom_cache import cache_info, clear_cache
+
+try:
+    import folium
+    from streamlit_folium import st_folium
+except ImportError:
+    folium = None
+    st_folium = None
+
+BOUNDARY_LEVELS = {1: "Oblasts (ADM1)", 2: "Raions (ADM2)", 3: "Hromadas (ADM3)"}
 
 def admin_page():
     # 1. USER PROFILE SECTION (Always visible)
@@ -114,6 +125,29 @@ def admin_page():
                             st.error("User already exists or database error.")
                     else:
                         st.error("Please fill in all fields.")
+
+        # Bulk removal of properties (e.g. test records) in one transaction
+        st.subheader("Property Cleanup")
+        with st.expander("Delete Several Properties"):
+            conn = get_connection()
+            props_df = pd.read_sql_query(
+                "SELECT SYS_PROPERTY_ID, ID_CADASTRAL_NO, ID_ADMIN_UNIT FROM TBL_CORE_PROPERTY ORDER BY ID_CADASTRAL_NO", conn
+            )
+            conn.close()
+            labels = {
+                f"{row.ID_CADASTRAL_NO or '(no cadastral no.)'} · {row.ID_ADMIN_UNIT or '-'} · {row.SYS_PROPERTY_ID[:8]}": row.SYS_PROPERTY_ID
+                for row in props_df.itertuples()
+            }
+            to_delete = st.multiselect("Properties to delete", list(labels.keys()))
+            confirm_bulk = st.checkbox("I understand this permanently deletes the selected properties and all linked records.")
+            if st.button("Delete Selected Properties", disabled=not (to_delete and confirm_bulk)):
+                deleted = delete_properties([labels[label] for label in to_delete])
+                if deleted is not False:
+                    push_database(f"{deleted} properties deleted")
+                    st.success(f"Deleted {deleted} properties.")
+                    st.rerun()
+                else:
+                    st.error("Database error — nothing was deleted.")
     else:
         st.info("💡 You are logged in as an expert. Expert management is restricted to administrators.")
 
@@ -150,8 +184,12 @@ def admin_page():
                 if is_loaded:
                     st.warning(f"Dataset '{selected_name}' is already loaded. Use confirmation below to overwrite.")
                 else:
+                    progress = st.progress(0.0, text="Writing features...")
                     with st.spinner(f"Ingesting {selected_name}..."):
-                        success, message = importer.ingest_dataset(selected_id)
+                        success, message = importer.ingest_dataset(
+                            selected_id,
+                            progress_callback=lambda done, total: progress.progress(done / total, text=f"Writing features... {done}/{total}")
+                        )
                         if success:
                             st.success(message)
                             push_database(f"Auxiliary data ingested: {selected_id}")
@@ -162,8 +200,12 @@ def admin_page():
             with st.expander("Overwrite Existing Data"):
                 st.warning("Overwriting will delete existing records for this dataset.")
                 if st.button("Confirm Overwrite", key=f"overwrite_{selected_id}"):
+                    progress = st.progress(0.0, text="Writing features...")
                     with st.spinner(f"Overwriting {selected_name}..."):
-                        success, message = importer.ingest_dataset(selected_id, overwrite=True)
+                        success, message = importer.ingest_dataset(
+                            selected_id, overwrite=True,
+                            progress_callback=lambda done, total: progress.progress(done / total, text=f"Writing features... {done}/{total}")
+                        )
                         if success:
                             st.success(message)
                             push_database(f"Auxiliary data overwritten: {selected_id}")
@@ -171,6 +213,26 @@ def admin_page():
                         else:
                             st.error(message)
 
+        # Load several boundary layers (e.g. ADM1-ADM3) from one archive in a single action
+        with st.expander("Load Several Datasets at Once"):
+            boundary_names = sorted([d["name"] for d in datasets if d["type"] == "Administrative Boundaries"])
+            batch_names = st.multiselect("Datasets", boundary_names, default=boundary_names)
+            batch_overwrite = st.checkbox("Overwrite datasets that are already loaded", key="batch_overwrite")
+            if st.button("Ingest Selected", disabled=not batch_names):
+                batch_ids = [dataset_ids[name] for name in batch_names]
+                progress = st.progress(0.0, text="Writing features...")
+                with st.spinner(f"Ingesting {len(batch_ids)} datasets..."):
+                    success, message = importer.ingest_datasets(
+                        batch_ids, overwrite=batch_overwrite,
+                        progress_callback=lambda dataset_id, done, total: progress.progress(done / total, text=f"{dataset_id}: writing features... {done}/{total}")
+                    )
+                    if success:
+                        st.success(message)
+                        push_database(f"Auxiliary data ingested: {', '.join(batch_ids)}")
+                        st.rerun()
+                    else:
+                        st.error(message)
+
         # Overview of loaded datasets
         loaded_data = importer.get_loaded_datasets()
         if not loaded_data.empty:
@@ -188,6 +250,66 @@ def admin_page():
                 width='stretch'
             )
 
+            # Boundary map drawn from the simplified geometry tiers
+            if folium and st_folium and st.checkbox("Show Boundaries on Map"):
+                level = st.selectbox("Admin level", list(BOUNDARY_LEVELS), format_func=BOUNDARY_LEVELS.get)
+                layer = importer.get_boundary_geojson(level)
+                if layer["features"]:
+                    m = folium.Map(location=[48.4, 31.2], zoom_start=6)
+                    folium.GeoJson(
+                        layer,
+                        style_function=lambda x: {"color": "#3388ff", "weight": 1, "fillOpacity": 0.05},
+                        tooltip=folium.GeoJsonTooltip(fields=["name", "code"], aliases=["Name", "Code"])
+                    ).add_to(m)
+                    st_folium(m, use_container_width=True, height=500, key="boundary_map", returned_objects=[])
+                else:
+                    st.info("No boundaries loaded for this level.")
+
+            # Assign ADM1-3 codes to every geocoded address in one batch run
+            if st.button("Resolve Admin Regions for All Addresses"):
+                progress = st.progress(0.0)
+                with st.spinner("Resolving admin regions..."):
+                    stats = backfill_admin_regions(
+                        progress_callback=lambda done, total: progress.progress(done / total)
+                    )
+                st.success(
+                    f"Resolved {stats['addresses']} addresses ({stats['links']} region links) "
+                    f"in {stats['seconds']:.1f}s — {stats['addresses_per_second']:.0f} addresses/s"
+                )
+                if stats['links']:
+                    push_database("Admin regions resolved for geocoded addresses")
+
+        # Geocode every address without a location (cached, max. 1 request/s).
+        # Results are candidates only; each one is confirmed on the Address tab.
+        if st.button("Geocode All Pending Addresses"):
+            progress = st.progress(0.0)
+            with st.spinner("Geocoding addresses..."):
+                stats = geocode_pending_addresses(
+                    progress_callback=lambda done, total: progress.progress(done / total)
+                )
+            st.success(
+                f"Found candidate locations for {stats['geocoded']} of {stats['addresses']} addresses "
+                f"({stats['cached']} from cache, {stats['not_found']} not found, {stats['failed']} failed) "
+                f"in {stats['seconds']:.1f}s. Confirm each one on the property's Address tab."
+            )
+            if stats['geocoded']:
+                push_database("Geocoding candidates cached for pending addresses")
+
+        # Parsed-geometry cache of this server process (points, footprints, boundaries)
+        with st.expander("Geometry Cache"):
+            cache_df = pd.DataFrame.from_dict(cache_info(), orient="index")
+            cache_df["hit_rate"] = (cache_df["hit_rate"] * 100).round(1)
+            st.dataframe(
+                cache_df.rename(columns={
+                    "hits": "Hits", "misses": "Misses", "hit_rate": "Hit Rate (%)", "size": "Entries",
+                    "maxsize": "Max Entries", "vertices": "Vertices", "max_vertices": "Max Vertices"
+                }),
+                width='stretch'
+            )
+            if st.button("Clear Geometry Cache"):
+                clear_cache()
+                st.rerun()
+
     # 3. DATABASE EXPLORER (Visible to all except 'visitor')
     # ToDo: add VISITOR role to the enum table
     if current_role != 'VISITOR':
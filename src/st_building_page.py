@@ -1,14 +1,16 @@
 import streamlit as st
 from datetime import datetime
 from db_core import (
-    get_connection, get_enum_options, get_address_geometry,
+    get_enum_options,
+    get_property_aggregate,
     update_building_geometry, update_building_geom_flag,
-    get_geometry_data, update_building_entr_flag,
+    update_building_entr_flag,
     update_building_entrance_geometry, add_building,
     delete_building, update_building_details, update_safety,
     update_technical_audit, update_fieldwork_status
 )
 from github_bridge import push_database
+from geom_cache import point_latlon, shape
 
 try:
     import folium
@@ -148,48 +150,23 @@ def building_page(property_id):
     # property. b_list is a list to support complex/multi-building
     # properties where ID_COMPLEX_FLAG = 1.
     # ------------------------------------------------------------------
-    conn = get_connection()
-    c = conn.cursor()
+    aggregate = get_property_aggregate(property_id)
 
     # Property record — geometry FKs and complex flag
-    c.execute("SELECT * FROM TBL_CORE_PROPERTY WHERE SYS_PROPERTY_ID = ?", (property_id,))
-    row  = c.fetchone()
-    cols = [d[0] for d in c.description]
-    p_dict = dict(zip(cols, row)) if row else {}
+    p_dict = aggregate['property_dict']
 
     # Address record — addr_type and geometry validation flag
-    c.execute("SELECT * FROM TBL_CORE_ADDRESS WHERE FK_PROPERTY_ID = ?", (property_id,))
-    row  = c.fetchone()
-    cols = [d[0] for d in c.description]
-    a_dict = dict(zip(cols, row)) if row else {}
+    a_dict = aggregate['address_dict']
 
     # Building records — list supports single and complex properties
-    # Joined with Inspection and Suitability tables
-    c.execute("""
-        SELECT b.*, 
-               i.INSP_ROUTINE_REPAIR, i.INSP_MAJOR_REPAIR, 
-               i.INSP_RECONSTRUCTION, i.INSP_REFITTING,
-               s.SUIT_IDP_YES, s.SUIT_AFTER_RECON, s.SUIT_AFTER_REFIT, s.SUIT_UNSUITABLE,
-               sa.SAFE_PWD_ACCESS, sa.SAFE_FIRE, sa.SAFE_SANITARY, sa.SAFE_CIVIL_DEF,
-               sa.SAFE_HAZARD_ZONE, sa.SAFE_CLASS, sa.SAFE_CAT, sa.SAFE_NOTES,
-               ta.*
-        FROM TBL_CORE_BUILDING b
-        LEFT JOIN TBL_CORE_INSPECTION i ON b.SYS_BLD_ID = i.FK_BLD_ID
-        LEFT JOIN TBL_CORE_SUITABILITY s ON b.SYS_BLD_ID = s.FK_BUILDING_ID
-        LEFT JOIN TBL_CORE_SAFETY sa ON b.SYS_BLD_ID = sa.FK_BUILDING_ID
-        LEFT JOIN TBL_CORE_BUILDING_TECH_AUDIT ta ON b.SYS_BLD_ID = ta.FK_BLD_ID
-        WHERE b.FK_PROPERTY_ID = ?
-    """, (property_id,))
-    rows = c.fetchall()
-    cols = [d[0] for d in c.description]
-    b_list = [dict(zip(cols, row)) for row in rows]
+    # Joined with Inspection, Suitability, Safety and Tech Audit tables
+    b_list = aggregate['buildings']
     
     # ------------------------------------------------------------------
     # BUILDING CONTEXT MANAGER
     # ------------------------------------------------------------------
     if not b_list:
         st.error("No building records found for this property.")
-        conn.close()
         return
 
     # Track which building is active in session state
@@ -262,8 +239,6 @@ def building_page(property_id):
     submitted_s2 = False
     # Default to current building's fieldwork status if not overridden by the selector
     new_fw_status = current_bld.get('BLD_FIELDWORK_STATUS') or 0
-    
-    conn.close()
 
     # ------------------------------------------------------------------
     # GEOMETRY STATE
@@ -283,16 +258,22 @@ def building_page(property_id):
     addr_geom_data = None
     entr_geom_data = None
     
+    # Address point, every footprint and the entrances came with the aggregate
+    geometries = aggregate['geometries']
+
     if point_ready:
-        addr_geom_data = get_address_geometry(a_dict.get('ID_ADDR_GEOM'))
+        addr_geom_id   = a_dict.get('ID_ADDR_GEOM')
+        addr_row       = geometries.get(addr_geom_id) or {}
+        addr_geom_data = point_latlon(addr_geom_id, addr_row.get('updated_at'), addr_row.get('wkt'))
         if addr_geom_data:
             map_centre = [addr_geom_data['latitude'], addr_geom_data['longitude']]
             zoom       = 17
             
     # Fetch Building Entrance Point (if non-physical OR complex)
     if b_id and (str(addr_type).upper() != 'PHYSICAL' or is_complex):
-        # Use the existing get_address_geometry function since it handles WKT parsing for points
-        entr_geom_data = get_address_geometry(b_id)
+        # The entrance point geometry shares the building's SYS_BLD_ID
+        entr_row       = geometries.get(b_id) or {}
+        entr_geom_data = point_latlon(b_id, entr_row.get('updated_at'), entr_row.get('wkt'))
         
         # If entrance exists, prefer it as map centre if not draft mode
         if entr_geom_data and not st.session_state.get('edit_entr_mode'):
@@ -327,7 +308,7 @@ def building_page(property_id):
         if current_bld:
             b_geom_id = current_bld.get('ID_BUILDING_GEOM')
             
-            existing_geom_data = get_geometry_data(b_geom_id)
+            existing_geom_data = geometries.get(b_geom_id)
             has_geom = bool(existing_geom_data and existing_geom_data.get('wkt'))
             
             is_validated_ui = st.toggle(
@@ -622,7 +603,7 @@ UPDATE TBL_BUILDING_GEOM SET GEOM_BLD_CREATED = {int(is_validated)} WHERE SYS_GE
                 is_active = (bid == st.session_state.active_bld_id)
                 
                 if b_geom_id:
-                    g_data = get_geometry_data(b_geom_id)
+                    g_data = geometries.get(b_geom_id)
                     if g_data and g_data.get('wkt') and shapely:
                         # ACTIVE vs GHOST STYLING
                         if is_active:
@@ -635,7 +616,8 @@ UPDATE TBL_BUILDING_GEOM SET GEOM_BLD_CREATED = {int(is_validated)} WHERE SYS_GE
                             style = {'fillColor': '#95a5a6', 'color': '#7f8c8d', 'weight': 1, 'fillOpacity': 0.1}
 
                         try:
-                            geom_obj = shapely.wkt.loads(g_data['wkt'])
+                            # Parsed once per (GEOM_ID, UPDATED_AT), reused across reruns
+                            geom_obj = shape(b_geom_id, g_data.get('updated_at'), g_data['wkt'], g_data.get('wkb'))
                             folium.GeoJson(geom_obj, style_function=lambda x, s=style: s).add_to(m)
                         except Exception as e:
                             st.error(f"Render error for {bid}: {e}")
@@ -646,7 +628,7 @@ UPDATE TBL_BUILDING_GEOM SET GEOM_BLD_CREATED = {int(is_validated)} WHERE SYS_GE
             # Automatic fetch ONLY if no geom exists at all for CURRENT building
             if current_bld and point_ready and not is_validated:
                 b_geom_id = current_bld.get('ID_BUILDING_GEOM')
-                existing_geom_check = get_geometry_data(b_geom_id)
+                existing_geom_check = geometries.get(b_geom_id)
                 has_any_geom = existing_geom_check and existing_geom_check.get('wkt')
 
                 if not has_any_geom and 'pending_footprint' not in st.session_state:
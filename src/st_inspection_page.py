@@ -1,17 +1,20 @@
 import streamlit as st
 import pandas as pd
 from db_core import (
-    get_connection, get_enum_options, 
-    add_property, delete_property, update_property_name,
+    get_connection, get_enum_options, get_property_aggregate,
+    add_property, add_properties_bulk, delete_property, update_property_name,
     update_property_metadata,
     update_legal_ownership, update_property_address, 
     update_landplot, update_governance,
     get_address_geometry, update_address_geometry,
-    reset_address_geometry
+    reset_address_geometry,
+    list_properties, count_properties, get_property_list_row, get_property_cities,
+    search_properties, count_properties_by_status,
+    COMPLETENESS_STATUSES
 )
 from github_bridge import push_database
 from datetime import datetime
-from utils.auxiliaryDataImport import geocode_address
+from utils.auxiliaryDataImport import geocode_address, get_geocode_candidate
 
 import streamlit.components.v1 as components
 
@@ -56,66 +59,95 @@ except ImportError:
     folium = None
     st_folium = None
 
-def get_properties_list():
-    """Fetches a list of all properties for the selection dropdown/table."""
-    conn = get_connection()
-    query = """
-    SELECT 
-        p.SYS_PROPERTY_ID, 
-        p.ID_ADMIN_UNIT, 
-        COALESCE(i.ENUM_LABEL, p.ID_ADMIN_UNIT) as ADMIN_UNIT_LABEL,
-        p.ID_CADASTRAL_NO,
-        a.CITY,
-        a.ADDR_LINE1
-    FROM TBL_CORE_PROPERTY p
-    LEFT JOIN TBL_CORE_ADDRESS a ON p.SYS_PROPERTY_ID = a.FK_PROPERTY_ID
-    LEFT JOIN TBL_REF_ENUM e ON e.ENUM_GROUP = 'ADMIN_UNIT' AND e.ENUM_CODE = p.ID_ADMIN_UNIT
-    LEFT JOIN TBL_REF_ENUM_I18N i ON i.FK_ENUM_ID = e.SYS_ENUM_ID AND i.LANGUAGE_CODE = 'en'
-    ORDER BY p.ID_CADASTRAL_NO
+# Completeness status (db_core TBL_SYS_PROPERTY_STATUS) -> list icon
+STATUS_ICONS = {"READY": "✅", "PARTIAL": "🟡", "SKELETON": "🔴"}
+
+FIELDWORK_FILTER = {
+    "Not Selected": 0,
+    "Selected": 1,
+    "In Progress": 2,
+    "Received": 3,
+}
+
+def get_properties_page():
     """
-    df = pd.read_sql_query(query, conn)
-    conn.close()
-    return df
+    Renders the list filters + pager and fetches only the visible page of
+    properties (db_core.list_properties). The selected property is always
+    included, even when it is not on the current page.
+    """
+    with st.expander("🔎 Find Property", expanded=False):
+        search = st.text_input("Search (cadastral number, address, building use or notes)", key="prop_filter_search")
+        if search.strip():
+            # Ranked full-text hits; picking one jumps straight to that property
+            hits = {h['SYS_PROPERTY_ID']: h for h in search_properties(search, limit=10)}
+            if hits:
+                def _jump_to_hit():
+                    if st.session_state.prop_search_pick:
+                        st.session_state.selected_property_id = st.session_state.prop_search_pick
+
+                st.selectbox(
+                    "Best matches", [None] + list(hits), key="prop_search_pick", on_change=_jump_to_hit,
+                    format_func=lambda pid: "—" if pid is None else
+                        f"{hits[pid]['ID_CADASTRAL_NO']} | {hits[pid]['SNIPPET'] or hits[pid]['ADDR_LINE1'] or ''}"
+                )
+        col_a, col_b, col_c, col_d = st.columns(4)
+        with col_a:
+            admin_options = get_enum_options("ADMIN_UNIT")
+            admin_labels = ["All"] + [o[1] for o in admin_options]
+            admin_label = st.selectbox("Administrative Unit", admin_labels, key="prop_filter_admin")
+        with col_b:
+            city = st.selectbox("City", ["All"] + get_property_cities(), key="prop_filter_city")
+        with col_c:
+            status_counts = count_properties_by_status()
+            status = st.selectbox(
+                "Completeness", ["All"] + list(COMPLETENESS_STATUSES), key="prop_filter_status",
+                format_func=lambda v: v if v == "All" else f"{STATUS_ICONS[v]} {v.title()} ({status_counts[v]})"
+            )
+        with col_d:
+            fieldwork = st.selectbox("Fieldwork", ["All"] + list(FIELDWORK_FILTER), key="prop_filter_fieldwork")
+
+    filters = {
+        "admin_unit": dict((o[1], o[0]) for o in admin_options).get(admin_label),
+        "city": None if city == "All" else city,
+        "status": None if status == "All" else status,
+        "fieldwork_status": FIELDWORK_FILTER.get(fieldwork),
+        "search": search.strip() or None,
+    }
+
+    # Cursor stack: one keyset cursor per page visited; reset when filters change
+    if st.session_state.get('prop_list_filters') != filters:
+        st.session_state.prop_list_filters = filters
+        st.session_state.prop_list_cursors = [None]
+    cursors = st.session_state.prop_list_cursors
+
+    page = list_properties(after=cursors[-1], **filters)
+    rows = page["rows"]
+
+    col_prev, col_info, col_next = st.columns([1, 4, 1])
+    with col_prev:
+        if st.button("◀ Previous", disabled=len(cursors) == 1, key="prop_list_prev"):
+            cursors.pop()
+            st.rerun()
+    with col_info:
+        st.caption(f"Page {len(cursors)} · {count_properties(**filters)} matching properties")
+    with col_next:
+        if st.button("Next ▶", disabled=page["next_cursor"] is None, key="prop_list_next"):
+            cursors.append(page["next_cursor"])
+            st.rerun()
+
+    selected_id = st.session_state.get('selected_property_id')
+    if selected_id and all(r['SYS_PROPERTY_ID'] != selected_id for r in rows):
+        selected_row = get_property_list_row(selected_id)
+        if selected_row:
+            rows = [selected_row] + rows
+
+    columns = ['SYS_PROPERTY_ID', 'ID_ADMIN_UNIT', 'ADMIN_UNIT_LABEL', 'ID_CADASTRAL_NO', 'CITY', 'ADDR_LINE1',
+               'COMPLETENESS']
+    return pd.DataFrame(rows, columns=columns), any(v is not None for v in filters.values())
 
 def get_property_skeleton(property_id):
     """Fetches all skeleton data for a specific property."""
-    conn = get_connection()
-    c = conn.cursor()
-    
-    data = {}
-
-    # 0. Property
-    c.execute("SELECT * FROM TBL_CORE_PROPERTY WHERE SYS_PROPERTY_ID = ?", (property_id,))
-    row = c.fetchone()
-    cols = [d[0] for d in c.description]
-    data['property_dict'] = dict(zip(cols, row)) if row else {}
-    
-    # 1. Legal Ownership
-    c.execute("SELECT * FROM TBL_CORE_LEGAL_OWNERSHIP WHERE FK_PROPERTY_ID = ?", (property_id,))
-    row = c.fetchone()
-    cols = [d[0] for d in c.description]
-    data['legal_dict'] = dict(zip(cols, row)) if row else {}
-
-    # 2. Address
-    c.execute("SELECT * FROM TBL_CORE_ADDRESS WHERE FK_PROPERTY_ID = ?", (property_id,))
-    row = c.fetchone()
-    cols = [d[0] for d in c.description]
-    data['address_dict'] = dict(zip(cols, row)) if row else {}
-
-    # 3. Land Plot
-    c.execute("SELECT * FROM TBL_CORE_LANDPLOT WHERE FK_PROPERTY_ID = ?", (property_id,))
-    row = c.fetchone()
-    cols = [d[0] for d in c.description]
-    data['land_dict'] = dict(zip(cols, row)) if row else {}
-
-    # 4. Governance
-    c.execute("SELECT * FROM TBL_CORE_GOVERNANCE WHERE FK_PROPERTY_ID = ?", (property_id,))
-    row = c.fetchone()
-    cols = [d[0] for d in c.description]
-    data['gov_dict'] = dict(zip(cols, row)) if row else {}
-
-    conn.close()
-    return data
+    return get_property_aggregate(property_id)
 
 def get_skeleton_status(data, is_pending=False):
     """Calculates completeness status of the property skeleton."""
@@ -153,6 +185,55 @@ def get_skeleton_status(data, is_pending=False):
     else:
         return f"🟡 {', '.join(missing)} Missing", "orange"
 
+# Column names accepted in the property import file (case-insensitive)
+IMPORT_COLUMNS = {
+    "cadastral_no": ["cadastral_no", "id_cadastral_no", "cadastral number"],
+    "admin_unit":   ["admin_unit", "id_admin_unit", "administrative unit"],
+}
+
+def read_property_import(uploaded_file):
+    """Reads an uploaded CSV/XLSX into a list of {'cadastral_no', 'admin_unit'} dicts."""
+    if uploaded_file.name.lower().endswith((".xlsx", ".xls")):
+        df = pd.read_excel(uploaded_file, dtype=str)
+    else:
+        df = pd.read_csv(uploaded_file, dtype=str)
+    columns = {str(col).strip().lower(): col for col in df.columns}
+    rename = {}
+    for key, aliases in IMPORT_COLUMNS.items():
+        source = next((columns[a] for a in aliases if a in columns), None)
+        if source is None:
+            raise ValueError(f"Missing column '{key}' (expected one of: {', '.join(aliases)})")
+        rename[source] = key
+    df = df[list(rename.keys())].rename(columns=rename)
+    return df.where(df.notna(), None).to_dict("records")
+
+def property_import_section():
+    """CSV/XLSX onboarding of many property skeletons at once (add_properties_bulk)."""
+    with st.expander("📥 Import Properties from CSV / Excel"):
+        st.caption("One row per property with the columns `cadastral_no` and `admin_unit` "
+                   "(administrative unit code or label). Invalid rows are skipped and listed below.")
+        uploaded = st.file_uploader("Property list", type=["csv", "xlsx"], key="property_import_file")
+        if uploaded is None:
+            return
+        try:
+            rows = read_property_import(uploaded)
+        except Exception as e:
+            st.error(f"❌ Could not read file: {e}")
+            return
+        st.write(f"{len(rows)} rows found.")
+        st.dataframe(pd.DataFrame(rows).head(10), hide_index=True, width='stretch')
+
+        if st.button("Import Properties", type="primary", disabled=not rows):
+            with st.spinner(f"Creating {len(rows)} property skeletons..."):
+                result = add_properties_bulk(rows)
+            if result["created"]:
+                push_database(f"{len(result['created'])} properties imported")
+                st.success(f"✅ {len(result['created'])} properties created.")
+            if result["errors"]:
+                st.warning(f"⚠️ {len(result['errors'])} rows skipped:")
+                st.dataframe(pd.DataFrame(result["errors"], columns=["Row", "Problem"]),
+                             hide_index=True, width='stretch')
+
 def inspection_page():
     st.header("Property Inspection & Inventory")
     st.write("""Review and complete the property record before proceeding to the physical building assessment. "
@@ -167,16 +248,23 @@ def inspection_page():
     if 'edit_addr_mode' not in st.session_state:
         st.session_state.edit_addr_mode = False
 
+    # Bulk onboarding (also available while the list is still empty)
+    property_import_section()
+
     # 1. PROPERTY SELECTION
-    properties_df = get_properties_list()
+    properties_df, filtered = get_properties_page()
     
     if properties_df.empty:
-        st.info("No properties found. Please add or import properties first.")
+        if filtered:
+            st.info("No properties match the current filters.")
+        else:
+            st.info("No properties found. Please add or import properties first.")
         return
 
     # Create a nice display label for selection
     properties_df['display_label'] = properties_df.apply(
-        lambda x: f"{x['ID_CADASTRAL_NO']} | {x['ADMIN_UNIT_LABEL'] or 'Unknown Region'} ({x['CITY'] or 'No City Data'})", axis=1
+        lambda x: f"{STATUS_ICONS.get(x['COMPLETENESS'], '⚪')} {x['ID_CADASTRAL_NO']} | "
+                  f"{x['ADMIN_UNIT_LABEL'] or 'Unknown Region'} ({x['CITY'] or 'No City Data'})", axis=1
     )
     
     # Calculate index based on st.session_state.selected_property_id
@@ -599,7 +687,17 @@ def inspection_page():
                                 c_lon.markdown(f"**Longitude:** `0.000000`")
                                 st.info("👆 *Click on the map to set the new location*")
                 else:
-                    st.info("🗺️ Map will appear here once a location is found.")
+                    # Candidate from a batch geocoding run: confirmed through the same validation step
+                    candidate = get_geocode_candidate(a_dict) if a_dict.get('ID_ADDR_GEOM') else None
+                    if candidate:
+                        st.info(f"🔎 Geocoded candidate: {candidate['resolved_address']}")
+                        if st.button("Review Candidate Location", use_container_width=True):
+                            st.session_state.pending_geocode = candidate
+                            st.session_state.pending_geom_id = a_dict.get('ID_ADDR_GEOM')
+                            activate_tab('address', property_index=st.session_state.get('property_index', 0))
+                            st.rerun()
+                    else:
+                        st.info("🗺️ Map will appear here once a location is found.")
 
             if submitted:
                 if update_property_address(selected_id, new_line1, new_line2,
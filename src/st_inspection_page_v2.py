@@ -1,7 +1,7 @@
 import streamlit as st
 import pandas as pd
 from db_core import (
-    get_connection, get_enum_options, 
+    get_connection, get_enum_options, get_property_aggregate,
     add_property, delete_property,
     update_complex_flag,
     update_legal_ownership, update_property_address, 
@@ -75,43 +75,7 @@ def get_properties_list():
 
 def get_property_skeleton(property_id):
     """Fetches all skeleton data for a specific property."""
-    conn = get_connection()
-    c = conn.cursor()
-    
-    data = {}
-
-    # 0. Property
-    c.execute("SELECT * FROM TBL_CORE_PROPERTY WHERE SYS_PROPERTY_ID = ?", (property_id,))
-    row = c.fetchone()
-    cols = [d[0] for d in c.description]
-    data['property_dict'] = dict(zip(cols, row)) if row else {}
-    
-    # 1. Legal Ownership
-    c.execute("SELECT * FROM TBL_CORE_LEGAL_OWNERSHIP WHERE FK_PROPERTY_ID = ?", (property_id,))
-    row = c.fetchone()
-    cols = [d[0] for d in c.description]
-    data['legal_dict'] = dict(zip(cols, row)) if row else {}
-
-    # 2. Address
-    c.execute("SELECT * FROM TBL_CORE_ADDRESS WHERE FK_PROPERTY_ID = ?", (property_id,))
-    row = c.fetchone()
-    cols = [d[0] for d in c.description]
-    data['address_dict'] = dict(zip(cols, row)) if row else {}
-
-    # 3. Land Plot
-    c.execute("SELECT * FROM TBL_CORE_LANDPLOT WHERE FK_PROPERTY_ID = ?", (property_id,))
-    row = c.fetchone()
-    cols = [d[0] for d in c.description]
-    data['land_dict'] = dict(zip(cols, row)) if row else {}
-
-    # 4. Governance
-    c.execute("SELECT * FROM TBL_CORE_GOVERNANCE WHERE FK_PROPERTY_ID = ?", (property_id,))
-    row = c.fetchone()
-    cols = [d[0] for d in c.description]
-    data['gov_dict'] = dict(zip(cols, row)) if row else {}
-
-    conn.close()
-    return data
+    return get_property_aggregate(property_id)
 
 def get_skeleton_status(data, is_pending=False):
     """Calculates completeness status of the property skeleton."""
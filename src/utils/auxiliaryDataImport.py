@@ -3,11 +3,10 @@
 import sqlite3
 import uuid
 import json
-import zipfile
-import tempfile
-import os
 from datetime import datetime, timezone
-from io import BytesIO
+
+from archive_cache import extracted_gdb
+from geom_cache import shape, prepared_shape, wkb_supported
 
 # ---------------------------------------------------------------------------
 # Authoritative list of available auxiliary datasets
@@ -15,6 +14,7 @@ from io import BytesIO
 # "admin_level": 1 = State/Province
 # "admin_level": 2 = County/District
 # "admin_level": 3 = City/Town
+# Optional "sha256": expected checksum of the archive at "url" (verified by archive_cache)
 # ---------------------------------------------------------------------------
 AVAILABLE_DATASETS = [
     {
@@ -59,26 +59,6 @@ AVAILABLE_DATASETS = [
 ]
 
 
-# ---------------------------------------------------------------------------
-# Helper: download GDB zip and extract to a temp directory
-# ---------------------------------------------------------------------------
-def _download_and_extract_gdb(url: str) -> str:
-    """Downloads a zipped GDB and extracts it to a temp directory. Returns the GDB path."""
-    import requests
-    response = requests.get(url, timeout=120)
-    response.raise_for_status()
-
-    tmp_dir = tempfile.mkdtemp()
-    with zipfile.ZipFile(BytesIO(response.content)) as z:
-        z.extractall(tmp_dir)
-
-    for entry in os.listdir(tmp_dir):
-        if entry.endswith(".gdb"):
-            return os.path.join(tmp_dir, entry)
-
-    raise FileNotFoundError("No .gdb folder found in zip archive.")
-
-
 # ---------------------------------------------------------------------------
 # Main importer class
 # ---------------------------------------------------------------------------
@@ -86,6 +66,20 @@ class AuxiliaryDataImporter:
 
     BOUNDARIES_TABLE = "TBL_REF_ADMIN_BOUNDARIES"
     METADATA_TABLE   = "TBL_REF_DATASET_METADATA"
+    RTREE_TABLE      = "TBL_REF_ADMIN_BOUNDARIES_RTREE"
+
+    # Boundary rows per executemany() call during ingestion
+    BOUNDARY_CHUNK_SIZE = 500
+
+    # Simplified copies of each boundary stored next to GEOM_WKB:
+    # tier -> (column, tolerance in degrees). Topology-preserving, so every
+    # tier stays a valid polygon within `tolerance` of the full outline.
+    SIMPLIFY_TIERS = {
+        "coarse": ("GEOM_WKB_COARSE", 0.01),    # ~1 km: country/oblast maps, lookup pre-test
+        "medium": ("GEOM_WKB_MEDIUM", 0.001),   # ~100 m: raion/hromada maps
+    }
+    # ADMIN_LEVEL -> tier drawn on boundary maps
+    MAP_TIERS = {1: "coarse", 2: "medium", 3: "medium"}
 
     def __init__(self, db_connection_factory):
         self.get_connection = db_connection_factory
@@ -94,7 +88,12 @@ class AuxiliaryDataImporter:
     # Table creation
     # ------------------------------------------------------------------
     def ensure_tables_exist(self):
-        """Creates TBL_REF_ADMIN_BOUNDARIES and TBL_REF_DATASET_METADATA if they don't exist."""
+        """
+        Creates TBL_REF_ADMIN_BOUNDARIES and TBL_REF_DATASET_METADATA if they
+        don't exist, upgrades the R*Tree triggers and backfills geometry
+        columns. Called at app start (next to init_db) and before ingestion;
+        a rerun on an up-to-date database writes nothing.
+        """
         conn = self.get_connection()
         c = conn.cursor()
 
@@ -124,7 +123,14 @@ class AuxiliaryDataImporter:
                 ADMIN_LEVEL   INTEGER,              -- 1=oblast, 2=raion, 3=hromada
                 ADMIN_NAME    TEXT,                 -- English name (ADM1_EN / ADM2_EN etc.)
                 ADMIN_CODE    TEXT,                 -- P-code (UA80, UA8036 etc.)
-                GEOM_WKT      TEXT,                 -- geometry in WKT format
+                GEOM_WKT      TEXT,                 -- legacy WKT (NULL once GEOM_WKB is set)
+                GEOM_WKB      BLOB,                 -- geometry in WKB format (preferred)
+                GEOM_WKB_COARSE BLOB,               -- simplified tiers, see SIMPLIFY_TIERS
+                GEOM_WKB_MEDIUM BLOB,
+                BBOX_MIN_X    REAL,                 -- bounding box (lon/lat), mirrored in the R*Tree
+                BBOX_MIN_Y    REAL,
+                BBOX_MAX_X    REAL,
+                BBOX_MAX_Y    REAL,
                 CRS_EPSG      INTEGER DEFAULT 4326, -- coordinate reference system
                 JSON_DATA     TEXT,                 -- per-feature attribute values
                 FOREIGN KEY (DATASET_ID) REFERENCES {self.METADATA_TABLE} (DATASET_ID)
@@ -144,8 +150,136 @@ class AuxiliaryDataImporter:
             ON {self.BOUNDARIES_TABLE} (ADMIN_CODE)
         ''')
 
+        # Migration: geometry columns for tables created before GEOM_WKB / BBOX_* / tiers
+        c.execute(f"PRAGMA table_info({self.BOUNDARIES_TABLE})")
+        existing_cols = [row[1] for row in c.fetchall()]
+        tier_cols = [(column, "BLOB") for column, _ in self.SIMPLIFY_TIERS.values()]
+        for col_name, col_def in [("GEOM_WKB", "BLOB"), ("BBOX_MIN_X", "REAL"), ("BBOX_MIN_Y", "REAL"),
+                                  ("BBOX_MAX_X", "REAL"), ("BBOX_MAX_Y", "REAL")] + tier_cols:
+            if col_name not in existing_cols:
+                c.execute(f"ALTER TABLE {self.BOUNDARIES_TABLE} ADD COLUMN {col_name} {col_def}")
+
+        # Spatial index — one R*Tree entry per boundary bbox, keyed by the
+        # boundary rowid so the sync triggers are point lookups. SYS_ADMIN_ID
+        # is carried as an auxiliary column to detect renumbered rowids
+        # (VACUUM may renumber them), see _sync_rtree().
+        c.execute(f'''
+            CREATE VIRTUAL TABLE IF NOT EXISTS {self.RTREE_TABLE}
+            USING rtree(ID, MIN_X, MAX_X, MIN_Y, MAX_Y, +SYS_ADMIN_ID)
+        ''')
+
+        # Triggers keep the R*Tree in sync with the bbox columns. Replaced
+        # only when the stored SQL differs (databases with the old
+        # SYS_ADMIN_ID-keyed triggers), so a rerun leaves the schema untouched.
+        rtree_triggers = {
+            "trg_admin_boundary_rtree_insert": f'''
+                CREATE TRIGGER trg_admin_boundary_rtree_insert
+                AFTER INSERT ON {self.BOUNDARIES_TABLE}
+                WHEN NEW.BBOX_MIN_X IS NOT NULL
+                BEGIN
+                    INSERT OR REPLACE INTO {self.RTREE_TABLE} (ID, MIN_X, MAX_X, MIN_Y, MAX_Y, SYS_ADMIN_ID)
+                    VALUES (NEW.rowid, NEW.BBOX_MIN_X, NEW.BBOX_MAX_X, NEW.BBOX_MIN_Y, NEW.BBOX_MAX_Y, NEW.SYS_ADMIN_ID);
+                END
+            ''',
+            "trg_admin_boundary_rtree_update": f'''
+                CREATE TRIGGER trg_admin_boundary_rtree_update
+                AFTER UPDATE OF BBOX_MIN_X, BBOX_MIN_Y, BBOX_MAX_X, BBOX_MAX_Y ON {self.BOUNDARIES_TABLE}
+                BEGIN
+                    DELETE FROM {self.RTREE_TABLE} WHERE ID = OLD.rowid;
+                    INSERT INTO {self.RTREE_TABLE} (ID, MIN_X, MAX_X, MIN_Y, MAX_Y, SYS_ADMIN_ID)
+                    SELECT NEW.rowid, NEW.BBOX_MIN_X, NEW.BBOX_MAX_X, NEW.BBOX_MIN_Y, NEW.BBOX_MAX_Y, NEW.SYS_ADMIN_ID
+                    WHERE NEW.BBOX_MIN_X IS NOT NULL;
+                END
+            ''',
+            "trg_admin_boundary_rtree_delete": f'''
+                CREATE TRIGGER trg_admin_boundary_rtree_delete
+                AFTER DELETE ON {self.BOUNDARIES_TABLE}
+                BEGIN
+                    DELETE FROM {self.RTREE_TABLE} WHERE ID = OLD.rowid;
+                END
+            ''',
+        }
+        for name, sql in rtree_triggers.items():
+            c.execute("SELECT sql FROM sqlite_master WHERE type = 'trigger' AND name = ?", (name,))
+            row = c.fetchone()
+            if row is None or row[0].strip() != sql.strip():
+                c.execute(f"DROP TRIGGER IF EXISTS {name}")
+                c.execute(sql)
+        self._sync_rtree(c)
+
         conn.commit()
         conn.close()
+        self._backfill_geometry_columns()
+
+    def _sync_rtree(self, c):
+        """
+        Rebuilds the R*Tree if its ids no longer match the boundary rowids
+        (after a VACUUM, or in databases indexed before it was rowid-keyed).
+        """
+        c.execute(f'''
+            SELECT
+                (SELECT COUNT(*) FROM {self.RTREE_TABLE}) !=
+                (SELECT COUNT(*) FROM {self.BOUNDARIES_TABLE} WHERE BBOX_MIN_X IS NOT NULL)
+                OR EXISTS (
+                    SELECT 1 FROM {self.RTREE_TABLE} r
+                    LEFT JOIN {self.BOUNDARIES_TABLE} b ON b.rowid = r.ID
+                    WHERE b.SYS_ADMIN_ID IS NOT r.SYS_ADMIN_ID
+                )
+        ''')
+        if not c.fetchone()[0]:
+            return
+        c.execute(f"DELETE FROM {self.RTREE_TABLE}")
+        c.execute(f'''
+            INSERT INTO {self.RTREE_TABLE} (ID, MIN_X, MAX_X, MIN_Y, MAX_Y, SYS_ADMIN_ID)
+            SELECT rowid, BBOX_MIN_X, BBOX_MAX_X, BBOX_MIN_Y, BBOX_MAX_Y, SYS_ADMIN_ID
+            FROM {self.BOUNDARIES_TABLE}
+            WHERE BBOX_MIN_X IS NOT NULL
+        ''')
+
+    def _backfill_geometry_columns(self, batch_size: int = 200):
+        """
+        Fills GEOM_WKB, the bbox columns and the simplified tiers for rows
+        loaded before they existed, and drops the legacy WKT text (several
+        times larger on disk and in every pushed DB file). The bbox update
+        feeds the R*Tree.
+        """
+        if not wkb_supported():
+            return 0
+        tiers = list(self.SIMPLIFY_TIERS.values())
+        tier_missing = " OR ".join(f"{column} IS NULL" for column, _ in tiers)
+        tier_set = ", ".join(f"{column} = ?" for column, _ in tiers)
+        conn = self.get_connection()
+        c = conn.cursor()
+        converted = 0
+        try:
+            while True:
+                c.execute(f'''
+                    SELECT SYS_ADMIN_ID, GEOM_WKT, GEOM_WKB FROM {self.BOUNDARIES_TABLE}
+                    WHERE (GEOM_WKB IS NULL AND GEOM_WKT IS NOT NULL)
+                       OR (GEOM_WKB IS NOT NULL AND (BBOX_MIN_X IS NULL OR {tier_missing}))
+                    LIMIT ?
+                ''', (batch_size,))
+                rows = []
+                for sys_id, wkt, wkb in c.fetchall():
+                    geom = shape(None, None, wkt, wkb)
+                    simplified = [geom.simplify(tolerance, preserve_topology=True).wkb for _, tolerance in tiers]
+                    rows.append((wkb or geom.wkb, *geom.bounds, *simplified, sys_id))
+                if not rows:
+                    break
+                c.executemany(f'''
+                    UPDATE {self.BOUNDARIES_TABLE}
+                    SET GEOM_WKB = ?, GEOM_WKT = NULL,
+                        BBOX_MIN_X = ?, BBOX_MIN_Y = ?, BBOX_MAX_X = ?, BBOX_MAX_Y = ?,
+                        {tier_set}
+                    WHERE SYS_ADMIN_ID = ?
+                ''', rows)
+                conn.commit()
+                converted += len(rows)
+            if converted:
+                print(f"Backfilled WKB / bbox / tiers for {converted} boundary geometries")
+            return converted
+        finally:
+            conn.close()
 
     # ------------------------------------------------------------------
     # Public API
@@ -154,9 +288,22 @@ class AuxiliaryDataImporter:
         """Returns the list of datasets supported by this importer."""
         return AVAILABLE_DATASETS
 
+    def _tables_exist(self):
+        """True once ensure_tables_exist() has created the reference tables."""
+        conn = self.get_connection()
+        try:
+            row = conn.execute(
+                "SELECT COUNT(*) FROM sqlite_master WHERE type = 'table' AND name IN (?, ?)",
+                (self.METADATA_TABLE, self.BOUNDARIES_TABLE)
+            ).fetchone()
+            return row[0] == 2
+        finally:
+            conn.close()
+
     def is_dataset_loaded(self, dataset_id: str) -> bool:
         """Checks if a dataset has already been loaded into the database."""
-        self.ensure_tables_exist()
+        if not self._tables_exist():
+            return False
         conn = self.get_connection()
         c = conn.cursor()
         c.execute(
@@ -167,19 +314,136 @@ class AuxiliaryDataImporter:
         conn.close()
         return count > 0
 
+    def get_boundaries(self, admin_level: int = None, tier: str = "full"):
+        """
+        Returns boundary rows as dicts with a parsed shapely 'geometry'
+        (read from GEOM_WKB, falling back to legacy GEOM_WKT).
+        tier = "coarse" / "medium" returns the simplified copy instead (much
+        smaller, meant for map layers); "full" is needed for exact tests.
+        """
+        if tier != "full" and tier not in self.SIMPLIFY_TIERS:
+            raise ValueError(f"Unknown geometry tier: '{tier}'")
+        if not self._tables_exist():
+            return []
+        wkb_col = "GEOM_WKB" if tier == "full" else f"COALESCE({self.SIMPLIFY_TIERS[tier][0]}, GEOM_WKB)"
+        conn = self.get_connection()
+        c = conn.cursor()
+        sql = f"SELECT SYS_ADMIN_ID, DATASET_ID, ADMIN_LEVEL, ADMIN_NAME, ADMIN_CODE, GEOM_WKT, {wkb_col} FROM {self.BOUNDARIES_TABLE}"
+        params = ()
+        if admin_level is not None:
+            sql += " WHERE ADMIN_LEVEL = ?"
+            params = (admin_level,)
+        c.execute(sql, params)
+        rows = c.fetchall()
+        conn.close()
+        return [
+            {
+                "SYS_ADMIN_ID": sys_id,
+                "DATASET_ID":   dataset_id,
+                "ADMIN_LEVEL":  level,
+                "ADMIN_NAME":   name,
+                "ADMIN_CODE":   code,
+                "geometry":     shape(None, None, wkt, wkb),
+            }
+            for sys_id, dataset_id, level, name, code, wkt, wkb in rows
+        ]
+
+    def get_boundary_geojson(self, admin_level: int):
+        """
+        GeoJSON FeatureCollection of one admin level for map layers, read
+        from the simplified tier in MAP_TIERS (properties: name, code).
+        """
+        from shapely.geometry import mapping
+
+        features = [
+            {
+                "type": "Feature",
+                "geometry": mapping(row["geometry"]),
+                "properties": {"name": row["ADMIN_NAME"], "code": row["ADMIN_CODE"]},
+            }
+            for row in self.get_boundaries(admin_level, tier=self.MAP_TIERS.get(admin_level, "medium"))
+            if row["geometry"] is not None
+        ]
+        return {"type": "FeatureCollection", "features": features}
+
+    def lookup_admin_units(self, latitude: float, longitude: float, admin_level: int = None):
+        """
+        Point-in-polygon lookup: returns the boundaries containing the point,
+        ordered by ADMIN_LEVEL, as dicts (SYS_ADMIN_ID, DATASET_ID,
+        ADMIN_LEVEL, ADMIN_NAME, ADMIN_CODE).
+        The R*Tree narrows the candidates to the few bboxes that contain the
+        point. Each candidate is first decided on its coarse tier: a point
+        farther than the tier tolerance from the coarse outline is on the same
+        side of the full outline. Only points near a border are tested
+        exactly with the full prepared polygon (parsed once and kept in the
+        geometry cache).
+        """
+        from shapely.geometry import Point
+
+        coarse_col, coarse_tolerance = self.SIMPLIFY_TIERS["coarse"]
+        conn = self.get_connection()
+        c = conn.cursor()
+        try:
+            sql = f'''
+                SELECT b.SYS_ADMIN_ID, b.DATASET_ID, b.ADMIN_LEVEL, b.ADMIN_NAME, b.ADMIN_CODE,
+                       b.{coarse_col}
+                FROM {self.RTREE_TABLE} r
+                JOIN {self.BOUNDARIES_TABLE} b ON b.rowid = r.ID
+                WHERE r.MIN_X <= ? AND r.MAX_X >= ? AND r.MIN_Y <= ? AND r.MAX_Y >= ?
+            '''
+            params = [longitude, longitude, latitude, latitude]
+            if admin_level is not None:
+                sql += " AND b.ADMIN_LEVEL = ?"
+                params.append(admin_level)
+            c.execute(sql + " ORDER BY b.ADMIN_LEVEL", params)
+            candidates = c.fetchall()
+
+            def load_geometry(sys_id):
+                # Only fetch the (large) WKB blob on a cache miss
+                c.execute(f"SELECT GEOM_WKT, GEOM_WKB FROM {self.BOUNDARIES_TABLE} WHERE SYS_ADMIN_ID = ?", (sys_id,))
+                return c.fetchone()
+
+            point = Point(longitude, latitude)
+            matches = []
+            for sys_id, dataset_id, level, name, code, coarse_wkb in candidates:
+                inside = None
+                if coarse_wkb:
+                    coarse = shape(f"{sys_id}:coarse", None, wkb=coarse_wkb)
+                    if coarse.boundary.distance(point) > coarse_tolerance:
+                        inside = coarse.contains(point)
+                if inside is None:
+                    polygon = prepared_shape(sys_id, None, lambda sys_id=sys_id: load_geometry(sys_id))
+                    inside = polygon is not None and polygon.contains(point)
+                if inside:
+                    matches.append({
+                        "SYS_ADMIN_ID": sys_id,
+                        "DATASET_ID":   dataset_id,
+                        "ADMIN_LEVEL":  level,
+                        "ADMIN_NAME":   name,
+                        "ADMIN_CODE":   code,
+                    })
+            return matches
+        finally:
+            conn.close()
+
     def get_loaded_datasets(self):
         """Returns metadata rows for all datasets currently in the database."""
-        self.ensure_tables_exist()
-        conn = self.get_connection()
         import pandas as pd
+        if not self._tables_exist():
+            return pd.DataFrame()
+        conn = self.get_connection()
         df = pd.read_sql(
             f"SELECT * FROM {self.METADATA_TABLE} ORDER BY LOADED_AT DESC", conn
         )
         conn.close()
         return df
 
-    def ingest_dataset(self, dataset_id: str, overwrite: bool = False, loaded_by: str = None):
-        """Dispatcher — routes to the correct ingestion method based on dataset type."""
+    def ingest_dataset(self, dataset_id: str, overwrite: bool = False, loaded_by: str = None,
+                       progress_callback=None):
+        """
+        Dispatcher — routes to the correct ingestion method based on dataset type.
+        progress_callback(done, total) is called as feature rows are written.
+        """
         self.ensure_tables_exist()
 
         config = next((d for d in AVAILABLE_DATASETS if d["id"] == dataset_id), None)
@@ -192,12 +456,64 @@ class AuxiliaryDataImporter:
         match config["type"]:
             # From the list of available datasets
             case "Administrative Boundaries":
-                return self._ingest_admin_boundaries(config, overwrite, loaded_by)
+                return self._ingest_admin_boundaries(config, overwrite, loaded_by, progress_callback)
             case "Population":
-                return self._ingest_population(config, overwrite, loaded_by)
+                return self._ingest_population(config, overwrite, loaded_by, progress_callback)
             case _:
                 return False, f"No ingestion method implemented for type: '{config['type']}'"
 
+    def ingest_datasets(self, dataset_ids: list, overwrite: bool = False, loaded_by: str = None,
+                        progress_callback=None):
+        """
+        Loads several boundary layers in one action and one transaction.
+        Each distinct archive is fetched and extracted once, layers are read,
+        projected and written one at a time (only one layer in memory), and
+        each layer gets its own metadata row. Nothing is kept if any layer fails.
+        progress_callback(dataset_id, done, total) is called as rows are written.
+        """
+        self.ensure_tables_exist()
+
+        configs = []
+        for dataset_id in dataset_ids:
+            config = next((d for d in AVAILABLE_DATASETS if d["id"] == dataset_id), None)
+            if not config:
+                return False, f"Unknown dataset id: '{dataset_id}'"
+            if config["type"] != "Administrative Boundaries":
+                return False, f"Batch ingestion only supports administrative boundaries, not '{config['type']}'"
+            if self.is_dataset_loaded(dataset_id) and not overwrite:
+                return False, f"Dataset '{dataset_id}' already loaded. Pass overwrite=True to reload."
+            configs.append(config)
+        if not configs:
+            return False, "No datasets selected."
+
+        conn = self.get_connection()
+        c = conn.cursor()
+
+        try:
+            gdb_paths = {}
+            total_records = 0
+            for config in configs:
+                if overwrite:
+                    self._delete_dataset_rows(c, config["id"])
+
+                if config["url"] not in gdb_paths:
+                    print(f"Fetching {config['name']}...")
+                    gdb_paths[config["url"]] = extracted_gdb(config["url"], config.get("sha256"))
+
+                layer_callback = None
+                if progress_callback:
+                    layer_callback = lambda done, total, dataset_id=config["id"]: progress_callback(dataset_id, done, total)
+                total_records += self._insert_admin_layer(c, config, gdb_paths[config["url"]], loaded_by, layer_callback)
+
+            conn.commit()
+            return True, f"Successfully ingested {total_records} records across {len(configs)} datasets."
+
+        except Exception as e:
+            conn.rollback()
+            return False, f"Ingestion failed: {str(e)}"
+        finally:
+            conn.close()
+
     # ------------------------------------------------------------------
     # Private ingestion methods
     # The following methods are dataset dependent, so we need to implement a method for each dataset
@@ -205,97 +521,21 @@ class AuxiliaryDataImporter:
     # - Administrative Boundaries: functional, and used for point-in-polygon lookups
     # - Population: as placeholder, not implemented yet
     # ------------------------------------------------------------------
-    def _ingest_admin_boundaries(self, config: dict, overwrite: bool, loaded_by: str):
+    def _ingest_admin_boundaries(self, config: dict, overwrite: bool, loaded_by: str, progress_callback=None):
         """Handles GDB-based administrative boundary datasets from HDX."""
-        import geopandas as gpd
         conn = self.get_connection()
         c = conn.cursor()
 
         try:
             # Clean up existing records if overwriting
             if overwrite:
-                c.execute(f"DELETE FROM {self.BOUNDARIES_TABLE} WHERE DATASET_ID = ?", (config["id"],))
-                c.execute(f"DELETE FROM {self.METADATA_TABLE}   WHERE DATASET_ID = ?", (config["id"],))
-
-            # Download and extract GDB
-            print(f"Downloading {config['name']}...")
-            gdb_path = _download_and_extract_gdb(config["url"])
-
-            # Read the specific admin level layer
-            print(f"Reading layer: {config['layer']}")
-            gdf = gpd.read_file(gdb_path, layer=config["layer"])
-            gdf = gdf.to_crs(epsg=4326)
-
-            record_count = len(gdf)
-            loaded_at    = datetime.now(timezone.utc).isoformat()
-            admin_level  = config["admin_level"]
-            level_str    = f"ADM{admin_level}"
-
-            # Columns stored explicitly — exclude from JSON_DATA
-            core_cols = {
-                "geometry",
-                f"{level_str}_EN",
-                f"{level_str}_PCODE",
-                "Shape_Length",
-                "Shape_Area"
-            }
+                self._delete_dataset_rows(c, config["id"])
 
-            # PROPERTIES_JSON on metadata: schema describing what's in JSON_DATA
-            json_data_keys = [col for col in gdf.columns if col not in core_cols]
-            properties_schema = json.dumps(json_data_keys)
-
-            # Write metadata row
-            c.execute(f'''
-                INSERT INTO {self.METADATA_TABLE}
-                (DATASET_ID, DATASET_NAME, SOURCE_URL, SOURCE_ORG, DESCRIPTION,
-                 COUNTRY_CODE, VALID_ON, LOADED_AT, LOADED_BY, RECORD_COUNT,
-                 PROPERTIES_JSON, NOTES)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                config["id"],
-                config["name"],
-                config["url"],
-                config["source_org"],
-                config["description"],
-                config["country_code"],
-                config["valid_on"],
-                loaded_at,
-                loaded_by,
-                record_count,
-                properties_schema,
-                None
-            ))
-
-            # Write one boundary row per feature
-            print(f"Inserting {record_count} features...")
-            for _, row in gdf.iterrows():
-                sys_id     = str(uuid.uuid4())
-                admin_name = row.get(f"{level_str}_EN")
-                admin_code = row.get(f"{level_str}_PCODE")
-                geom_wkt   = row.geometry.wkt
-
-                # Per-feature attribute values (everything except core cols)
-                json_data = {
-                    col: str(row[col])
-                    for col in gdf.columns
-                    if col not in core_cols and row[col] is not None
-                }
+            # GDB from the local archive cache (downloaded and extracted once per archive)
+            print(f"Fetching {config['name']}...")
+            gdb_path = extracted_gdb(config["url"], config.get("sha256"))
 
-                c.execute(f'''
-                    INSERT INTO {self.BOUNDARIES_TABLE}
-                    (SYS_ADMIN_ID, DATASET_ID, ADMIN_LEVEL, ADMIN_NAME, ADMIN_CODE,
-                     GEOM_WKT, CRS_EPSG, JSON_DATA)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (
-                    sys_id,
-                    config["id"],
-                    admin_level,
-                    admin_name,
-                    admin_code,
-                    geom_wkt,
-                    4326,
-                    json.dumps(json_data)
-                ))
+            record_count = self._insert_admin_layer(c, config, gdb_path, loaded_by, progress_callback)
 
             conn.commit()
             return True, f"Successfully ingested {record_count} records for '{config['id']}'."
@@ -306,7 +546,123 @@ class AuxiliaryDataImporter:
         finally:
             conn.close()
 
-    def _ingest_population(self, config: dict, overwrite: bool, loaded_by: str):
+    def _delete_dataset_rows(self, c, dataset_id: str):
+        c.execute(f"DELETE FROM {self.BOUNDARIES_TABLE} WHERE DATASET_ID = ?", (dataset_id,))
+        c.execute(f"DELETE FROM {self.METADATA_TABLE}   WHERE DATASET_ID = ?", (dataset_id,))
+
+    def _insert_admin_layer(self, c, config: dict, gdb_path: str, loaded_by: str, progress_callback=None) -> int:
+        """
+        Reads one boundary layer from the GDB, projects it to EPSG:4326 and writes
+        its metadata row and features on cursor c (the caller commits).
+        Returns the number of features written.
+        """
+        import geopandas as gpd
+
+        # Read the specific admin level layer
+        print(f"Reading layer: {config['layer']}")
+        gdf = gpd.read_file(gdb_path, layer=config["layer"])
+        if gdf.crs is None or gdf.crs.to_epsg() != 4326:
+            gdf = gdf.to_crs(epsg=4326)
+
+        record_count = len(gdf)
+        loaded_at    = datetime.now(timezone.utc).isoformat()
+        rows, json_data_keys = self._boundary_rows(config, gdf)
+        del gdf
+
+        # PROPERTIES_JSON on metadata: schema describing what's in JSON_DATA
+        properties_schema = json.dumps(json_data_keys)
+
+        # Write metadata row
+        c.execute(f'''
+            INSERT INTO {self.METADATA_TABLE}
+            (DATASET_ID, DATASET_NAME, SOURCE_URL, SOURCE_ORG, DESCRIPTION,
+             COUNTRY_CODE, VALID_ON, LOADED_AT, LOADED_BY, RECORD_COUNT,
+             PROPERTIES_JSON, NOTES)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', (
+            config["id"],
+            config["name"],
+            config["url"],
+            config["source_org"],
+            config["description"],
+            config["country_code"],
+            config["valid_on"],
+            loaded_at,
+            loaded_by,
+            record_count,
+            properties_schema,
+            None
+        ))
+
+        # Write the boundary rows in chunks
+        print(f"Inserting {record_count} features...")
+        self._write_boundary_rows(c, rows, progress_callback)
+        return record_count
+
+    def _boundary_rows(self, config: dict, gdf):
+        """
+        Columnar export of a boundary layer into INSERT parameter tuples:
+        WKB, simplified tiers and bboxes are computed for the whole GeoSeries at once, and
+        JSON_DATA comes from a single to_dict('records') pass.
+        Returns (rows, json_data_keys).
+        """
+        admin_level = config["admin_level"]
+        level_str   = f"ADM{admin_level}"
+        n           = len(gdf)
+
+        # Columns stored explicitly — exclude from JSON_DATA
+        core_cols = {
+            "geometry",
+            f"{level_str}_EN",
+            f"{level_str}_PCODE",
+            "Shape_Length",
+            "Shape_Area"
+        }
+        json_data_keys = [col for col in gdf.columns if col not in core_cols]
+
+        def column(name):
+            return gdf[name].tolist() if name in gdf.columns else [None] * n
+
+        admin_names = column(f"{level_str}_EN")
+        admin_codes = column(f"{level_str}_PCODE")
+        geoms_wkb   = gdf.geometry.to_wkb().tolist()
+        tiers_wkb   = [
+            gdf.geometry.simplify(tolerance, preserve_topology=True).to_wkb().tolist()
+            for _, tolerance in self.SIMPLIFY_TIERS.values()
+        ]
+        bounds      = gdf.geometry.bounds[["minx", "miny", "maxx", "maxy"]].itertuples(index=False, name=None)
+
+        # Per-feature attribute values (everything except core cols)
+        json_data = [
+            json.dumps({col: str(val) for col, val in rec.items() if val is not None})
+            for rec in gdf[json_data_keys].astype(object).to_dict("records")
+        ]
+
+        rows = [
+            (str(uuid.uuid4()), config["id"], admin_level, name, code, wkb,
+             float(min_x), float(min_y), float(max_x), float(max_y), 4326, attrs, *tier_wkbs)
+            for name, code, wkb, (min_x, min_y, max_x, max_y), attrs, *tier_wkbs
+            in zip(admin_names, admin_codes, geoms_wkb, bounds, json_data, *tiers_wkb)
+        ]
+        return rows, json_data_keys
+
+    def _write_boundary_rows(self, c, rows, progress_callback=None):
+        """executemany in chunks of BOUNDARY_CHUNK_SIZE; progress_callback(done, total) after each."""
+        total = len(rows)
+        tier_cols = [column for column, _ in self.SIMPLIFY_TIERS.values()]
+        for start in range(0, total, self.BOUNDARY_CHUNK_SIZE):
+            chunk = rows[start:start + self.BOUNDARY_CHUNK_SIZE]
+            c.executemany(f'''
+                INSERT INTO {self.BOUNDARIES_TABLE}
+                (SYS_ADMIN_ID, DATASET_ID, ADMIN_LEVEL, ADMIN_NAME, ADMIN_CODE,
+                 GEOM_WKB, BBOX_MIN_X, BBOX_MIN_Y, BBOX_MAX_X, BBOX_MAX_Y,
+                 CRS_EPSG, JSON_DATA, {", ".join(tier_cols)})
+                VALUES ({", ".join("?" * (12 + len(tier_cols)))})
+            ''', chunk)
+            if progress_callback:
+                progress_callback(start + len(chunk), total)
+
+    def _ingest_population(self, config: dict, overwrite: bool, loaded_by: str, progress_callback=None):
         """Handles population datasets — to be implemented."""
         raise NotImplementedError("Population ingestion not yet implemented.")
 
@@ -314,72 +670,36 @@ class AuxiliaryDataImporter:
 # ------------------------------------------------------------------
 # Helper functions
 # ------------------------------------------------------------------
-# Reverse Geocoding
-from geopy.geocoders import Nominatim
-from geopy.exc import GeocoderTimedOut, GeocoderServiceError
+# Geocoding — cached and rate limited, see geocoder.py (re-exported for the pages)
+from geocoder import geocode_address, geocode_pending_addresses, get_geocode_candidate  # noqa: F401
 
-geolocator = Nominatim(user_agent="habitat_ukraine_refit")
+# OpenStreetMap
+from footprint_index import footprint_source, index_available, find_footprint
 
-def geocode_address(a_dict):
+def fetch_osm_footprint(latitude, longitude):
     """
-    Attempts to geocode an address from TBL_CORE_ADDRESS data.
-    Tries full address string first, falls back to structured components.
-    
-    Args:
-        a_dict: address dictionary from get_property_address()
-    
-    Returns:
-        dict with 'latitude', 'longitude', 'resolved_address' or None if failed
+    Returns the OSM building footprint that contains the point, or None.
+
+    The source follows FOOTPRINT_SOURCE (see footprint_index.py): the local
+    footprint index answers in milliseconds once an extract is imported;
+    live Overpass is only queried as a fallback ("auto") or when configured
+    ("overpass").
     """
-    
-    # 1. Try full address string
-    full_address = ", ".join(filter(None, [
-        a_dict.get('ADDR_LINE1'),
-        a_dict.get('ADDR_LINE2'),
-        a_dict.get('CITY'),
-        a_dict.get('POSTCODE'),
-        a_dict.get('ADMIN_UNIT'),
-        a_dict.get('COUNTRY'),
-    ]))
-
-    if full_address:
-        try:
-            location = geolocator.geocode(full_address, timeout=10)
-            if location:
-                return {
-                    "latitude":         location.latitude,
-                    "longitude":        location.longitude,
-                    "resolved_address": location.address
-                }
-        except (GeocoderTimedOut, GeocoderServiceError) as e:
-            print(f"Full address geocoding failed: {e}")
-
-    # 2. Fallback to structured components only
-    structured = ", ".join(filter(None, [
-        a_dict.get('ADDR_LINE1'),
-        a_dict.get('CITY'),
-        a_dict.get('COUNTRY'),
-    ]))
-
-    if structured:
+    source = footprint_source()
+    if source != "overpass" and index_available():
         try:
-            location = geolocator.geocode(structured, timeout=10)
-            if location:
-                return {
-                    "latitude":         location.latitude,
-                    "longitude":        location.longitude,
-                    "resolved_address": location.address
-                }
-        except (GeocoderTimedOut, GeocoderServiceError) as e:
-            print(f"Structured geocoding failed: {e}")
-
-    return None
-
-# OpenStreetMap
-import osmnx as ox
-from shapely.geometry import Point
+            footprint = find_footprint(latitude, longitude)
+            if footprint is not None or source == "local":
+                return footprint
+        except Exception as e:
+            print(f"Local footprint lookup failed: {e}")
+            if source == "local":
+                return None
+    elif source == "local":
+        return None
+    return _fetch_osm_footprint_overpass(latitude, longitude)
 
-def fetch_osm_footprint(latitude, longitude):
+def _fetch_osm_footprint_overpass(latitude, longitude):
     """
     Attempts to retrieve a building footprint from OpenStreetMap using osmnx.
     
@@ -387,6 +707,9 @@ def fetch_osm_footprint(latitude, longitude):
     mapped in OSM. The function queries a 50m radius and returns the geometry 
     of the specific polygon that spatially contains the provided coordinates.
     """
+    import osmnx as ox
+    from shapely.geometry import Point
+
     try:
         # Fetch features tagged as 'building' within 50 meters of the point
         gdf = ox.features_from_point((latitude, longitude), tags={'building': True}, dist=50)
@@ -5,10 +5,11 @@ import os
 sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
 
 import streamlit as st
-from db_core import init_db, seed_enums
+from db_core import init_db, seed_enums, get_connection
+from utils.auxiliaryDataImport import AuxiliaryDataImporter
 from auth_manager import login_ui, logout
 from st_admin_page import admin_page
-from github_bridge import pull_database
+from github_bridge import pull_database, render_sync_status
 from st_locking_page import locking_page
 from st_inspection_page import inspection_page
 
@@ -35,6 +36,7 @@ else:
 if pull_success or os.environ.get("STREAMLIT_RUNTIME_CHECK") != "cloud":
     init_db()
     seed_enums()  # Populate TBL_ENUM / TBL_ENUM_I18N (safe to re-run)
+    AuxiliaryDataImporter(get_connection).ensure_tables_exist()  # Reference tables + R*Tree (no-op when current)
 else:
     st.error("🛑 Database Sync Failed. Initialization halted to prevent data loss.")
     st.stop()
@@ -65,6 +67,9 @@ if logged_in:
         logout()  # Clears session keys
         st.rerun()
 
+    # Background sync status (pending edits / last push)
+    render_sync_status()
+
     st.sidebar.divider()
     st.sidebar.title("Navigation")
     page = st.sidebar.radio(
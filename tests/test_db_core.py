@@ -0,0 +1,100 @@
+"""
+db_core against a fresh database file: the trigger-maintained status and
+search tables follow edits, bulk onboarding validates its rows, and the
+cascade delete removes every linked row and geometry.
+"""
+import pytest
+
+import db_core
+
+
+@pytest.fixture(autouse=True)
+def database(tmp_path):
+    db_core.reset_connection_pool()
+    db_core._DB_PATH = str(tmp_path / "database.sqlite")
+    db_core.init_db()
+    yield db_core._DB_PATH
+    db_core.reset_connection_pool()
+
+
+def _scalar(sql, params=()):
+    conn = db_core.get_connection()
+    try:
+        return conn.execute(sql, params).fetchone()[0]
+    finally:
+        conn.close()
+
+
+def test_status_follows_skeleton_edits():
+    pid = db_core.add_property("UA80", "8000000000:01:001:0001")
+    status = db_core.get_property_status(pid)
+    assert status["STATUS"] == "SKELETON"
+    assert (status["MISSING_LEGAL"], status["MISSING_ADDRESS"], status["MISSING_GOV"]) == (1, 1, 1)
+
+    db_core.update_property_address(pid, "Khreshchatyk 1", None, "Kyiv", "01001")
+    status = db_core.get_property_status(pid)
+    assert (status["MISSING_ADDRESS"], status["MISSING_GEOMETRY"]) == (0, 1)
+
+    db_core.update_governance(pid, "DEC-17", "2024-05-01", 0)
+    assert db_core.get_property_status(pid)["STATUS"] == "PARTIAL"
+    assert db_core.count_properties(status="PARTIAL") == 1
+
+    db_core.delete_property(pid)
+    assert db_core.get_property_status(pid) is None
+
+
+def test_search_follows_address_edits():
+    pid = db_core.add_property("UA80", "8000000000:01:001:0002")
+    db_core.add_property("UA80", "8000000000:01:001:0003")
+
+    db_core.update_property_address(pid, "Хрещатик 22", None, "Київ", "01001")
+    assert [r["SYS_PROPERTY_ID"] for r in db_core.search_properties("Хрещ")] == [pid]
+    assert [r["SYS_PROPERTY_ID"] for r in db_core.search_properties("0002")] == [pid]
+
+    db_core.update_property_address(pid, "Садова 3", None, "Київ", "01001")
+    assert db_core.search_properties("Хрещ") == []
+    assert [r["SYS_PROPERTY_ID"] for r in db_core.search_properties("Садова")] == [pid]
+
+
+def test_bulk_add_reports_invalid_rows():
+    result = db_core.add_properties_bulk([
+        {"admin_unit": "UA80", "cadastral_no": "8000000000:01:001:0004"},
+        {"admin_unit": "UA80", "cadastral_no": ""},
+        {"admin_unit": "UA80", "cadastral_no": "8000000000:01:001:0004"},
+        {"admin_unit": "UA80", "cadastral_no": "8000000000:01:001:0005"},
+    ])
+    assert len(result["created"]) == 2
+    assert [row for row, _ in result["errors"]] == [2, 3]
+
+    again = db_core.add_properties_bulk([{"admin_unit": "UA80", "cadastral_no": "8000000000:01:001:0005"}])
+    assert again["created"] == [] and len(again["errors"]) == 1
+    assert db_core.count_properties() == 2
+    assert _scalar("SELECT COUNT(*) FROM TBL_CORE_BUILDING") == 2
+
+
+def test_cascade_delete_removes_linked_rows_and_geometries():
+    doomed, kept = db_core.add_properties_bulk([
+        {"admin_unit": "UA80", "cadastral_no": "8000000000:01:001:0006"},
+        {"admin_unit": "UA80", "cadastral_no": "8000000000:01:001:0007"},
+    ])["created"]
+    db_core.add_building(doomed)
+    geometries_before = _scalar("SELECT COUNT(*) FROM TBL_CORE_GEOMETRY")
+
+    assert db_core.delete_properties([doomed]) == 1
+
+    for table, fk_col in db_core._PROPERTY_CHILD_TABLES + [("TBL_CORE_BUILDING", "FK_PROPERTY_ID")]:
+        assert _scalar(f"SELECT COUNT(*) FROM {table} WHERE {fk_col} = ?", (doomed,)) == 0, table
+    assert _scalar("SELECT COUNT(*) FROM TBL_CORE_PROPERTY WHERE SYS_PROPERTY_ID = ?", (doomed,)) == 0
+    assert _scalar("SELECT COUNT(*) FROM TBL_CORE_GEOMETRY") < geometries_before
+
+    aggregate = db_core.get_property_aggregate(kept)
+    assert len(aggregate["buildings"]) == 1
+    missing = [gid for gid in (aggregate["property_dict"]["ID_PROPERTY_GEOM"],
+                               aggregate["address_dict"]["ID_ADDR_GEOM"]) if gid not in aggregate["geometries"]]
+    assert missing == []
+    assert _scalar("""
+        SELECT COUNT(*) FROM TBL_CORE_GEOMETRY g
+        WHERE NOT EXISTS (SELECT 1 FROM TBL_CORE_PROPERTY WHERE ID_PROPERTY_GEOM = g.GEOM_ID)
+          AND NOT EXISTS (SELECT 1 FROM TBL_CORE_ADDRESS WHERE ID_ADDR_GEOM = g.GEOM_ID)
+          AND NOT EXISTS (SELECT 1 FROM TBL_CORE_BUILDING WHERE ID_BUILDING_GEOM = g.GEOM_ID OR SYS_BLD_ID = g.GEOM_ID)
+    """) == 0
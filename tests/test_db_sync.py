@@ -0,0 +1,78 @@
+"""
+db_sync delta round trip: a delta built against the manifest of one copy
+turns that copy into the newer database, and an unchanged file gives no delta.
+"""
+import sqlite3
+
+import pytest
+
+import db_sync
+
+
+def _make_db(path, rows):
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE T (X TEXT)")
+    conn.executemany("INSERT INTO T VALUES (?)", [(r,) for r in rows])
+    conn.commit()
+    conn.close()
+
+
+def _rows(db_path):
+    conn = sqlite3.connect(db_path)
+    try:
+        return [r[0] for r in conn.execute("SELECT X FROM T ORDER BY X")]
+    finally:
+        conn.close()
+
+
+@pytest.fixture
+def synced(tmp_path):
+    """(live db, synced copy): the copy's manifest records its pages as seq 0."""
+    live = str(tmp_path / "live.sqlite")
+    copy = str(tmp_path / "copy.sqlite")
+    _make_db(live, ["a", "b"])
+    db_sync.copy_database(live, copy)
+    db_sync.save_manifest(copy, "sha-1", 0)
+    return live, copy
+
+
+def test_unchanged_database_has_no_delta(synced, tmp_path):
+    live, copy = synced
+    snapshot = str(tmp_path / "snapshot.sqlite")
+    db_sync.copy_database(live, snapshot)
+
+    assert db_sync.build_delta(snapshot, db_sync.load_manifest(copy)) == (None, 0)
+
+
+def test_delta_round_trip(synced, tmp_path):
+    live, copy = synced
+    conn = sqlite3.connect(live)
+    conn.executemany("INSERT INTO T VALUES (?)", [(f"row {i:04d}" + "x" * 200,) for i in range(200)])
+    conn.execute("DELETE FROM T WHERE X = 'a'")
+    conn.commit()
+    conn.close()
+    snapshot = str(tmp_path / "snapshot.sqlite")
+    db_sync.copy_database(live, snapshot)
+
+    delta, changed = db_sync.build_delta(snapshot, db_sync.load_manifest(copy))
+    assert delta is not None and changed > 0
+
+    header = db_sync.apply_delta(copy, delta, expected_seq=1)
+    assert header["seq"] == 1
+    assert db_sync.file_sha1(copy) == db_sync.file_sha1(snapshot)
+    assert _rows(copy) == _rows(live)
+
+
+def test_out_of_order_delta_is_rejected(synced, tmp_path):
+    live, copy = synced
+    conn = sqlite3.connect(live)
+    conn.execute("INSERT INTO T VALUES ('c')")
+    conn.commit()
+    conn.close()
+    snapshot = str(tmp_path / "snapshot.sqlite")
+    db_sync.copy_database(live, snapshot)
+    delta, _ = db_sync.build_delta(snapshot, db_sync.load_manifest(copy))
+
+    with pytest.raises(ValueError):
+        db_sync.apply_delta(copy, delta, expected_seq=2)
+    assert _rows(copy) == ["a", "b"]
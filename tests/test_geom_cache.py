@@ -0,0 +1,37 @@
+"""
+GeometryCache: LRU eviction by entry count and by summed weight, and
+point_latlon parsing through the shared point cache.
+"""
+import geom_cache
+from geom_cache import GeometryCache
+
+
+def test_lru_evicts_least_recently_used():
+    cache = GeometryCache(maxsize=2)
+    cache.get_or_parse("a", lambda: 1)
+    cache.get_or_parse("b", lambda: 2)
+    assert cache.get_or_parse("a", lambda: -1) == 1   # hit, "a" becomes most recent
+    cache.get_or_parse("c", lambda: 3)                # evicts "b"
+
+    assert cache.get_or_parse("b", lambda: 20) == 20
+    info = cache.info()
+    assert (info["hits"], info["misses"], info["size"]) == (1, 4, 2)
+
+
+def test_weight_budget_keeps_oversized_newest_entry():
+    cache = GeometryCache(maxweight=10, weigh=len)
+    cache.get_or_parse("small", lambda: "x" * 4)
+    cache.get_or_parse("medium", lambda: "x" * 5)
+    assert cache.info()["vertices"] == 9
+
+    cache.get_or_parse("huge", lambda: "x" * 50)
+    assert cache.info()["size"] == 1 and cache.info()["vertices"] == 50
+
+
+def test_point_latlon_is_cached_per_update():
+    geom_cache.clear_cache()
+    assert geom_cache.point_latlon("g1", "t1", "POINT(30.5234 50.4501)") == {"latitude": 50.4501, "longitude": 30.5234}
+    # Same (id, updated_at): served from the cache, the WKT is not parsed again
+    assert geom_cache.point_latlon("g1", "t1", None) == {"latitude": 50.4501, "longitude": 30.5234}
+    assert geom_cache.point_latlon("g1", "t2", None) is None
+    assert geom_cache.cache_info()["point"]["hits"] == 1
@@ -0,0 +1,202 @@
+"""
+github_bridge against a fake GitHub API: the shared client is reused, a 304
+on the branch head skips the download, a changed ETag triggers a pull, and a
+pull never overwrites local edits that have not reached GitHub.
+"""
+import json
+import sqlite3
+
+import pytest
+
+pytest.importorskip("streamlit")
+pytest.importorskip("github")
+pytest.importorskip("requests")
+
+import db_sync
+import github_bridge
+from github import UnknownObjectException
+
+
+class FakeResponse:
+    def __init__(self, status_code, content=b"", headers=None):
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers or {}
+
+    def iter_content(self, chunk_size=1):
+        for i in range(0, len(self.content), chunk_size):
+            yield self.content[i:i + chunk_size]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+class FakeHTTP:
+    """requests.Session stand-in: branch endpoint with ETags + raw downloads."""
+
+    def __init__(self, branch_etag, files=None):
+        self.branch_etag = branch_etag
+        self.files = files or {}
+        self.calls = []
+
+    def get(self, url, headers=None, **kwargs):
+        self.calls.append(url)
+        if "/branches/" in url:
+            if (headers or {}).get("If-None-Match") == self.branch_etag:
+                return FakeResponse(304)
+            return FakeResponse(200, headers={"ETag": self.branch_etag})
+        return FakeResponse(200, content=self.files[url])
+
+
+class FakeContentFile:
+    def __init__(self, sha, download_url):
+        self.sha = sha
+        self.download_url = download_url
+
+
+class FakeRepo:
+    def __init__(self, files=None):
+        self.files = files or {}
+        self.get_contents_calls = []
+
+    def get_contents(self, path, ref=None):
+        self.get_contents_calls.append(path)
+        if path not in self.files:
+            raise UnknownObjectException(404, {"message": "Not Found"}, {})
+        return self.files[path]
+
+
+class FakeGithub:
+    instances = []
+
+    def __init__(self, token):
+        self.token = token
+        self.get_repo_calls = 0
+        self.repo = FakeRepo()
+        FakeGithub.instances.append(self)
+
+    def get_repo(self, name):
+        self.get_repo_calls += 1
+        return self.repo
+
+
+@pytest.fixture
+def config(tmp_path):
+    return {
+        "token": "t0ken",
+        "repo_name": "owner/data",
+        "db_path": str(tmp_path / "database.sqlite"),
+        "branch": "main",
+        "compact_every": 25,
+    }
+
+
+@pytest.fixture(autouse=True)
+def fake_github(monkeypatch):
+    FakeGithub.instances = []
+    monkeypatch.setattr(github_bridge, "Github", FakeGithub)
+    monkeypatch.setattr(github_bridge, "_pull_done", lambda sha, seq, label: (sha, seq, label))
+    github_bridge.reset_github_client()
+    yield
+    github_bridge.reset_github_client()
+
+
+def _make_db(path, rows):
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE T (X TEXT)")
+    conn.executemany("INSERT INTO T VALUES (?)", [(r,) for r in rows])
+    conn.commit()
+    conn.close()
+
+
+def _synced(config, tmp_path, sha, rows=("local",)):
+    """Local DB plus a manifest taken from a backup copy, as a finished sync leaves it."""
+    _make_db(config["db_path"], rows)
+    copy_path = str(tmp_path / "synced-copy.sqlite")
+    db_sync.copy_database(config["db_path"], copy_path)
+    db_sync.save_manifest(config["db_path"], sha, 0, source_path=copy_path)
+    db_sync.update_manifest(config["db_path"], branch_etag='"etag-1"')
+
+
+def _remote(config, tmp_path, monkeypatch, sha, rows):
+    remote_path = str(tmp_path / "remote.sqlite")
+    _make_db(remote_path, rows)
+    with open(remote_path, "rb") as f:
+        remote_bytes = f.read()
+
+    http = FakeHTTP('"etag-2"', files={"https://raw.example/database.sqlite": remote_bytes})
+    monkeypatch.setattr(github_bridge, "_HTTP", http)
+    repo = github_bridge.get_repo_handle(config)
+    repo.files[config["db_path"]] = FakeContentFile(sha, "https://raw.example/database.sqlite")
+    return http
+
+
+def _rows(db_path):
+    conn = sqlite3.connect(db_path)
+    try:
+        return [r[0] for r in conn.execute("SELECT X FROM T ORDER BY X")]
+    finally:
+        conn.close()
+
+
+def test_repo_handle_is_reused(config):
+    first = github_bridge.get_repo_handle(config)
+    second = github_bridge.get_repo_handle(config)
+
+    assert first is second
+    assert len(FakeGithub.instances) == 1
+    assert FakeGithub.instances[0].get_repo_calls == 1
+
+    # A new token means a new client
+    github_bridge.get_repo_handle(dict(config, token="other"))
+    assert len(FakeGithub.instances) == 2
+
+
+def test_unchanged_branch_skips_download(config, monkeypatch, tmp_path):
+    _synced(config, tmp_path, "sha-1")
+
+    http = FakeHTTP('"etag-1"')
+    monkeypatch.setattr(github_bridge, "_HTTP", http)
+
+    assert github_bridge._pull_locked(config) == ("sha-1", 0, "DB up to date")
+    assert len(http.calls) == 1                  # only the conditional branch request
+    assert FakeGithub.instances == []            # no client, no contents lookup
+
+
+def test_changed_etag_triggers_pull(config, monkeypatch, tmp_path):
+    _synced(config, tmp_path, "sha-1")
+    _remote(config, tmp_path, monkeypatch, "sha-2", ["remote-a", "remote-b"])
+
+    assert github_bridge._pull_locked(config) == ("sha-2", 0, "DB Synced")
+
+    assert _rows(config["db_path"]) == ["remote-a", "remote-b"]
+    with open(db_sync.manifest_path(config["db_path"]), "r", encoding="utf-8") as f:
+        manifest = json.load(f)
+    assert manifest["snapshot_sha"] == "sha-2"
+    assert manifest["branch_etag"] == '"etag-2"'
+
+
+def test_unsynced_local_edits_are_not_overwritten(config, monkeypatch, tmp_path):
+    _synced(config, tmp_path, "sha-1")
+    conn = sqlite3.connect(config["db_path"])
+    conn.execute("INSERT INTO T VALUES ('unpushed')")
+    conn.commit()
+    conn.close()
+    http = _remote(config, tmp_path, monkeypatch, "sha-2", ["remote-a"])
+
+    assert github_bridge._pull_locked(config) is True
+    assert _rows(config["db_path"]) == ["local", "unpushed"]
+    assert "https://raw.example/database.sqlite" not in http.calls
+    assert db_sync.load_manifest(config["db_path"])["snapshot_sha"] == "sha-1"
+
+
+def test_failed_flush_keeps_local_database(config, monkeypatch, tmp_path):
+    _synced(config, tmp_path, "sha-1")
+    http = _remote(config, tmp_path, monkeypatch, "sha-2", ["remote-a"])
+
+    assert github_bridge._pull_locked(config, flushed=False) is True
+    assert _rows(config["db_path"]) == ["local"]
+    assert http.calls == []